@@ -0,0 +1,314 @@
+'''
+ala_camera_autofocus.py
+Autofocus bakes: focus follows whatever is under a screen point of the camera.
+Every visible mesh gets a BVH over its triangles in object space, built once
+and cached until its geometry changes. The rays of a batch of frames are
+traced through each BVH together with NumPy, so a shot costs a few thousand
+vectorized node tests instead of one raycast per frame and mesh. Moving
+meshes are followed through their world matrix: only meshes with animation
+are sampled on every frame. Meshes with a deformer in their history are
+read again on every frame and their BVH refitted to the deformed points,
+which costs a full mesh read per frame. Hits are converted to depth along
+the camera axis, which is what focusDistance measures.
+'''
+import copy
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+from maya.api import OpenMayaAnim as oma
+import ala_camera_bake
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+import ala_camera_surface
+from ala_camera_modifier import get_plug, get_plug_value
+
+# Triangles per BVH leaf, tested against every ray of a batch at once
+BVH_LEAF_SIZE = 64
+# Frames traced together, rays of neighbouring frames take nearly the same path through a BVH
+DEFAULT_BATCH_SIZE = 250
+
+AUTOFOCUS_ATTRIBUTES = ('focusDistance', 'aiFocusDistance')
+
+MILLIMETERS_PER_INCH = 25.4
+
+
+class TriangleBVH():
+    '''
+    Bounding volume hierarchy over the triangles of a mesh, nodes split the
+    triangle centroids like ala_camera_surface.KDTree and are bounded by the
+    full triangles. Leaves hold consecutive rows of the corner arrays.
+    '''
+    def __init__(self, points, triangles, leaf_size=BVH_LEAF_SIZE):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.point_count = len(points)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.tree = ala_camera_surface.KDTree(points[self.triangles].mean(axis=1), leaf_size)
+        self.fit(points)
+
+    def fit(self, points):
+        '''
+        Corner and edge arrays in tree order and the node boxes of the triangles over points
+        '''
+        corners = points[self.triangles[self.tree.indices]]
+        self.corners = corners[:, 0]
+        self.edges_ab = corners[:, 1] - corners[:, 0]
+        self.edges_ac = corners[:, 2] - corners[:, 0]
+        # (nodes, 2, 3) lowest and highest corner under every node. Every node covers
+        # consecutive rows, so one reduceat over start, end, start, end... bounds them all
+        bounds = np.stack([np.vstack([corners.min(axis=1), [np.inf] * 3]), np.vstack([corners.max(axis=1), [-np.inf] * 3])])
+        ranges = np.ravel(np.column_stack([self.tree.starts, self.tree.ends]))
+        self.boxes = np.stack([np.minimum.reduceat(bounds[0], ranges)[::2], np.maximum.reduceat(bounds[1], ranges)[::2]], axis=1)
+
+    def refit(self, points, triangles):
+        '''
+        BVH of the same triangles over moved points, None when the topology changed.
+        The nodes keep their triangles, only the corners and boxes are recomputed.
+        '''
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points) != self.point_count or not np.array_equal(np.asarray(triangles).reshape(-1, 3), self.triangles):
+            return None
+        bvh = copy.copy(self)
+        bvh.fit(points)
+        return bvh
+
+    def intersect(self, origins, directions, nearest, min_distance=0.0):
+        '''
+        Trace (rays, 3) origins along directions, nearest holds the closest hit
+        of every ray so far (inf for none) and is lowered in place by the hits
+        beyond min_distance. Distances are in multiples of the direction length.
+        '''
+        tree = self.tree
+        #a zero direction component would divide by zero in the slab test
+        inverse_directions = 1.0 / np.where(directions == 0.0, 1e-30, directions)
+        pending = [(0, np.arange(len(origins)))]
+        while pending:
+            node, rays = pending.pop()
+            ray_origins = origins[rays]
+            ray_inverses = inverse_directions[rays]
+            slab_low = (self.boxes[node, 0] - ray_origins) * ray_inverses
+            slab_high = (self.boxes[node, 1] - ray_origins) * ray_inverses
+            box_near = np.minimum(slab_low, slab_high).max(axis=1)
+            box_far = np.maximum(slab_low, slab_high).min(axis=1)
+            rays = rays[(box_near <= box_far) & (box_far >= min_distance) & (box_near < nearest[rays])]
+            if not rays.size:
+                continue
+            if tree.lefts[node] >= 0:
+                #visit the child on the side the rays come from first
+                children = (tree.lefts[node], tree.rights[node])
+                if directions[rays, tree.split_axes[node]].mean() > 0.0:
+                    children = children[::-1]
+                pending += [(child, rays) for child in children]
+                continue
+            nearest[rays] = np.minimum(nearest[rays], self.intersect_triangles(origins[rays], directions[rays], node, min_distance))
+
+    def intersect_triangles(self, origins, directions, leaf, min_distance):
+        '''
+        Closest hit of every ray among the triangles of a leaf beyond min_distance, inf for none.
+        Moller-Trumbore test of every ray against every triangle at once, both sides hit.
+        '''
+        triangles = slice(self.tree.starts[leaf], self.tree.ends[leaf])
+        corners, edges_ab, edges_ac = self.corners[triangles], self.edges_ab[triangles], self.edges_ac[triangles]
+        ray_directions = directions[:, np.newaxis, :]
+        normals_ac = np.cross(ray_directions, edges_ac)
+        determinants = np.einsum('tj,rtj->rt', edges_ab, normals_ac)
+        to_origins = origins[:, np.newaxis, :] - corners
+        normals_ab = np.cross(to_origins, edges_ab)
+        #rays parallel to a triangle give infinite or nan coordinates, the tests below reject them
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse_determinants = 1.0 / determinants
+            u = np.einsum('rtj,rtj->rt', to_origins, normals_ac) * inverse_determinants
+            v = np.einsum('rj,rtj->rt', directions, normals_ab) * inverse_determinants
+            distances = np.einsum('tj,rtj->rt', edges_ac, normals_ab) * inverse_determinants
+            hits = (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (distances > min_distance)
+        return np.where(hits, distances, np.inf).min(axis=1)
+
+
+def get_scene_meshes():
+    '''
+    Every visible, non intermediate mesh shape of the scene
+    '''
+    return cmds.ls(type='mesh', noIntermediate=True, visible=True, long=True) or []
+
+
+def get_deformed_meshes(mesh_shapes):
+    '''
+    The mesh shapes with a deformer (skinCluster, blendShape, cluster...) in their history
+    '''
+    #scenes without any deformer skip the history walk of every mesh
+    if not cmds.ls(type='geometryFilter'):
+        return set()
+    return {mesh_shape for mesh_shape in mesh_shapes if cmds.ls(cmds.listHistory(mesh_shape, pruneDagObjects=True) or [], type='geometryFilter')}
+
+
+def is_animated(node):
+    '''
+    Whether a DAG node or one of its parents is animated
+    '''
+    selection = om2.MSelectionList()
+    selection.add(node)
+    return oma.MAnimUtil.isAnimated(selection.getDagPath(0), checkParent=True)
+
+
+def sample_mesh_matrices(mesh_shapes, frames):
+    '''
+    (frames, 4, 4) world matrices of animated meshes and (1, 4, 4) of still ones,
+    still meshes are only sampled on the first frame
+    '''
+    animated = [is_animated(mesh_shape) for mesh_shape in mesh_shapes]
+    moving = [mesh_shape for mesh_shape, moves in zip(mesh_shapes, animated) if moves]
+    still = [mesh_shape for mesh_shape, moves in zip(mesh_shapes, animated) if not moves]
+    moving_matrices = iter(ala_camera_bake.sample_world_matrices(moving, frames) if moving else ())
+    still_matrices = iter(ala_camera_bake.sample_world_matrices(still, frames[:1]) if still else ())
+    return [next(moving_matrices) if moves else next(still_matrices) for moves in animated]
+
+
+def get_camera_rays(camera_transform, camera_shape, frames, screen_point=(0.0, 0.0)):
+    '''
+    World origin and unit direction of the ray through screen_point on every frame,
+    and the depth along the camera axis per unit of ray length (the cosine between
+    the ray and the view axis). screen_point is (-1, -1) at the bottom left and
+    (1, 1) at the top right of the film back, film offsets and overscan are ignored.
+    '''
+    focal_length = get_plug_value(get_plug(camera_shape + '.focalLength'))
+    half_width = get_plug_value(get_plug(camera_shape + '.horizontalFilmAperture')) * MILLIMETERS_PER_INCH / 2.0
+    half_height = get_plug_value(get_plug(camera_shape + '.verticalFilmAperture')) * MILLIMETERS_PER_INCH / 2.0
+    #cameras look down their local -Z axis
+    local_direction = np.array([screen_point[0] * half_width / focal_length, screen_point[1] * half_height / focal_length, -1.0])
+    camera_matrices = ala_camera_bake.sample_world_matrices([camera_transform], frames)[0]
+    #Maya matrices multiply row vectors
+    directions = np.einsum('j,fjk->fk', local_direction, camera_matrices[:, :3, :3])
+    directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+    view_axes = -camera_matrices[:, 2, :3] / np.linalg.norm(camera_matrices[:, 2, :3], axis=1)[:, np.newaxis]
+    return camera_matrices[:, 3, :3], directions, np.einsum('fj,fj->f', directions, view_axes)
+
+
+def raycast(bvhs, mesh_matrices, origins, directions, min_distance=0.0):
+    '''
+    Distance along every ray to the closest hit of any mesh, inf where nothing is hit.
+    mesh_matrices hold one (frames, 4, 4) or (1, 4, 4) world matrix array per BVH.
+    '''
+    nearest = np.full(len(origins), np.inf)
+    homogeneous_origins = np.hstack([origins, np.ones((len(origins), 1))])
+    for bvh, matrices in zip(bvhs, mesh_matrices):
+        #trace in object space, directions are not normalized so hit distances stay in world units
+        inverse_matrices = np.broadcast_to(np.linalg.inv(matrices), (len(origins), 4, 4))
+        local_origins = np.einsum('fj,fjk->fk', homogeneous_origins, inverse_matrices)[:, :3]
+        local_directions = np.einsum('fj,fjk->fk', directions, inverse_matrices[:, :3, :3])
+        bvh.intersect(local_origins, local_directions, nearest, min_distance)
+    return nearest
+
+
+def raycast_deformed(mesh_shapes, frames, origins, directions, min_distance=0.0):
+    '''
+    raycast through deforming meshes on every frame, the BVH of every mesh is
+    refitted to its points evaluated in the frame's context before tracing
+    '''
+    bvhs = [None] * len(mesh_shapes)
+    mesh_matrices = sample_mesh_matrices(mesh_shapes, frames)
+    nearest = np.full(len(origins), np.inf)
+    out_mesh_plugs = [get_plug(mesh_shape + '.outMesh') for mesh_shape in mesh_shapes]
+    for frame_index in ala_camera_bake.frame_contexts(frames):
+        frame_rays = slice(frame_index, frame_index + 1)
+        for position, (plug, matrices) in enumerate(zip(out_mesh_plugs, mesh_matrices)):
+            bvhs[position] = ala_camera_surface.fit_index(TriangleBVH, *ala_camera_surface.read_mesh(plug.asMObject()), bvhs[position])
+            hits = raycast([bvhs[position]], [matrices if len(matrices) == 1 else matrices[frame_rays]],
+                           origins[frame_rays], directions[frame_rays], min_distance)
+            nearest[frame_index] = min(nearest[frame_index], hits[0])
+    return nearest
+
+
+def fill_misses(frames, distances):
+    '''
+    Replace the distances of frames that hit nothing by interpolating the frames that did,
+    None when no frame hit anything
+    '''
+    hits = np.isfinite(distances)
+    if not hits.any():
+        return None
+    return np.interp(frames, frames[hits], distances[hits])
+
+
+def smooth_distances(distances, window):
+    '''
+    Moving average over window frames so the focus does not snap between objects
+    '''
+    if window <= 1:
+        return distances
+    before = window // 2
+    padded = np.pad(distances, (before, window - 1 - before), mode='edge')
+    return np.convolve(padded, np.ones(window) / window, mode='valid')
+
+
+def compute_autofocus_job(camera_transform, frames, screen_point=(0.0, 0.0), mesh_shapes=None, batch_size=DEFAULT_BATCH_SIZE):
+    '''
+    Job steps computing the depth along the camera axis of the surface under screen_point
+    on every frame, inf where nothing is hit. mesh_shapes default to every visible mesh of
+    the scene. Missing BVHs are built and the batches of frames traced in parallel worker
+    threads, deforming meshes are traced frame by frame on the main thread.
+    '''
+    camera_shape = cmds.listRelatives(camera_transform, type="camera", fullPath=True)[0]
+    if mesh_shapes is None:
+        mesh_shapes = get_scene_meshes()
+    deformed = set(get_deformed_meshes(mesh_shapes))
+    rigid_shapes = [mesh_shape for mesh_shape in mesh_shapes if mesh_shape not in deformed]
+    deformed_shapes = [mesh_shape for mesh_shape in mesh_shapes if mesh_shape in deformed]
+    bvhs = yield from ala_camera_surface.mesh_indexes_job([ala_camera_modifier.get_node(mesh_shape) for mesh_shape in rigid_shapes], TriangleBVH)
+    mesh_matrices = sample_mesh_matrices(rigid_shapes, frames)
+    origins, directions, view_cosines = get_camera_rays(camera_transform, camera_shape, frames, screen_point)
+    #hits in front of the near clip plane are not in the picture, the plane is at a depth, not a ray length.
+    #the plane is read in UI units, the rays are traced in cm
+    near_clip = get_plug_value(get_plug(camera_shape + '.nearClipPlane')) * ala_camera_modifier.get_centimeters_per_unit()
+    min_distance = near_clip / view_cosines.max() if len(frames) else near_clip
+    batches = [slice(start, start + batch_size) for start in range(0, len(frames), batch_size)]
+    distances = yield [
+        ala_camera_jobs.work(raycast, bvhs, [matrices if len(matrices) == 1 else matrices[batch] for matrices in mesh_matrices],
+                             origins[batch], directions[batch], min_distance)
+        for batch in batches]
+    distances = np.concatenate(distances) if distances else np.full(len(frames), np.inf)
+    if deformed_shapes:
+        distances = np.minimum(distances, raycast_deformed(deformed_shapes, frames, origins, directions, min_distance))
+    return distances * view_cosines
+
+
+def compute_autofocus(*args, **kwargs):
+    '''
+    Run compute_autofocus_job straight away
+    '''
+    return ala_camera_jobs.run_now(compute_autofocus_job(*args, **kwargs))
+
+
+def bake_autofocus_job(camera_transform, start_frame, end_frame, rig_nodes=(), **options):
+    '''
+    Job baking focusDistance and aiFocusDistance of a camera to the surface under a
+    screen point on every frame. Options: screen_point ((0, 0) is the frame center),
+    smoothing (moving average window in frames), mesh_shapes and batch_size.
+    Frames that hit nothing take the distance of the frames around them.
+    rig_nodes are deleted and anything else driving the attributes is disconnected.
+    Returns the baked distances, None when no frame hit anything.
+    '''
+    camera_shape = cmds.listRelatives(camera_transform, type="camera", fullPath=True)[0]
+    frames = ala_camera_bake.get_frames(start_frame, end_frame)
+    distances = yield from compute_autofocus_job(camera_transform, frames, options.get('screen_point', (0.0, 0.0)),
+                                                 options.get('mesh_shapes'), options.get('batch_size', DEFAULT_BATCH_SIZE))
+    distances = fill_misses(frames, distances)
+    if distances is None:
+        cmds.warning(f"{camera_transform} does not look at any mesh between frames {start_frame} and {end_frame}")
+        return None
+    distances = smooth_distances(distances, options.get('smoothing', 0))
+
+    with ala_camera_modifier.transaction("bakeAutofocus") as bake_transaction:
+        #break the live connections before their rig nodes are deleted
+        ala_camera_bake.disconnect_live_inputs(bake_transaction, camera_shape, AUTOFOCUS_ATTRIBUTES)
+        bake_transaction.delete(rig_nodes)
+        bake_transaction.set_values({camera_shape + ".depthOfField": True, camera_shape + ".aiEnableDOF": True})
+        ala_camera_keys.write_anim_curves({camera_shape + '.' + attribute: (frames, distances) for attribute in AUTOFOCUS_ATTRIBUTES},
+                                          tangent_type='linear')
+    return distances
+
+
+def bake_autofocus(*args, **kwargs):
+    '''
+    Run bake_autofocus_job straight away, returns the baked distances
+    '''
+    return ala_camera_jobs.run_now(bake_autofocus_job(*args, **kwargs))
@@ -0,0 +1,198 @@
+'''
+ala_camera_bake.py
+Bakes DOF rigs down to static anim curves for the render farm.
+Camera and target world positions are sampled over the frame range in
+one pass without moving the current time, the focus distance and the
+clamped f stop are then computed for every frame at once with NumPy.
+Surface bakes measure to the nearest point of the target's mesh instead
+of its pivot, the mesh is treated as rigid over the frame range.
+Baked curves are memoized in ala_camera_focus_cache.py until the camera
+or target animation changes.
+'''
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_focus_cache
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+import ala_camera_surface
+
+MIN_F_STOP = 1.0
+MAX_F_STOP = 64.0
+
+# Frames sampled per step of a bake job
+SAMPLE_CHUNK_FRAMES = 250
+
+BAKED_ATTRIBUTES = ('focusDistance', 'aiFocusDistance', 'fStop')
+
+
+def get_frames(start_frame, end_frame):
+    '''
+    Every whole frame between start and end, both included
+    '''
+    return np.arange(start_frame, end_frame + 1, dtype=np.float64)
+
+
+def get_world_matrix_plugs(nodes):
+    '''
+    worldMatrix[0] plug of every node
+    '''
+    selection = om2.MSelectionList()
+    for node in nodes:
+        selection.add(node)
+    world_matrix_plugs = []
+    for index in range(len(nodes)):
+        node_fn = om2.MFnDependencyNode(selection.getDependNode(index))
+        world_matrix_plugs.append(node_fn.findPlug('worldMatrix', False).elementByLogicalIndex(0))
+    return world_matrix_plugs
+
+
+def frame_contexts(frames):
+    '''
+    Make the DG context of every frame current in turn, yields the frame index.
+    Plugs are evaluated in the frame's context instead of changing the current time.
+    '''
+    time_unit = om2.MTime.uiUnit()
+    for frame_index, frame in enumerate(frames):
+        previous_context = om2.MDGContext(om2.MTime(float(frame), time_unit)).makeCurrent()
+        try:
+            yield frame_index
+        finally:
+            previous_context.makeCurrent()
+
+
+def sample_world_positions(nodes, frames):
+    '''
+    Sample the world position of every node on every frame.
+    Returns an array of shape (len(nodes), len(frames), 3).
+    '''
+    world_matrix_plugs = get_world_matrix_plugs(nodes)
+    positions = np.empty((len(nodes), len(frames), 3))
+    for frame_index in frame_contexts(frames):
+        for node_index, plug in enumerate(world_matrix_plugs):
+            matrix = om2.MFnMatrixData(plug.asMObject()).matrix()
+            positions[node_index, frame_index] = (matrix.getElement(3, 0), matrix.getElement(3, 1), matrix.getElement(3, 2))
+    return positions
+
+
+def sample_world_matrices(nodes, frames):
+    '''
+    Sample the world matrix of every node on every frame.
+    Returns an array of shape (len(nodes), len(frames), 4, 4).
+    '''
+    world_matrix_plugs = get_world_matrix_plugs(nodes)
+    matrices = np.empty((len(nodes), len(frames), 4, 4))
+    for frame_index in frame_contexts(frames):
+        for node_index, plug in enumerate(world_matrix_plugs):
+            matrix = om2.MFnMatrixData(plug.asMObject()).matrix()
+            matrices[node_index, frame_index] = [[matrix.getElement(row, column) for column in range(4)] for row in range(4)]
+    return matrices
+
+
+def sample_plug_values(plug_names, frames):
+    '''
+    Sample "node.attribute" plugs on every frame, in UI units like getAttr.
+    Returns an array of shape (len(plug_names), len(frames)).
+    '''
+    plugs = [ala_camera_modifier.get_plug(plug_name) for plug_name in plug_names]
+    values = np.empty((len(plugs), len(frames)))
+    for frame_index in frame_contexts(frames):
+        for plug_index, plug in enumerate(plugs):
+            values[plug_index, frame_index] = ala_camera_modifier.get_plug_value(plug)
+    return values
+
+
+def compute_focus_curves(camera_positions, target_positions, min_f_stop=MIN_F_STOP, max_f_stop=MAX_F_STOP):
+    '''
+    Focus distance and clamped f stop for every frame of (frames, 3) position arrays
+    '''
+    focus_distances = np.linalg.norm(np.asarray(target_positions) - np.asarray(camera_positions), axis=-1)
+    f_stops = np.clip(focus_distances, min_f_stop, max_f_stop)
+    return focus_distances, f_stops
+
+
+def disconnect_live_inputs(bake_transaction, camera_shape, attributes):
+    '''
+    Queue breaking the incoming connections of a rig so baked curves can drive the attributes
+    '''
+    for attribute in attributes:
+        destination = camera_shape + '.' + attribute
+        for source in cmds.listConnections(destination, source=True, destination=False, plugs=True) or []:
+            #keep anim curves from an earlier bake, their keys get replaced
+            if not cmds.nodeType(source.split('.')[0]).startswith('animCurve'):
+                bake_transaction.disconnect(source, destination)
+
+
+def sample_in_chunks(sample, nodes, frames):
+    '''
+    Job steps running sample(nodes, frames) SAMPLE_CHUNK_FRAMES frames at a time,
+    so Maya stays responsive on long shots. Returns the whole (nodes, frames, ...) array.
+    '''
+    chunks = []
+    #an empty frame range still samples once, so the array has the right shape
+    for start in range(0, max(len(frames), 1), SAMPLE_CHUNK_FRAMES):
+        chunks.append(sample(nodes, frames[start:start + SAMPLE_CHUNK_FRAMES]))
+        yield ala_camera_jobs.progress(min(start + SAMPLE_CHUNK_FRAMES, len(frames)), len(frames), "Sampling frames")
+    return np.concatenate(chunks, axis=1)
+
+
+def focus_curves_job(camera_transform, object_to_focus, frames, mesh_shape=None):
+    '''
+    Job steps sampling the frames and computing the focus distance and f stop of every frame,
+    to the nearest point of mesh_shape when there is one
+    '''
+    if mesh_shape is None:
+        camera_positions, target_positions = yield from sample_in_chunks(sample_world_positions, [camera_transform, object_to_focus], frames)
+        return (yield ala_camera_jobs.work(compute_focus_curves, camera_positions, target_positions))
+    camera_positions = (yield from sample_in_chunks(sample_world_positions, [camera_transform], frames))[0]
+    target_matrices = (yield from sample_in_chunks(sample_world_matrices, [object_to_focus], frames))[0]
+    surface_index, = yield from ala_camera_surface.mesh_indexes_job([ala_camera_modifier.get_node(mesh_shape)], ala_camera_surface.SurfaceIndex)
+    focus_distances = yield ala_camera_jobs.work(ala_camera_surface.surface_distances, camera_positions, target_matrices, surface_index)
+    return focus_distances, np.clip(focus_distances, MIN_F_STOP, MAX_F_STOP)
+
+
+# Ignore R0913/R0917 warnings because the frame range and rig options are all plain values
+def bake_depth_of_field_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        camera_transform, object_to_focus, start_frame, end_frame, rig_nodes=(), surface=False):
+    '''
+    Job baking focusDistance, aiFocusDistance and fStop of a camera to anim curves,
+    see ala_camera_jobs.py. Frames are sampled in chunks, the distances are computed
+    in a worker thread and the curves written in one transaction.
+    rig_nodes are deleted first, anything else still driving those
+    attributes is disconnected so the baked curves replace the live rig.
+    With surface=True the focus is on the nearest point of the object's mesh.
+    '''
+    camera_shape = cmds.listRelatives(camera_transform, type="camera", fullPath=True)[0]
+    frames = get_frames(start_frame, end_frame)
+    mesh_shape = ala_camera_surface.get_mesh_shape(object_to_focus) if surface else None
+    nodes = [camera_transform, object_to_focus]
+    #re-baking an unchanged camera and target reuses the curves of the last bake
+    setup = (camera_transform, object_to_focus, float(start_frame), float(end_frame), mesh_shape)
+    content_hash = ala_camera_focus_cache.get_content_hash(
+        nodes, sample_world_matrices(nodes, frames[:1]), len(frames),
+        mesh_shape and ala_camera_surface.get_mesh_version(ala_camera_modifier.get_node(mesh_shape)))
+    cached = ala_camera_focus_cache.focus_curves.get(setup, content_hash)
+    if cached is None:
+        focus_curves = yield from focus_curves_job(camera_transform, object_to_focus, frames, mesh_shape)
+        cached = ala_camera_focus_cache.focus_curves.put(setup, content_hash, focus_curves)
+    focus_distances, f_stops = cached
+
+    with ala_camera_modifier.transaction("bakeDepthOfField") as bake_transaction:
+        #break the live connections before their rig nodes are deleted
+        disconnect_live_inputs(bake_transaction, camera_shape, BAKED_ATTRIBUTES)
+        bake_transaction.delete(rig_nodes)
+        bake_transaction.set_values({camera_shape + ".depthOfField": True, camera_shape + ".aiEnableDOF": True})
+        ala_camera_keys.write_anim_curves({
+            camera_shape + '.focusDistance': (frames, focus_distances),
+            camera_shape + '.aiFocusDistance': (frames, focus_distances),
+            camera_shape + '.fStop': (frames, f_stops),
+        }, tangent_type='linear')
+    return focus_distances, f_stops
+
+
+def bake_depth_of_field(*args, **kwargs):
+    '''
+    Run bake_depth_of_field_job straight away, returns the baked focus distances and f stops
+    '''
+    return ala_camera_jobs.run_now(bake_depth_of_field_job(*args, **kwargs))
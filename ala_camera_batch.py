@@ -0,0 +1,361 @@
+'''
+ala_camera_batch.py
+Headless batch entry point for the camera tool.
+Applies camera setups to many scene files with a pool of mayapy workers, e.g.
+
+    mayapy ala_camera_batch.py shots/*.mb --alexa --aspect-ratio 16:9 --dof ShotCamera Hero
+
+With --export-dir the per-frame camera data of every scene is exported for
+comp and the farm (ala_camera_export.py), scenes are only saved when an
+operation changed them. Every finished scene is appended to a journal file with a hash
+of the operations, running the same command again after a crash skips the scenes that
+already succeeded. A run with other operations processes every scene again.
+
+With --deliver every camera is rendered or playblasted in every format of its
+delivery set (ala_camera_delivery.py), one pool job per camera and format:
+
+    mayapy ala_camera_batch.py shots/*.mb --deliver render --delivery-dir review --delivery-formats 4:3 16:9
+
+Scenes are only read, the formats are applied as overrides. Workers keep
+the last scene open, so the next job of the same scene starts straight away.
+'''
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import sys
+import time
+from maya import cmds
+import ala_camera_delivery
+import ala_camera_export
+import ala_camera_operations
+
+DEFAULT_JOURNAL = 'ala_camera_batch_journal.jsonl'
+
+# Operations that change the scene, it is saved when one of them is requested
+SCENE_CHANGING_OPERATIONS = ('alexa', 'camera_body', 'aspect_ratio', 'dof', 'delivery_formats')
+
+
+def initialize_maya():
+    '''
+    Start a standalone Maya session in a worker interpreter
+    '''
+    # Ignore C0415 warning because maya.standalone only exists inside mayapy
+    import maya.standalone  # pylint: disable=import-outside-toplevel
+    maya.standalone.initialize(name='python')
+    #nothing is undone in batch mode, skip recording the undo queue
+    cmds.undoInfo(state=False)
+
+
+def apply_operations(operations):
+    '''
+    Apply the camera setups described by operations to the open scene
+    '''
+    cameras = ala_camera_operations.get_scene_cameras(operations.get('cameras'))
+    camera_body = operations.get('camera_body') or ('AlexaLF' if operations.get('alexa') else None)
+    if camera_body and cameras:
+        ala_camera_operations.apply_camera_body([camera_shape for _, camera_shape in cameras], camera_body)
+    if operations.get('aspect_ratio'):
+        ala_camera_operations.set_aspect_ratio(operations['aspect_ratio'])
+    if operations.get('dof'):
+        pairs = [tuple(pair) for pair in operations['dof']]
+        ala_camera_operations.batch_depth_of_field(pairs, use_f_stop=operations.get('dof_f_stop', False))
+    if operations.get('delivery_formats') and cameras:
+        ala_camera_delivery.set_delivery_formats(operations['delivery_formats'], [camera_shape for _, camera_shape in cameras])
+
+
+def process_scene(scene_path, operations):
+    '''
+    Open one scene, apply the operations, save it if they changed it and export its cameras.
+    Returns the status and timing
+    '''
+    start = time.perf_counter()
+    error = None
+    try:
+        cmds.file(scene_path, open=True, force=True)
+        apply_operations(operations)
+        if any(operations.get(operation) for operation in SCENE_CHANGING_OPERATIONS):
+            if operations.get('output_dir'):
+                cmds.file(rename=os.path.join(operations['output_dir'], os.path.basename(scene_path)))
+            cmds.file(save=True, force=True)
+        if operations.get('export_dir'):
+            ala_camera_export.export_scene_cameras(operations['export_dir'], operations.get('cameras'))
+        status = 'ok'
+    # Ignore W0718 warning because one broken scene must not stop the whole batch
+    except Exception as exception:  # pylint: disable=broad-exception-caught
+        status = 'failed'
+        error = str(exception)
+    return {'scene': scene_path, 'status': status, 'seconds': time.perf_counter() - start, 'error': error}
+
+
+def open_scene(scene_path):
+    '''
+    Open a scene unless it is already the open one
+    '''
+    if cmds.file(query=True, sceneName=True) != scene_path:
+        cmds.file(scene_path, open=True, force=True)
+
+
+def get_delivery_job_name(job):
+    '''
+    Journal name of a (scene, camera transform, camera shape, format) delivery job
+    '''
+    scene_path, camera_transform, _, format_name = job
+    return f"{scene_path} {camera_transform.rsplit('|', 1)[-1]} {format_name}"
+
+
+def list_delivery_jobs(scene_path, operations):
+    '''
+    Open a scene and list a (scene, camera transform, camera shape, format) job for every
+    format of every camera, cameras without a delivery set use operations['delivery_formats'].
+    Returns the jobs and the status and timing of the scan
+    '''
+    start = time.perf_counter()
+    jobs = []
+    error = None
+    try:
+        open_scene(scene_path)
+        for camera_transform, camera_shape in ala_camera_operations.get_scene_cameras(operations.get('cameras')):
+            format_names = ala_camera_delivery.get_delivery_formats(camera_shape) or operations.get('delivery_formats') or []
+            jobs.extend((scene_path, camera_transform, camera_shape, format_name) for format_name in format_names)
+        status = 'ok'
+    # Ignore W0718 warning because one broken scene must not stop the whole batch
+    except Exception as exception:  # pylint: disable=broad-exception-caught
+        status = 'failed'
+        error = str(exception)
+    return jobs, {'scene': scene_path, 'status': status, 'seconds': time.perf_counter() - start, 'error': error}
+
+
+def process_delivery(job, operations):
+    '''
+    Render or playblast one camera in one delivery format over the playback range of its scene.
+    Returns the status and timing
+    '''
+    scene_path, camera_transform, camera_shape, format_name = job
+    start = time.perf_counter()
+    error = None
+    try:
+        open_scene(scene_path)
+        output_dir = os.path.join(operations['delivery_dir'], os.path.splitext(os.path.basename(scene_path))[0])
+        ala_camera_delivery.write_delivery(camera_transform, camera_shape, format_name, operations['deliver'], output_dir,
+                                           cmds.playbackOptions(q=True, minTime=True), cmds.playbackOptions(q=True, maxTime=True))
+        status = 'ok'
+    # Ignore W0718 warning because one broken job must not stop the whole batch
+    except Exception as exception:  # pylint: disable=broad-exception-caught
+        status = 'failed'
+        error = str(exception)
+    return {'scene': scene_path, 'job': get_delivery_job_name(job), 'status': status, 'seconds': time.perf_counter() - start,
+            'error': error, 'worker': os.getpid()}
+
+
+def get_operations_key(operations):
+    '''
+    Short hash of the operations of a run, journal entries only count for runs with the same operations
+    '''
+    return hashlib.blake2b(json.dumps(operations, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def read_journal(journal_path, operations_key):
+    '''
+    Get the scenes and delivery jobs an earlier run with the same operations already processed successfully
+    '''
+    done = set()
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                #a crash can leave the last line half written
+                continue
+            if result.get('status') == 'ok' and result.get('operations') == operations_key:
+                done.add(result.get('job', result['scene']))
+    return done
+
+
+def append_journal(journal_path, result, operations_key):
+    '''
+    Record a finished scene, flushed to disk straight away so it survives a crash
+    '''
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        journal.write(json.dumps(dict(result, operations=operations_key)) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def get_skipped_result(scene_path, job_name=None):
+    '''
+    Result of a scene or delivery job skipped because the journal has it done
+    '''
+    result = {'scene': scene_path, 'status': 'skipped', 'seconds': 0.0, 'error': None}
+    if job_name:
+        result['job'] = job_name
+    return result
+
+
+def run_batch(scene_paths, operations, workers=1, journal_path=DEFAULT_JOURNAL, initializer=initialize_maya):
+    '''
+    Process every scene not yet in the journal for the same operations, the others are reported as skipped.
+    workers=0 processes the scenes one by one in this interpreter.
+    '''
+    operations_key = get_operations_key(operations)
+    done = read_journal(journal_path, operations_key)
+    scene_paths = [os.path.abspath(scene_path) for scene_path in scene_paths]
+    pending = [scene_path for scene_path in scene_paths if scene_path not in done]
+    results = [get_skipped_result(scene_path) for scene_path in scene_paths if scene_path in done]
+    if workers <= 0:
+        initializer()
+        for scene_path in pending:
+            result = process_scene(scene_path, operations)
+            append_journal(journal_path, result, operations_key)
+            results.append(result)
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        futures = {pool.submit(process_scene, scene_path, operations): scene_path for scene_path in pending}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+            except concurrent.futures.process.BrokenProcessPool as exception:
+                #a worker died, unfinished scenes are retried by the next run
+                result = {'scene': futures[future], 'status': 'crashed', 'seconds': 0.0, 'error': str(exception)}
+            append_journal(journal_path, result, operations_key)
+            results.append(result)
+    return results
+
+
+def split_done_jobs(jobs, done):
+    '''
+    Delivery jobs still to run, and the skipped results of the jobs the journal has done
+    '''
+    pending = [job for job in jobs if get_delivery_job_name(job) not in done]
+    skipped = [get_skipped_result(job[0], get_delivery_job_name(job)) for job in jobs if get_delivery_job_name(job) in done]
+    return pending, skipped
+
+
+def run_delivery_batch(scene_paths, operations, workers=1, journal_path=DEFAULT_JOURNAL, initializer=initialize_maya):
+    '''
+    Run every delivery job of the scenes not yet in the journal for the same operations.
+    Scenes are scanned for their jobs in the pool too, the jobs of a scene are
+    queued as soon as it is scanned. workers=0 runs everything in this interpreter.
+    '''
+    operations_key = get_operations_key(operations)
+    done = read_journal(journal_path, operations_key)
+    scene_paths = [os.path.abspath(scene_path) for scene_path in scene_paths]
+    results = []
+
+    def record(result):
+        append_journal(journal_path, result, operations_key)
+        results.append(result)
+
+    if workers <= 0:
+        initializer()
+        for scene_path in scene_paths:
+            jobs, scan = list_delivery_jobs(scene_path, operations)
+            if scan['status'] != 'ok':
+                record(scan)
+            pending, skipped = split_done_jobs(jobs, done)
+            results.extend(skipped)
+            for job in pending:
+                record(process_delivery(job, operations))
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        scans = {pool.submit(list_delivery_jobs, scene_path, operations): scene_path for scene_path in scene_paths}
+        deliveries = {}
+        for future in concurrent.futures.as_completed(scans):
+            try:
+                jobs, scan = future.result()
+            except concurrent.futures.process.BrokenProcessPool as exception:
+                jobs, scan = [], {'scene': scans[future], 'status': 'crashed', 'seconds': 0.0, 'error': str(exception)}
+            if scan['status'] != 'ok':
+                record(scan)
+            pending, skipped = split_done_jobs(jobs, done)
+            results.extend(skipped)
+            for job in pending:
+                deliveries[pool.submit(process_delivery, job, operations)] = job
+        for future in concurrent.futures.as_completed(deliveries):
+            try:
+                result = future.result()
+            except concurrent.futures.process.BrokenProcessPool as exception:
+                #a worker died, unfinished jobs are retried by the next run
+                result = {'scene': deliveries[future][0], 'job': get_delivery_job_name(deliveries[future]), 'status': 'crashed',
+                          'seconds': 0.0, 'error': str(exception), 'worker': None}
+            record(result)
+    return results
+
+
+def print_report(results, wall_seconds=None):
+    '''
+    Print the status and timing of every processed or skipped scene or delivery job
+    '''
+    for result in results:
+        worker = f"  worker {result['worker']}" if result.get('worker') else ""
+        print(f"{result['status']:8} {result['seconds']:8.2f}s  {result.get('job', result['scene'])}{worker}")
+        if result['error']:
+            print(f"{'':18}{result['error']}")
+    skipped = [result for result in results if result['status'] == 'skipped']
+    failed = [result for result in results if result['status'] not in ('ok', 'skipped')]
+    total_seconds = sum(result['seconds'] for result in results)
+    wall_time = f" in {wall_seconds:.2f}s" if wall_seconds is not None else ""
+    print(f"{len(results) - len(failed) - len(skipped)} ok, {len(skipped)} skipped as done in the journal, "
+          f"{len(failed)} failed, {total_seconds:.2f}s of job time{wall_time}")
+
+
+def parse_args(argv=None):
+    '''
+    Parse the command line of the batch entry point
+    '''
+    parser = argparse.ArgumentParser(description="Apply camera tool setups to many Maya scenes")
+    parser.add_argument('scenes', nargs='+', help="Maya scene files to process")
+    parser.add_argument('--cameras', help="only touch cameras whose name matches this glob pattern")
+    parser.add_argument('--alexa', action='store_true', help="apply AlexaLF film back settings to the cameras")
+    parser.add_argument('--camera-body', choices=ala_camera_operations.get_camera_bodies(), help="apply a camera body preset to the cameras")
+    parser.add_argument('--aspect-ratio', choices=ala_camera_operations.get_aspect_ratios(), help="set the scene resolution preset")
+    parser.add_argument('--dof', nargs=2, action='append', metavar=('CAMERA', 'TARGET'), help="add a DOF rig, can be repeated")
+    parser.add_argument('--dof-f-stop', action='store_true', help="DOF rigs drive the f stop instead of the focus distance")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of mayapy workers, 0 runs in this process")
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL,
+                        help="journal file used to resume after a crash, only entries of runs with the same operations are skipped")
+    parser.add_argument('--output-dir', help="save the scenes here instead of overwriting them")
+    parser.add_argument('--export-dir', help="export the per-frame lens and transform data of the cameras here")
+    parser.add_argument('--delivery-formats', nargs='+', choices=ala_camera_operations.get_aspect_ratios(), metavar='FORMAT',
+                        help="store this delivery format set on the cameras, with --deliver only for cameras without a set")
+    parser.add_argument('--deliver', choices=ala_camera_delivery.OUTPUT_TYPES,
+                        help="render or playblast every camera in every format of its delivery set instead of changing the scenes")
+    parser.add_argument('--delivery-dir', default='deliveries', help="folder of the renders and playblasts, one subfolder per scene")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''
+    Run the batch from the command line, returns the process exit code
+    '''
+    args = parse_args(argv)
+    operations = {
+        'cameras': args.cameras,
+        'alexa': args.alexa,
+        'camera_body': args.camera_body,
+        'aspect_ratio': args.aspect_ratio,
+        'dof': args.dof or [],
+        'dof_f_stop': args.dof_f_stop,
+        'output_dir': args.output_dir,
+        'export_dir': args.export_dir,
+        'delivery_formats': args.delivery_formats or [],
+        'deliver': args.deliver,
+        'delivery_dir': os.path.abspath(args.delivery_dir),
+    }
+    start = time.perf_counter()
+    if args.deliver:
+        #the delivery formats only fill in cameras without a set, the scenes are not changed
+        results = run_delivery_batch(args.scenes, operations, args.workers, args.journal)
+    else:
+        results = run_batch(args.scenes, operations, args.workers, args.journal)
+    print_report(results, time.perf_counter() - start)
+    return 0 if all(result['status'] in ('ok', 'skipped') for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+'''
+ala_camera_benchmarks.py
+Benchmarks for the camera tool that need a real Maya session.
+Run inside Maya or headless with: mayapy ala_camera_benchmarks.py
+'''
+import json
+import time
+from maya import cmds
+import ala_camera_keys
+import ala_camera_operations
+import ala_camera_turntable
+
+
+def build_animated_pairs(rig_count, frame_count):
+    '''
+    Create camera/target pairs where every camera dollies towards its target
+    '''
+    pairs = []
+    for index in range(rig_count):
+        camera_transform = cmds.camera(n=f"benchCamera{index}")[0]
+        target = cmds.spaceLocator(n=f"benchTarget{index}")[0]
+        cmds.setAttr(camera_transform + '.translateX', index * 10)
+        cmds.setAttr(target + '.translate', index * 10, 0, -frame_count - 50, type='double3')
+        cmds.setKeyframe(camera_transform, attribute='translateZ', time=1, value=0)
+        cmds.setKeyframe(camera_transform, attribute='translateZ', time=frame_count, value=-frame_count)
+        pairs.append((camera_transform, target))
+    return pairs
+
+
+def build_legacy_rigs(pairs):
+    '''
+    Build the distanceDimension + 2 locators rig for every pair
+    '''
+    positions = ala_camera_operations.get_world_positions([node for pair in pairs for node in pair])
+    camera_shapes = []
+    for index, (camera_transform, _) in enumerate(pairs):
+        camera_shape = cmds.listRelatives(camera_transform, type="camera", fullPath=True)[0]
+        dist_dimension_shape = ala_camera_operations.create_distance_rig(camera_transform, positions[index * 2], positions[index * 2 + 1])
+        cmds.connectAttr(dist_dimension_shape + '.distance', camera_shape + '.focusDistance')
+        camera_shapes.append(camera_shape)
+    return camera_shapes
+
+
+def time_playback(camera_shapes, frame_count):
+    '''
+    Average seconds spent evaluating the focus distance of every camera per frame
+    '''
+    start = time.perf_counter()
+    for frame in range(1, frame_count + 1):
+        cmds.currentTime(frame)
+        for camera_shape in camera_shapes:
+            cmds.getAttr(camera_shape + '.focusDistance')
+    return (time.perf_counter() - start) / frame_count
+
+
+def benchmark_focus_rig_evaluation(rig_count=50, frame_count=200):
+    '''
+    Compare the per frame cost of the distanceDimension rig and the alaFocusDistance node
+    '''
+    cmds.file(new=True, force=True)
+    camera_shapes = build_legacy_rigs(build_animated_pairs(rig_count, frame_count))
+    legacy_seconds = time_playback(camera_shapes, frame_count)
+
+    cmds.file(new=True, force=True)
+    rigs = ala_camera_operations.batch_depth_of_field(build_animated_pairs(rig_count, frame_count))
+    node_seconds = time_playback([camera_shape for camera_shape, _ in rigs], frame_count)
+
+    return {
+        'rig_count': rig_count,
+        'frame_count': frame_count,
+        'distance_dimension_seconds_per_frame': legacy_seconds,
+        'focus_node_seconds_per_frame': node_seconds,
+    }
+
+
+def benchmark_keyframe_writer(key_count=5000):
+    '''
+    Compare keying with currentTime + setKeyframe against the bulk anim curve writer
+    '''
+    cmds.file(new=True, force=True)
+    scrubbed_camera = cmds.camera(n="scrubbedCamera")[0]
+    start = time.perf_counter()
+    for frame in range(key_count):
+        cmds.currentTime(frame)
+        cmds.setKeyframe(scrubbed_camera, attribute='rotateY', value=frame % 360, inTangentType="spline", outTangentType="spline")
+    scrubbed_seconds = time.perf_counter() - start
+
+    bulk_camera = cmds.camera(n="bulkCamera")[0]
+    start = time.perf_counter()
+    ala_camera_keys.write_anim_curves({
+        bulk_camera + '.rotateY': (range(key_count), [frame % 360 for frame in range(key_count)]),
+    })
+    bulk_seconds = time.perf_counter() - start
+
+    return {
+        'key_count': key_count,
+        'scrubbed_seconds': scrubbed_seconds,
+        'bulk_seconds': bulk_seconds,
+    }
+
+
+def benchmark_turntable_keys(object_count=100, frame_count=240):
+    '''
+    Baked turntable keys written per second for a library of objects
+    '''
+    cmds.file(new=True, force=True)
+    objects = [cmds.polyCube(n=f"benchAsset{index}")[0] for index in range(object_count)]
+    for index, obj in enumerate(objects):
+        cmds.setAttr(obj + '.translateX', index * 10)
+    start = time.perf_counter()
+    ala_camera_turntable.bake_turntables(objects, frame_count=frame_count)
+    seconds = time.perf_counter() - start
+    key_count = object_count * frame_count * (len(ala_camera_turntable.TRANSLATE_ATTRIBUTES) + len(ala_camera_turntable.ROTATE_ATTRIBUTES))
+    return {
+        'object_count': object_count,
+        'frame_count': frame_count,
+        'seconds': seconds,
+        'keys_per_second': key_count / seconds,
+    }
+
+
+if __name__ == '__main__':
+    import maya.standalone
+    maya.standalone.initialize()
+    print(json.dumps({
+        'focus_rig_evaluation': benchmark_focus_rig_evaluation(),
+        'keyframe_writer': benchmark_keyframe_writer(),
+        'turntable_keys': benchmark_turntable_keys(),
+    }, indent=4))
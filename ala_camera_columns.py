@@ -0,0 +1,139 @@
+'''
+ala_camera_columns.py
+Binary columnar files for per-frame camera data, needs NumPy only so comp
+and farm scripts can read them without Maya.
+
+A file is an 8 byte magic, the length of a JSON header as a little endian
+uint32, the header and the columns. Every column is one C ordered array
+with one row per frame, starting on a 64 byte boundary, so a column is
+memory-mapped straight from its offset without reading anything else:
+
+    columns = ala_camera_columns.ColumnFile('shot010.alacam')
+    focal_lengths = columns.camera_column('focalLength', 'shotCam')
+
+Writers know the row count up front and fill the rows in chunks, so files
+of any length are written in bounded memory.
+'''
+import json
+import struct
+import numpy as np
+
+MAGIC = b'ALACOLS1'
+FORMAT_VERSION = 1
+# Column data starts on multiples of this many bytes
+ALIGNMENT = 64
+HEADER_LENGTH = struct.Struct('<I')
+
+
+def align(offset):
+    '''
+    Round an offset up to the next multiple of ALIGNMENT
+    '''
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class ColumnWriter():
+    '''
+    Write a columnar file chunk by chunk.
+    columns maps a name to (dtype, row shape), e.g. {'worldMatrix': ('<f8', (cameras, 4, 4))},
+    metadata is stored in the header as it is and must be JSON serializable.
+    '''
+    def __init__(self, path, columns, row_count, metadata=None):
+        self.row_count = row_count
+        self.columns = {}
+        header_columns = []
+        offset = 0
+        for name, (dtype, row_shape) in columns.items():
+            #little endian on disk whatever the machine writing it
+            dtype = np.dtype(dtype).newbyteorder('<')
+            shape = (row_count,) + tuple(row_shape)
+            self.columns[name] = (dtype, shape, offset)
+            header_columns.append({'name': name, 'dtype': dtype.str, 'shape': list(shape), 'offset': offset})
+            offset = align(offset + dtype.itemsize * int(np.prod(shape)))
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'row_count': row_count,
+            'columns': header_columns,
+            'metadata': metadata or {},
+        }).encode('utf-8')
+        #column offsets are relative to the data start, so they do not depend on the header length
+        self.data_start = align(len(MAGIC) + HEADER_LENGTH.size + len(header))
+        # Ignore R1732 warning because the file stays open until close() or the end of the with block
+        self.file = open(path, 'wb')  # pylint: disable=consider-using-with
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+        #reserve the whole file, rows that are never written read as zeros
+        self.file.truncate(self.data_start + offset)
+
+    def write(self, start_row, chunk):
+        '''
+        Write rows start_row onwards of some or all columns, chunk maps names to arrays
+        '''
+        for name, values in chunk.items():
+            dtype, shape, offset = self.columns[name]
+            values = np.ascontiguousarray(values, dtype=dtype)
+            if values.shape[1:] != shape[1:] or start_row + len(values) > shape[0]:
+                raise ValueError(f"Rows {start_row}-{start_row + len(values)} of shape {values.shape[1:]} do not fit column {name} {shape}")
+            row_bytes = values.itemsize * int(np.prod(shape[1:]))
+            self.file.seek(self.data_start + offset + start_row * row_bytes)
+            self.file.write(memoryview(values).cast('B'))
+
+    def close(self):
+        '''
+        Flush and close the file
+        '''
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exception):
+        self.close()
+
+
+class ColumnFile():
+    '''
+    Read a columnar file, only the header is parsed when it is opened and
+    every column is memory-mapped on first use
+    '''
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as column_file:
+            magic = column_file.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a camera column file")
+            header_length, = HEADER_LENGTH.unpack(column_file.read(HEADER_LENGTH.size))
+            header = json.loads(column_file.read(header_length).decode('utf-8'))
+        if header['version'] > FORMAT_VERSION:
+            raise ValueError(f"{path} was written by a newer version ({header['version']}) of the format")
+        self.data_start = align(len(MAGIC) + HEADER_LENGTH.size + header_length)
+        self.row_count = header['row_count']
+        self.metadata = header['metadata']
+        self.column_specs = {column['name']: column for column in header['columns']}
+        self.mapped_columns = {}
+
+    @property
+    def names(self):
+        '''
+        Names of the columns in file order
+        '''
+        return list(self.column_specs)
+
+    def column(self, name):
+        '''
+        Read-only memory-mapped array of a column, pages are only read when they are accessed
+        '''
+        if name not in self.mapped_columns:
+            spec = self.column_specs[name]
+            self.mapped_columns[name] = np.memmap(self.path, dtype=np.dtype(spec['dtype']), mode='r',
+                                                  offset=self.data_start + spec['offset'], shape=tuple(spec['shape']))
+        return self.mapped_columns[name]
+
+    def camera_column(self, name, camera):
+        '''
+        Values of one camera in a per camera column, cameras are listed in metadata['cameras']
+        and matched by their full path or short name
+        '''
+        cameras = self.metadata['cameras']
+        short_names = [path.rsplit('|', 1)[-1] for path in cameras]
+        index = cameras.index(camera) if camera in cameras else short_names.index(camera)
+        return self.column(name)[:, index]
@@ -0,0 +1,130 @@
+'''
+ala_camera_delivery.py
+Delivery format sets: every camera carries the delivery formats its shot is
+checked in (e.g. 4:3, 16:9, 16:10 and 3:2) on its shape, so the set travels
+with the scene. A format is applied as a temporary override of the render
+resolution and the camera's film fit, the previous values are written back
+when the override ends, so rendering every format never changes the scene.
+Overrides are not recorded by undo, they leave nothing to undo.
+ala_camera_batch.py renders or playblasts every camera in every format of its
+set with a pool of mayapy workers, one job per camera and format.
+'''
+import contextlib
+import json
+import os
+import re
+from maya import cmds
+import ala_camera_modifier
+import ala_camera_operations
+import ala_camera_presets
+from ala_camera_modifier import get_plug, get_plug_value
+
+# Camera shape attribute holding the JSON list of delivery format names
+DELIVERY_ATTRIBUTE = 'alaDeliveryFormats'
+
+OUTPUT_TYPES = ('render', 'playblast')
+
+# filmFit values of the camera shape, delivery format presets pick one with "film_fit"
+FILM_FITS = {'fill': 0, 'horizontal': 1, 'vertical': 2, 'overscan': 3}
+DEFAULT_FILM_FIT = 'fill'
+
+
+def get_delivery_formats(camera_shape):
+    '''
+    Delivery format names stored on a camera, empty when it has no set
+    '''
+    if not cmds.attributeQuery(DELIVERY_ATTRIBUTE, node=camera_shape, exists=True):
+        return []
+    return json.loads(cmds.getAttr(camera_shape + '.' + DELIVERY_ATTRIBUTE) or '[]')
+
+
+def set_delivery_formats(format_names, camera_shapes=None):
+    '''
+    Store a set of delivery formats on one or many cameras (every selected camera by default)
+    in one undo step, returns {camera shape: format names}
+    '''
+    format_names = list(dict.fromkeys(format_names))
+    for format_name in format_names:
+        #unknown names fail before anything is written
+        ala_camera_presets.registry.delivery_format(format_name)
+    camera_shapes = ala_camera_operations.get_camera_shapes(camera_shapes)
+    with ala_camera_modifier.transaction("setDeliveryFormats"):
+        for camera_shape in camera_shapes:
+            if not cmds.attributeQuery(DELIVERY_ATTRIBUTE, node=camera_shape, exists=True):
+                cmds.addAttr(camera_shape, longName=DELIVERY_ATTRIBUTE, dataType='string')
+            cmds.setAttr(camera_shape + '.' + DELIVERY_ATTRIBUTE, json.dumps(format_names), type='string')
+    return {camera_shape: format_names for camera_shape in camera_shapes}
+
+
+def get_format_values(camera_shape, format_name):
+    '''
+    {"node.attribute": value} a delivery format sets on the render resolution and a camera
+    '''
+    delivery_format = ala_camera_presets.registry.delivery_format(format_name)
+    values = {'defaultResolution.' + attribute: value for attribute, value in delivery_format['attributes'].items()}
+    values[camera_shape + '.filmFit'] = FILM_FITS[delivery_format.get('film_fit', DEFAULT_FILM_FIT)]
+    return values
+
+
+@contextlib.contextmanager
+def delivery_override(camera_shape, format_name):
+    '''
+    Apply a delivery format to the render resolution and a camera inside a with block, e.g.
+
+        with delivery_override(camera_shape, '4:3'):
+            cmds.render(camera_transform)
+
+    Yields the values written, the previous values are written back afterwards.
+    Neither write is recorded by undo.
+    '''
+    values = get_format_values(camera_shape, format_name)
+    previous_values = {plug_name: get_plug_value(get_plug(plug_name)) for plug_name in values}
+    with ala_camera_modifier.undo_suspended():
+        ala_camera_modifier.commit_values(values)
+    try:
+        yield values
+    finally:
+        with ala_camera_modifier.undo_suspended():
+            ala_camera_modifier.commit_values(previous_values)
+
+
+def get_output_name(camera_transform, format_name):
+    '''
+    File name prefix of a camera in a delivery format, e.g. shotCam_16_9
+    '''
+    return camera_transform.rsplit('|', 1)[-1] + '_' + re.sub(r'[^A-Za-z0-9]+', '_', format_name).strip('_')
+
+
+# Ignore R0913/R0917 warnings because the camera, format, output and frame range are all plain values
+def write_delivery(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        camera_transform, camera_shape, format_name, output_type, output_dir, start_frame, end_frame):
+    '''
+    Render or playblast a camera in a delivery format to output_dir/<camera>_<format>,
+    returns the output path prefix. Renders use the scene's image format, playblasts
+    need a viewport to look through the camera, it looks through its previous camera again afterwards.
+    '''
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, get_output_name(camera_transform, format_name))
+    with delivery_override(camera_shape, format_name) as values:
+        resolution = (int(values['defaultResolution.width']), int(values['defaultResolution.height']))
+        if output_type == 'playblast':
+            previous_camera = cmds.lookThru(query=True)
+            cmds.lookThru(camera_transform)
+            try:
+                cmds.playblast(filename=prefix, format='image', startTime=start_frame, endTime=end_frame, widthHeight=resolution,
+                               percent=100, viewer=False, showOrnaments=False, offScreen=True, forceOverwrite=True)
+            finally:
+                if previous_camera:
+                    cmds.lookThru(previous_camera)
+            return prefix
+        previous_prefix = cmds.getAttr('defaultRenderGlobals.imageFilePrefix')
+        with ala_camera_modifier.undo_suspended():
+            cmds.setAttr('defaultRenderGlobals.imageFilePrefix', prefix, type='string')
+        try:
+            for frame in range(int(start_frame), int(end_frame) + 1):
+                cmds.currentTime(frame)
+                cmds.render(camera_transform, x=resolution[0], y=resolution[1])
+        finally:
+            with ala_camera_modifier.undo_suspended():
+                cmds.setAttr('defaultRenderGlobals.imageFilePrefix', previous_prefix or '', type='string')
+    return prefix
@@ -0,0 +1,90 @@
+'''
+ala_camera_export.py
+Exports per-frame lens and transform data of shot cameras to the columnar
+files of ala_camera_columns.py for comp and the render farm.
+Frames are sampled in chunks through DG contexts without moving the current
+time, and every chunk is written out before the next one is sampled, so
+memory stays bounded by the chunk size whatever the shot length.
+'''
+import os
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_bake
+import ala_camera_columns
+import ala_camera_operations
+from ala_camera_modifier import get_plug, get_plug_value
+
+# Camera attributes exported for every frame, in scene UI units
+LENS_COLUMNS = ('focalLength', 'focusDistance', 'fStop', 'horizontalFilmAperture', 'verticalFilmAperture')
+LENS_DTYPE = '<f4'
+# World matrices keep double precision so large set coordinates do not jitter
+MATRIX_DTYPE = '<f8'
+
+# Frames sampled and written at once
+DEFAULT_CHUNK_FRAMES = 500
+
+EXPORT_EXTENSION = '.alacam'
+
+
+def get_export_columns(camera_count):
+    '''
+    Column specs of an export, see ala_camera_columns.ColumnWriter
+    '''
+    columns = {'frame': ('<f8', ())}
+    columns.update({attribute: (LENS_DTYPE, (camera_count,)) for attribute in LENS_COLUMNS})
+    columns['worldMatrix'] = (MATRIX_DTYPE, (camera_count, 4, 4))
+    return columns
+
+
+def sample_chunk(frames, lens_plugs, world_matrix_plugs):
+    '''
+    Lens values (frames, cameras, attributes) and world matrices (frames, cameras, 4, 4) of a chunk of frames
+    '''
+    lens_values = np.empty((len(frames), len(world_matrix_plugs), len(LENS_COLUMNS)))
+    matrices = np.empty((len(frames), len(world_matrix_plugs), 4, 4))
+    for frame_index in ala_camera_bake.frame_contexts(frames):
+        for camera_index, (camera_plugs, plug) in enumerate(zip(lens_plugs, world_matrix_plugs)):
+            lens_values[frame_index, camera_index] = [get_plug_value(lens_plug) for lens_plug in camera_plugs]
+            matrix = om2.MFnMatrixData(plug.asMObject()).matrix()
+            matrices[frame_index, camera_index] = [[matrix.getElement(row, column) for column in range(4)] for row in range(4)]
+    return lens_values, matrices
+
+
+def export_cameras(path, cameras, start_frame, end_frame, chunk_frames=DEFAULT_CHUNK_FRAMES):
+    '''
+    Export the lens values and world matrix of (transform, shape) cameras on every
+    frame between start and end. Returns the number of frames written.
+    '''
+    frames = ala_camera_bake.get_frames(start_frame, end_frame)
+    camera_transforms = [camera_transform for camera_transform, _ in cameras]
+    lens_plugs = [[get_plug(camera_shape + '.' + attribute) for attribute in LENS_COLUMNS] for _, camera_shape in cameras]
+    world_matrix_plugs = ala_camera_bake.get_world_matrix_plugs(camera_transforms)
+    metadata = {
+        'scene': cmds.file(query=True, sceneName=True),
+        'cameras': camera_transforms,
+        'start_frame': float(start_frame),
+        'end_frame': float(end_frame),
+        'linear_unit': cmds.currentUnit(query=True, linear=True),
+        'time_unit': cmds.currentUnit(query=True, time=True),
+    }
+    with ala_camera_columns.ColumnWriter(path, get_export_columns(len(cameras)), len(frames), metadata) as writer:
+        for chunk_start in range(0, len(frames), chunk_frames):
+            chunk = frames[chunk_start:chunk_start + chunk_frames]
+            lens_values, matrices = sample_chunk(chunk, lens_plugs, world_matrix_plugs)
+            columns = {'frame': chunk, 'worldMatrix': matrices}
+            columns.update({attribute: lens_values[:, :, index] for index, attribute in enumerate(LENS_COLUMNS)})
+            writer.write(chunk_start, columns)
+    return len(frames)
+
+
+def export_scene_cameras(export_dir, name_pattern=None, chunk_frames=DEFAULT_CHUNK_FRAMES):
+    '''
+    Export every non default camera of the open scene over the playback range
+    to <export_dir>/<scene name>.alacam, returns the file path
+    '''
+    scene_name = os.path.splitext(os.path.basename(cmds.file(query=True, sceneName=True)))[0] or 'untitled'
+    path = os.path.join(export_dir, scene_name + EXPORT_EXTENSION)
+    export_cameras(path, ala_camera_operations.get_scene_cameras(name_pattern),
+                   cmds.playbackOptions(q=True, minTime=True), cmds.playbackOptions(q=True, maxTime=True), chunk_frames)
+    return path
@@ -0,0 +1,150 @@
+'''
+ala_camera_focus_cache.py
+Memoized focus curves for DOF bakes, so re-baking a camera/target pair that
+has not changed skips sampling the scene and computing the distances.
+Entries are keyed by the camera, target, frame range and surface mesh, and
+hold a content hash of what moves the two transforms: the keys, tangents
+and infinity of every anim curve on them and their parents, and their
+world matrices on the first frame for everything that is not animated.
+A bake whose hash no longer matches drops the stale entry, and the least
+recently used entries are evicted once the cache outgrows its budget.
+Transforms driven by anything but time anim curves (constraints,
+expressions, rigs) are never cached.
+'''
+import collections
+import hashlib
+import numpy as np
+from maya import cmds
+
+DEFAULT_BUDGET_MEGABYTES = 64
+
+# Attributes that move a transform, matched by prefix (translateX, rotatePivot, scaleZ...)
+TRANSFORM_ATTRIBUTE_PREFIXES = ('translate', 'rotate', 'scale', 'shear', 'offsetParentMatrix', 'inheritsTransform')
+
+# keyTangent flags queried one at a time for the curve hash
+TANGENT_FLAGS = ('inTangentType', 'outTangentType', 'inAngle', 'outAngle', 'inWeight', 'outWeight')
+
+
+class FocusCurveCache():
+    '''
+    LRU cache of (focus distances, f stops) arrays with a memory budget.
+    Setups map to (content hash, arrays), a setup whose hash changed is a miss.
+    '''
+    def __init__(self, budget_megabytes=DEFAULT_BUDGET_MEGABYTES):
+        self.budget_bytes = int(budget_megabytes * 1024 * 1024)
+        self.entries = collections.OrderedDict()
+        self.size_bytes = 0
+        self.stats = collections.Counter(hits=0, misses=0, invalidated=0, evicted=0, uncacheable=0)
+
+    def get(self, setup, content_hash):
+        '''
+        Cached arrays of a setup, None unless its content hash still matches
+        '''
+        if content_hash is None:
+            self.stats['uncacheable'] += 1
+            return None
+        entry = self.entries.get(setup)
+        if entry is not None and entry[0] != content_hash:
+            #the animation changed since the setup was baked
+            self.remove(setup)
+            self.stats['invalidated'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(setup)
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def put(self, setup, content_hash, arrays):
+        '''
+        Store the arrays of a setup as read-only copies, returns them
+        '''
+        if content_hash is None:
+            return arrays
+        arrays = tuple(np.array(array, dtype=np.float64) for array in arrays)
+        for array in arrays:
+            array.setflags(write=False)
+        self.remove(setup)
+        self.entries[setup] = (content_hash, arrays)
+        self.size_bytes += sum(array.nbytes for array in arrays)
+        #the newest entry always stays, even when it is over the budget on its own
+        while self.size_bytes > self.budget_bytes and len(self.entries) > 1:
+            self.remove(next(iter(self.entries)))
+            self.stats['evicted'] += 1
+        return arrays
+
+    def remove(self, setup):
+        '''
+        Drop the entry of a setup if there is one
+        '''
+        entry = self.entries.pop(setup, None)
+        if entry is not None:
+            self.size_bytes -= sum(array.nbytes for array in entry[1])
+
+    def clear(self):
+        '''
+        Drop every entry, the stats are kept
+        '''
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def format_stats(self):
+        '''
+        One line summary of the cache for the tool window
+        '''
+        stats = self.stats
+        return (f"Focus cache: {stats['hits']} hits, {stats['misses']} misses ({stats['invalidated']} after an animation change), "
+                f"{len(self.entries)} bakes in {self.size_bytes / (1024 * 1024):.1f}/{self.budget_bytes / (1024 * 1024):.0f} MB")
+
+
+# Focus curves of the DOF bakes of the session
+focus_curves = FocusCurveCache()
+
+
+def hash_anim_curve(curve, digest):
+    '''
+    Add the keys, tangents and infinity of an anim curve to a hash
+    '''
+    digest.update(repr(cmds.keyframe(curve, query=True, timeChange=True, valueChange=True)).encode('utf-8'))
+    for flag in TANGENT_FLAGS:
+        digest.update(repr(cmds.keyTangent(curve, query=True, **{flag: True})).encode('utf-8'))
+    digest.update(repr(cmds.setInfinity(curve, query=True, preInfinite=True, postInfinite=True)).encode('utf-8'))
+
+
+def hash_transform_animation(node, digest):
+    '''
+    Add the anim curves moving a transform or its parents to a hash.
+    Returns False when something other than a time anim curve moves them.
+    '''
+    long_name = cmds.ls(node, long=True)[0]
+    parts = long_name.split('|')
+    #|group|child -> |group, |group|child
+    for depth in range(2, len(parts) + 1):
+        path = '|'.join(parts[:depth])
+        digest.update(path.encode('utf-8'))
+        connections = cmds.listConnections(path, source=True, destination=False, connections=True, plugs=True) or []
+        for destination, source in zip(connections[::2], connections[1::2]):
+            if not destination.split('.', 1)[1].startswith(TRANSFORM_ATTRIBUTE_PREFIXES):
+                continue
+            source_node = source.split('.', 1)[0]
+            if not cmds.nodeType(source_node).startswith('animCurveT'):
+                return False
+            digest.update(destination.split('.', 1)[1].encode('utf-8'))
+            hash_anim_curve(source_node, digest)
+    return True
+
+
+def get_content_hash(nodes, first_frame_matrices, *extra):
+    '''
+    Hash of the animation moving the nodes, None when it cannot be hashed.
+    first_frame_matrices are the world matrices of the nodes on the first frame,
+    every static value of the transforms and their parents shows in them.
+    extra values such as a mesh version are hashed as well.
+    '''
+    digest = hashlib.blake2b(repr(extra).encode('utf-8'))
+    for node in nodes:
+        if not hash_transform_animation(node, digest):
+            return None
+    digest.update(np.ascontiguousarray(first_frame_matrices, dtype=np.float64).tobytes())
+    return digest.hexdigest()
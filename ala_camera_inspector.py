@@ -0,0 +1,109 @@
+'''
+ala_camera_inspector.py
+Live view of the lens settings of the selected camera for the Camera Tool window.
+Maya callbacks only ask for a refresh, the window debounces the requests so
+a burst of events (scrubbing, box-selecting hundreds of nodes) becomes one
+refresh once it settles. A refresh reads only the shown attributes of the
+first selected camera through OpenMaya. Attribute callbacks are registered
+on the inspected camera alone, stop() removes every callback.
+'''
+import collections
+from maya.api import OpenMaya as om2
+from ala_camera_modifier import get_plug_value
+
+# Camera shape attributes shown by the inspector
+INSPECTED_ATTRIBUTES = ('focalLength', 'locatorScale', 'fStop', 'focusDistance', 'depthOfField')
+
+
+def find_selected_camera():
+    '''
+    MDagPath of the camera shape of the first selected camera, None without one
+    '''
+    selection = om2.MGlobal.getActiveSelectionList()
+    for index in range(selection.length()):
+        try:
+            path = selection.getDagPath(index)
+            #a camera transform is inspected through its shape
+            path.extendToShape()
+        except RuntimeError:
+            #DG nodes and transforms without a single shape
+            continue
+        if path.apiType() == om2.MFn.kCamera:
+            return path
+    return None
+
+
+class CameraInspector():
+    '''
+    Values of the shown attributes on the selected camera.
+    schedule() is called on every selection change and every change of a shown
+    attribute, the caller debounces it and calls refresh() once events settle.
+    '''
+    def __init__(self, schedule, attributes=INSPECTED_ATTRIBUTES):
+        self.schedule = schedule
+        self.attributes = attributes
+        self.camera_name = None
+        self.plugs = {}
+        self.selection_callback = None
+        self.camera_callback = None
+        self.stats = collections.Counter(events=0, refreshes=0)
+
+    def start(self):
+        '''
+        Listen to selection changes and schedule a first refresh
+        '''
+        if self.selection_callback is None:
+            self.selection_callback = om2.MEventMessage.addEventCallback('SelectionChanged', self.on_selection_changed)
+        self.on_selection_changed()
+
+    def stop(self):
+        '''
+        Remove every callback, the inspector costs nothing until started again
+        '''
+        if self.selection_callback is not None:
+            om2.MMessage.removeCallback(self.selection_callback)
+            self.selection_callback = None
+        self.watch(None)
+
+    def on_selection_changed(self, _client_data=None):
+        '''
+        Selection callback, the new selection is only read by the refresh
+        '''
+        self.stats['events'] += 1
+        self.schedule()
+
+    def on_camera_dirty(self, _node, plug, _client_data=None):
+        '''
+        Dirty plug callback of the inspected camera, other attributes are ignored
+        '''
+        if plug.partialName(useLongNames=True) in self.attributes:
+            self.stats['events'] += 1
+            self.schedule()
+
+    def watch(self, camera):
+        '''
+        Move the attribute callback and plugs to another camera shape MDagPath, None for no camera
+        '''
+        if self.camera_callback is not None:
+            om2.MMessage.removeCallback(self.camera_callback)
+            self.camera_callback = None
+        self.camera_name = None
+        self.plugs = {}
+        if camera is None:
+            return
+        camera_object = camera.node()
+        node_fn = om2.MFnDependencyNode(camera_object)
+        self.camera_name = camera.partialPathName()
+        self.plugs = {attribute: node_fn.findPlug(attribute, False) for attribute in self.attributes}
+        self.camera_callback = om2.MNodeMessage.addNodeDirtyPlugCallback(camera_object, self.on_camera_dirty)
+
+    def refresh(self):
+        '''
+        Read the shown attributes of the selected camera, returns {attribute: value}, empty without a camera
+        '''
+        self.stats['refreshes'] += 1
+        camera = find_selected_camera()
+        camera_name = None if camera is None else camera.partialPathName()
+        if camera_name != self.camera_name:
+            self.watch(camera)
+        return {attribute: get_plug_value(plug) for attribute, plug in self.plugs.items()}
@@ -0,0 +1,311 @@
+'''
+ala_camera_jobs.py
+Background jobs for long camera tool actions, so the Camera Tool window keeps
+redrawing, shows progress and can be cancelled while a bake runs.
+A job is a generator. Its scene reads and writes run on Maya's main thread,
+pure computation (NumPy maths, file parsing) is yielded as work() to run in
+a thread pool and its result is sent back into the generator:
+
+    def bake_job(camera_transform):
+        positions = sample_positions(camera_transform)        #main thread
+        distances = yield work(compute_distances, positions)  #worker thread
+        for batch in split(distances):
+            write_keys(batch)                                 #main thread
+            yield progress(done, total, "Writing keys")
+
+Every step is queued with maya.utils.executeDeferred, so Maya handles its
+events between steps and a cancelled job stops before its next step.
+Jobs never yield inside a transaction, every batch of writes is committed
+before the job hands back control. The batches are recorded on the job's
+JobCommits and reach the undo queue as one step once the job ends, a failed
+job reverts only what it wrote. Steps of a job submitted by a profiled
+tool action are profiled under that action. run_now() runs the same generator
+synchronously for scripts and batch mode.
+'''
+import collections
+import concurrent.futures
+import os
+import contextlib
+import time
+import maya.utils
+from maya import cmds
+import ala_camera_modifier
+import ala_camera_profiler
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Finished jobs kept for the timing report
+MAX_FINISHED_JOBS = 20
+
+FINISHED_STATES = ('done', 'cancelled', 'failed')
+
+Work = collections.namedtuple('Work', ('function', 'args', 'kwargs'))
+Progress = collections.namedtuple('Progress', ('done', 'total', 'message'))
+
+
+def work(function, *args, **kwargs):
+    '''
+    Step running function(*args, **kwargs) in a worker thread, the job gets its result back.
+    The function must not call Maya. Yield a list of work steps to run them in
+    parallel and get the list of their results.
+    '''
+    return Work(function, args, kwargs)
+
+
+def progress(done, total, message=''):
+    '''
+    Step reporting how far the job got, Maya handles its events before the job goes on
+    '''
+    return Progress(done, total, message)
+
+
+def run_work(request):
+    '''
+    Run one work step, returns its result and seconds
+    '''
+    start = time.perf_counter()
+    return request.function(*request.args, **request.kwargs), time.perf_counter() - start
+
+
+def run_now(steps):
+    '''
+    Run a job generator to the end on the calling thread, work steps included, returns its result
+    '''
+    value = None
+    try:
+        while True:
+            try:
+                request = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            if isinstance(request, Progress):
+                value = None
+            elif isinstance(request, Work):
+                value = run_work(request)[0]
+            else:
+                value = [run_work(item)[0] for item in request]
+    finally:
+        steps.close()
+
+
+# Ignore R0902 warning because a job is a record of its generator, state, outcome and timings
+class Job():  # pylint: disable=too-many-instance-attributes
+    '''
+    A job generator with its state, progress, outcome and timings.
+    state is queued, running, cancelling, done, cancelled or failed.
+    '''
+    def __init__(self, name, steps, action=None):
+        self.name = name
+        self.steps = steps
+        #profiled tool action that submitted the job
+        self.action = action
+        self.state = 'queued'
+        self.progress = Progress(0, 0, '')
+        self.result = None
+        self.error = None
+        #transactions the job committed, see ala_camera_modifier.JobCommits
+        self.commits = ala_camera_modifier.JobCommits()
+        self.timings = {
+            'submitted': time.perf_counter(),
+            'started': None,
+            'finished': None,
+            'main_seconds': 0.0,
+            'main_steps': 0,
+            'longest_main_step_seconds': 0.0,
+            'worker_seconds': 0.0,
+        }
+
+    @property
+    def finished(self):
+        '''
+        Whether the job is done, cancelled or failed
+        '''
+        return self.state in FINISHED_STATES
+
+    def add_main_step(self, seconds):
+        '''
+        Count a step run on the main thread, the longest one is how long Maya was blocked at most
+        '''
+        self.timings['main_seconds'] += seconds
+        self.timings['main_steps'] += 1
+        self.timings['longest_main_step_seconds'] = max(self.timings['longest_main_step_seconds'], seconds)
+
+    def format_timing(self):
+        '''
+        One line timing report of the job
+        '''
+        timings = self.timings
+        end = timings['finished'] or time.perf_counter()
+        wall_seconds = end - (timings['started'] or end)
+        return (f"{self.name}: {self.state} in {wall_seconds:.2f} s, main thread {timings['main_seconds']:.2f} s "
+                f"in {timings['main_steps']} steps (longest {timings['longest_main_step_seconds'] * 1000:.0f} ms), "
+                f"workers {timings['worker_seconds']:.2f} s")
+
+
+def profile_step(job):
+    '''
+    Context profiling a main thread step of a job under the tool action that submitted it
+    '''
+    profiler = ala_camera_profiler.active_profiler
+    if profiler is None or job.action is None:
+        return contextlib.nullcontext()
+    return profiler.action(job.action, new_run=False)
+
+
+class JobRunner():
+    '''
+    Run jobs one after the other on Maya's main thread, their work steps in a thread pool.
+    Listeners are called with the job on the main thread whenever a job changes.
+    '''
+    def __init__(self, max_workers=DEFAULT_WORKERS, defer=None):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='alaCameraJob')
+        self.defer = defer or maya.utils.executeDeferred
+        self.queue = collections.deque()
+        self.current = None
+        #futures of the work steps the current job waits for
+        self.futures = None
+        self.finished_jobs = []
+        self.listeners = []
+
+    def submit(self, name, steps):
+        '''
+        Queue a job generator, returns its Job
+        '''
+        profiler = ala_camera_profiler.active_profiler
+        job = Job(name, steps, profiler.current_action() if profiler is not None else None)
+        self.queue.append(job)
+        self.notify(job)
+        if self.current is None:
+            self.defer(self.start_next)
+        return job
+
+    def start_next(self):
+        '''
+        Start the next queued job unless one is running
+        '''
+        if self.current is not None or not self.queue:
+            return
+        job = self.current = self.queue.popleft()
+        job.state = 'running'
+        job.timings['started'] = time.perf_counter()
+        self.notify(job)
+        self.step(job)
+
+    def step(self, job, value=None, error=None):
+        '''
+        Run a job on the main thread up to its next step
+        '''
+        if job is not self.current:
+            return
+        if job.state == 'cancelling':
+            job.steps.close()
+            self.finish(job, 'cancelled')
+            return
+        start = time.perf_counter()
+        request = state = None
+        try:
+            with profile_step(job), ala_camera_modifier.job_step(job.commits):
+                request = job.steps.send(value) if error is None else job.steps.throw(error)
+        except StopIteration as stop:
+            job.result = stop.value
+            state = 'done'
+        # Ignore W0718 warning because a failing job is reported in the window instead of stopping the runner
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            job.error = exception
+            state = 'failed'
+        job.add_main_step(time.perf_counter() - start)
+
+        if state is not None:
+            self.finish(job, state)
+        elif isinstance(request, Progress):
+            job.progress = request
+            self.notify(job)
+            self.defer(self.step, job)
+        elif not isinstance(request, Work) and not request:
+            self.defer(self.step, job, [])
+        else:
+            single = isinstance(request, Work)
+            futures = self.futures = [self.executor.submit(run_work, item) for item in ([request] if single else request)]
+            for future in futures:
+                #done callbacks run on the worker thread, the job goes on on the main thread
+                future.add_done_callback(lambda _future, futures=futures: self.defer(self.collect, job, futures, single))
+
+    def collect(self, job, futures, single):
+        '''
+        Hand the results of a job's work steps back to it once they are all finished
+        '''
+        if self.futures is not futures or not all(future.done() for future in futures):
+            return
+        self.futures = None
+        results = []
+        error = None
+        for future in futures:
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            result, seconds = future.result()
+            job.timings['worker_seconds'] += seconds
+            results.append(result)
+        self.step(job, results[0] if single and results else results, error)
+
+    def finish(self, job, state):
+        '''
+        Record the end of the current job, put its commits on the undo queue or
+        revert them when it failed, and start the next one
+        '''
+        with profile_step(job):
+            if state == 'failed':
+                job.commits.undoIt()
+            else:
+                job.commits.register(job.name)
+        job.state = state
+        job.timings['finished'] = time.perf_counter()
+        self.current = None
+        self.finished_jobs = (self.finished_jobs + [job])[-MAX_FINISHED_JOBS:]
+        if state == 'failed':
+            cmds.warning(f"{job.name} failed: {job.error}")
+        self.notify(job)
+        if self.queue:
+            self.defer(self.start_next)
+
+    def cancel(self, job):
+        '''
+        Cancel a job, a running one stops before its next step.
+        Batches it already committed stay in the scene and undo as one step.
+        '''
+        if job.state == 'queued':
+            self.queue.remove(job)
+            job.state = 'cancelled'
+            job.timings['finished'] = time.perf_counter()
+            self.finished_jobs = (self.finished_jobs + [job])[-MAX_FINISHED_JOBS:]
+            self.notify(job)
+        elif job.state == 'running':
+            #the job is closed at its next step, work that has not started yet is dropped
+            job.state = 'cancelling'
+            self.notify(job)
+            for future in self.futures or ():
+                future.cancel()
+
+    def cancel_all(self):
+        '''
+        Cancel the running job and every queued one
+        '''
+        for job in list(self.queue):
+            self.cancel(job)
+        if self.current is not None:
+            self.cancel(self.current)
+
+    def notify(self, job):
+        '''
+        Tell every listener a job changed
+        '''
+        for listener in self.listeners:
+            listener(job)
+
+    def format_report(self):
+        '''
+        Timing report of the finished jobs, most recent first
+        '''
+        return '\n'.join(job.format_timing() for job in reversed(self.finished_jobs))
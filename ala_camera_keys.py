@@ -0,0 +1,65 @@
+'''
+ala_camera_keys.py
+Bulk keyframe writer for the camera tool.
+Whole anim curves are written with one MFnAnimCurve.addKeys call per plug
+so building animation never moves the current time or evaluates the scene.
+'''
+import numpy as np
+from maya.api import OpenMaya as om2
+from maya.api import OpenMayaAnim as oma
+from ala_camera_modifier import get_plug
+import ala_camera_modifier
+
+TANGENT_TYPES = {
+    'spline': oma.MFnAnimCurve.kTangentSmooth,
+    'linear': oma.MFnAnimCurve.kTangentLinear,
+    'flat': oma.MFnAnimCurve.kTangentFlat,
+    'step': oma.MFnAnimCurve.kTangentStep,
+    'clamped': oma.MFnAnimCurve.kTangentClamped,
+    'auto': oma.MFnAnimCurve.kTangentAuto,
+}
+
+
+def get_anim_curve(plug, modifier):
+    '''
+    Get the anim curve driving a plug, a new one is created through the modifier if needed
+    '''
+    curve_fn = oma.MFnAnimCurve()
+    existing_curves = oma.MAnimUtil.findAnimation(plug)
+    if len(existing_curves) > 0:
+        curve_fn.setObject(existing_curves[0])
+    else:
+        curve_fn.create(plug, curve_fn.timedAnimCurveTypeForPlug(plug), modifier)
+    return curve_fn
+
+
+def write_anim_curves(curves, tangent_type='spline', keep_existing_keys=False):
+    '''
+    Write whole anim curves in one undoable step.
+    curves maps "node.attribute" to (times, values), times are in the scene
+    time unit, angles in degrees and linear values in internal centimeters,
+    not in the scene's linear unit like setKeyframe.
+    Lists, tuples and NumPy arrays are all accepted, curves passing the
+    same times object share one MTimeArray.
+    Inside a transaction the new curves are connected when it commits.
+    '''
+    tangent = TANGENT_TYPES[tangent_type]
+    time_unit = om2.MTime.uiUnit()
+    curve_fns = []
+    # id(times) -> (times, MTimeArray), times is kept so its id stays unique
+    key_times_by_id = {}
+    with ala_camera_modifier.transaction("writeAnimCurves") as keys_transaction:
+        if keys_transaction.anim_curve_change is None:
+            keys_transaction.anim_curve_change = oma.MAnimCurveChange()
+        for plug_name, (times, values) in curves.items():
+            curve_fn = get_anim_curve(get_plug(plug_name), keys_transaction.modifier)
+            values = np.asarray(values, dtype=np.float64)
+            if curve_fn.animCurveType == oma.MFnAnimCurve.kAnimCurveTA:
+                #angular curves store radians internally
+                values = np.radians(values)
+            if id(times) not in key_times_by_id:
+                key_times_by_id[id(times)] = (times, om2.MTimeArray([om2.MTime(time, time_unit) for time in np.asarray(times, dtype=np.float64).tolist()]))
+            key_times = key_times_by_id[id(times)][1]
+            curve_fn.addKeys(key_times, om2.MDoubleArray(values.tolist()), tangent, tangent, keep_existing_keys, keys_transaction.anim_curve_change)
+            curve_fns.append(curve_fn)
+    return [curve_fn.name() for curve_fn in curve_fns]
@@ -0,0 +1,307 @@
+'''
+ala_camera_lens_import.py
+Imports on-set lens metadata (e.g. ARRI Meta Extract CSV dumps of Alexa LF
+recordings) onto a camera as baked anim curves.
+CSV, JSON arrays and JSON lines files are read as a stream, a chunk of rows
+at a time, and each chunk is converted to NumPy columns straight away, so
+only the parsed values of a take are kept in memory. Timecodes are turned
+into frames with vectorized digit arithmetic and every attribute is written
+as one anim curve in a single undo step.
+'''
+import csv
+import json
+import os
+import re
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_bake
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+
+# Rows parsed and converted to NumPy at once
+DEFAULT_CHUNK_ROWS = 50000
+# Characters of JSON read at once
+JSON_READ_SIZE = 1 << 20
+
+# Metadata fields and the column names they go by, compared in lower case without spaces or punctuation
+FIELD_ALIASES = {
+    'timecode': ('timecode', 'tc', 'mastertc', 'mastertimecode', 'sourcetimecode'),
+    'focal_length': ('focallength', 'lensfocallength', 'fl'),
+    'focus_distance': ('focusdistance', 'lensfocusdistance', 'focus'),
+    'iris': ('iris', 'lensiris', 'tstop', 'fstop', 'aperture'),
+}
+
+# Focus distance units and their size in centimeters, the unit is read from headers like "Focus Distance (mm)"
+DISTANCE_UNITS = {'mm': 0.1, 'cm': 1.0, 'm': 100.0, 'in': 2.54, 'ft': 30.48}
+DEFAULT_DISTANCE_UNIT = 'mm'
+
+# Camera attributes written for every field, the focus distance drives Arnold as well
+FIELD_ATTRIBUTES = {
+    'focal_length': ('focalLength',),
+    'focus_distance': ('focusDistance', 'aiFocusDistance'),
+    'iris': ('fStop',),
+}
+
+# "HH:MM:SS:FF", drop frame timecodes use ";" "," or "." before the frames
+TIMECODE_LENGTH = 11
+DROP_FRAME_SEPARATORS = b';,.'
+
+
+def normalize_column(name):
+    '''
+    Field and distance unit of a column header, (None, None) for columns that are not imported
+    '''
+    unit_match = re.search(r'\(\s*(\w+)\s*\)', name)
+    unit = unit_match.group(1).lower() if unit_match and unit_match.group(1).lower() in DISTANCE_UNITS else None
+    key = re.sub(r'[^a-z0-9]', '', re.sub(r'\(.*?\)', '', name.lower()))
+    for field, aliases in FIELD_ALIASES.items():
+        if key in aliases:
+            return field, unit
+    return None, None
+
+
+def map_columns(names):
+    '''
+    {field: (column name, distance unit)} of the first column matching every field
+    '''
+    columns = {}
+    for name in names:
+        field, unit = normalize_column(name)
+        if field is not None and field not in columns:
+            columns[field] = (name, unit)
+    return columns
+
+
+def iter_csv_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    '''
+    Yield ({field: (column name, unit)}, {field: [values]}) for every chunk of rows of a CSV file
+    '''
+    with open(path, newline='', encoding='utf-8-sig') as csv_file:
+        header_line = csv_file.readline()
+        if not header_line.strip():
+            raise ValueError(f"{path} has no header row")
+        dialect = csv.Sniffer().sniff(header_line, delimiters=',;\t')
+        names = list(csv.reader([header_line], dialect))[0]
+        columns = map_columns(names)
+        indexes = {field: names.index(name) for field, (name, _) in columns.items()}
+        chunk = []
+        for row in csv.reader(csv_file, dialect):
+            if row:
+                chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield columns, {field: [row[index] for row in chunk] for field, index in indexes.items()}
+                chunk = []
+        if chunk:
+            yield columns, {field: [row[index] for row in chunk] for field, index in indexes.items()}
+
+
+def iter_json_records(json_file):
+    '''
+    Yield the objects of a JSON array or of JSON lines, decoded one by one from a read buffer
+    '''
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    end_of_file = False
+    while True:
+        #skip the array brackets, commas and whitespace between objects
+        while position < len(buffer) and buffer[position] in '[],\r\n\t ':
+            position += 1
+        if position == len(buffer) and end_of_file:
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            #the object is cut off at the end of the buffer, read more
+            if end_of_file:
+                raise
+            data = json_file.read(JSON_READ_SIZE)
+            end_of_file = not data
+            buffer = buffer[position:] + data
+            position = 0
+            continue
+        yield record
+
+
+def iter_json_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    '''
+    Yield ({field: (key, unit)}, {field: [values]}) for every chunk of records of a JSON file,
+    the fields are matched on the keys of the first record
+    '''
+    columns = None
+    chunk = []
+    with open(path, encoding='utf-8-sig') as json_file:
+        for record in iter_json_records(json_file):
+            if columns is None:
+                columns = map_columns(record)
+            chunk.append(record)
+            if len(chunk) == chunk_rows:
+                yield columns, {field: [row.get(name, '') for row in chunk] for field, (name, _) in columns.items()}
+                chunk = []
+    if chunk:
+        yield columns, {field: [row.get(name, '') for row in chunk] for field, (name, _) in columns.items()}
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    '''
+    Chunks of a CSV, JSON or JSON lines file, chosen by its extension
+    '''
+    if os.path.splitext(path)[1].lower() in ('.json', '.jsonl'):
+        return iter_json_chunks(path, chunk_rows)
+    return iter_csv_chunks(path, chunk_rows)
+
+
+def parse_numbers(values):
+    '''
+    Float array of metadata values, blanks are NaN and "T2.8"/"f2.8" iris values lose their prefix
+    '''
+    values = np.char.strip(np.asarray(values, dtype=str))
+    values = np.char.lstrip(values, 'TtFf')
+    return np.where(values == '', 'nan', values).astype(np.float64)
+
+
+def timecode_frames(timecodes, frame_rate):
+    '''
+    Frame count since midnight of "HH:MM:SS:FF" timecodes at a nominal frame rate,
+    drop frame timecodes ("HH:MM:SS;FF") skip their dropped frame numbers
+    '''
+    timecodes = np.char.strip(np.asarray(timecodes, dtype=str))
+    if (np.char.str_len(timecodes) != TIMECODE_LENGTH).any():
+        raise ValueError(f"Timecodes must look like HH:MM:SS:FF, found {timecodes[np.char.str_len(timecodes) != TIMECODE_LENGTH][0]!r}")
+    characters = np.frombuffer(np.char.encode(timecodes, 'ascii').tobytes(), dtype=np.uint8).reshape(-1, TIMECODE_LENGTH)
+    digits = characters[:, [0, 1, 3, 4, 6, 7, 9, 10]].astype(np.int64) - ord('0')
+    if ((digits < 0) | (digits > 9)).any():
+        raise ValueError("Timecodes must look like HH:MM:SS:FF")
+    hours, minutes, seconds, frames = (digits[:, ::2] * 10 + digits[:, 1::2]).T
+    nominal_rate = int(round(frame_rate))
+    frame_numbers = ((hours * 60 + minutes) * 60 + seconds) * nominal_rate + frames
+    drop_frame = np.isin(characters[:, 8], np.frombuffer(DROP_FRAME_SEPARATORS, dtype=np.uint8))
+    if drop_frame.any():
+        #2 frame numbers are dropped every minute but every tenth at 29.97, 4 at 59.94
+        total_minutes = hours * 60 + minutes
+        dropped = (nominal_rate // 15) * (total_minutes - total_minutes // 10)
+        frame_numbers = np.where(drop_frame, frame_numbers - dropped, frame_numbers)
+    return frame_numbers
+
+
+def get_scene_frame_rate():
+    '''
+    Frames per second of the scene time unit
+    '''
+    return om2.MTime(1.0, om2.MTime.kSeconds).asUnits(om2.MTime.uiUnit())
+
+
+def read_lens_metadata(path, frame_rate, distance_unit=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    '''
+    Read a metadata file chunk by chunk.
+    Returns the timecode frame count of every row (None without a timecode column)
+    and {field: values} with focus distances in centimeters.
+    '''
+    frame_chunks = []
+    value_chunks = {field: [] for field in FIELD_ATTRIBUTES}
+    for columns, chunk in iter_chunks(path, chunk_rows):
+        if 'timecode' in columns:
+            frame_chunks.append(timecode_frames(chunk['timecode'], frame_rate))
+        for field in FIELD_ATTRIBUTES:
+            if field in chunk:
+                values = parse_numbers(chunk[field])
+                if field == 'focus_distance':
+                    values *= DISTANCE_UNITS[columns[field][1] or distance_unit or DEFAULT_DISTANCE_UNIT]
+                value_chunks[field].append(values)
+    if not any(value_chunks.values()):
+        raise ValueError(f"{path} has no focal length, focus distance or iris column")
+    timecodes = np.concatenate(frame_chunks) if frame_chunks else None
+    return timecodes, {field: np.concatenate(chunks) for field, chunks in value_chunks.items() if chunks}
+
+
+def drop_constant_keys(frames, values):
+    '''
+    Keep only the first and last key of every run of equal values, a prime lens
+    or a held focus then needs 2 keys instead of one per frame
+    '''
+    if len(values) < 3:
+        return frames, values
+    changes = values[1:] != values[:-1]
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:-1] = changes[:-1] | changes[1:]
+    return frames[keep], values[keep]
+
+
+# Ignore R0913/R0917 warnings because the frame rates and options are all plain values
+def compute_lens_keys(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        path, start_frame, scene_rate, timecode_rate, distance_unit=None, start_timecode=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    '''
+    Keys of a metadata file as {field: (frames, values)} and the summary of the import,
+    only reads the file so it can run in a worker thread
+    '''
+    timecodes, fields = read_lens_metadata(path, timecode_rate, distance_unit, chunk_rows)
+    row_count = len(next(iter(fields.values())))
+    if timecodes is None:
+        frames = start_frame + np.arange(row_count, dtype=np.float64)
+    else:
+        start_timecode = timecodes[0] if start_timecode is None else timecode_frames([start_timecode], timecode_rate)[0]
+        frames = start_frame + (timecodes - start_timecode) * (scene_rate / timecode_rate)
+    #rows are in recording order, a repeated frame keeps its last row
+    order = np.argsort(frames, kind='stable')
+    last_of_frame = np.append(frames[order][1:] != frames[order][:-1], True)
+    order = order[last_of_frame]
+
+    keys = {}
+    for field, values in fields.items():
+        valid = order[np.isfinite(values[order])]
+        field_frames, field_values = drop_constant_keys(frames[valid], values[valid])
+        if len(field_frames):
+            keys[field] = (field_frames, field_values)
+    summary = {
+        'rows': row_count,
+        'frames': (float(frames[order][0]), float(frames[order][-1])) if len(order) else None,
+        'keys': {attribute: len(field_frames) for field, (field_frames, _) in keys.items() for attribute in FIELD_ATTRIBUTES[field]},
+    }
+    return keys, summary
+
+
+def import_lens_metadata_job(path, camera_shape, start_frame=None, **options):
+    '''
+    Job keying focal length, focus distance and f stop of a camera from a lens metadata file,
+    see ala_camera_jobs.py. The file is parsed in a worker thread.
+    The first timecode lands on start_frame (the playback start by default), options:
+    start_timecode ("HH:MM:SS:FF" to land on start_frame instead), timecode_rate
+    (the scene frame rate by default), distance_unit of the focus distance when the
+    header does not tell it (mm by default) and chunk_rows.
+    Files without timecodes are keyed one row per frame.
+    Returns a summary with the row count, frame range and number of keys per attribute.
+    '''
+    scene_rate = get_scene_frame_rate()
+    if start_frame is None:
+        start_frame = cmds.playbackOptions(q=True, minTime=True)
+    keys, summary = yield ala_camera_jobs.work(
+        compute_lens_keys, path, start_frame, scene_rate, options.get('timecode_rate', scene_rate), options.get('distance_unit'),
+        options.get('start_timecode'), options.get('chunk_rows', DEFAULT_CHUNK_ROWS))
+    curves = {camera_shape + '.' + attribute: field_keys for field, field_keys in keys.items() for attribute in FIELD_ATTRIBUTES[field]}
+
+    with ala_camera_modifier.transaction("importLensMetadata") as import_transaction:
+        #DOF rigs and earlier imports must not fight the imported curves
+        ala_camera_bake.disconnect_live_inputs(import_transaction, camera_shape, [name.split('.', 1)[1] for name in curves])
+        if 'focus_distance' in keys:
+            import_transaction.set_values({camera_shape + ".depthOfField": True, camera_shape + ".aiEnableDOF": True})
+        ala_camera_keys.write_anim_curves(curves, tangent_type='linear')
+    return summary
+
+
+def import_lens_metadata(*args, **kwargs):
+    '''
+    Run import_lens_metadata_job straight away, returns its summary
+    '''
+    return ala_camera_jobs.run_now(import_lens_metadata_job(*args, **kwargs))
+
+
+def format_import_report(path, summary):
+    '''
+    One line summary of an import for the Script Editor
+    '''
+    keys = ', '.join(f"{attribute} {count}" for attribute, count in summary['keys'].items())
+    frames = summary['frames']
+    frame_range = f"frames {frames[0]:g}-{frames[1]:g}" if frames else "no frames"
+    return f"Imported {summary['rows']} rows of {os.path.basename(path)}, {frame_range}, keys: {keys}"
@@ -0,0 +1,369 @@
+'''
+ala_camera_modifier.py
+Commits OpenMaya DG modifiers built by the camera tool.
+The modifier is handed to the alaCameraCommit command from ala_camera_plugin.py
+so every queued connection lands on Maya's undo queue as a single entry.
+Tool actions queue their writes on a transaction, which commits them in one
+undo chunk with the viewport refresh suspended, or rolls them back on failure.
+Transactions of a background job step are recorded on the job's JobCommits
+instead, which the job hands to alaCameraCommit once it ends.
+'''
+import contextlib
+import functools
+import os
+from maya import cmds
+from maya.api import OpenMaya as om2
+
+PLUGIN_NAME = 'ala_camera_plugin'
+
+# Modifiers waiting to be picked up by the alaCameraCommit command
+pending_modifiers = []
+
+# Transaction of the running tool action, nested transactions join it
+active_transactions = []
+
+# Commits of the background job whose step is running, see job_step
+job_commits = []
+
+
+def load_plugin():
+    '''
+    Load the camera tool plugin that ships next to this script
+    '''
+    if not cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):
+        plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), PLUGIN_NAME + '.py')
+        cmds.loadPlugin(plugin_path, quiet=True)
+
+
+@functools.lru_cache(maxsize=None)
+def is_batch_mode():
+    '''
+    Whether Maya runs without a UI, which never changes during a session
+    '''
+    return cmds.about(batch=True)
+
+
+def get_plug(plug_name):
+    '''
+    Get the MPlug of a "node.attribute" string for use in a DG modifier
+    '''
+    return om2.MSelectionList().add(plug_name).getPlug(0)
+
+
+def get_node(node_name):
+    '''
+    Get the MObject of a node name for use in a DG modifier
+    '''
+    return om2.MSelectionList().add(node_name).getDependNode(0)
+
+
+def set_plug_values(modifier, values):
+    '''
+    Queue {"node.attribute": value} writes on a modifier, values are in UI units like setAttr
+    '''
+    for plug_name, value in values.items():
+        plug = get_plug(plug_name)
+        attribute = plug.attribute()
+        if attribute.hasFn(om2.MFn.kUnitAttribute):
+            unit_type = om2.MFnUnitAttribute(attribute).unitType()
+            if unit_type == om2.MFnUnitAttribute.kAngle:
+                modifier.newPlugValueMAngle(plug, om2.MAngle(value, om2.MAngle.uiUnit()))
+                continue
+            if unit_type == om2.MFnUnitAttribute.kDistance:
+                modifier.newPlugValueMDistance(plug, om2.MDistance(value, om2.MDistance.uiUnit()))
+                continue
+        elif attribute.hasFn(om2.MFn.kNumericAttribute):
+            numeric_type = om2.MFnNumericAttribute(attribute).numericType()
+            if numeric_type == om2.MFnNumericData.kBoolean:
+                modifier.newPlugValueBool(plug, bool(value))
+                continue
+            if numeric_type in (om2.MFnNumericData.kInt, om2.MFnNumericData.kShort, om2.MFnNumericData.kByte):
+                modifier.newPlugValueInt(plug, int(value))
+                continue
+        elif attribute.hasFn(om2.MFn.kEnumAttribute):
+            modifier.newPlugValueShort(plug, int(value))
+            continue
+        modifier.newPlugValueDouble(plug, float(value))
+
+
+def get_plug_value(plug):
+    '''
+    Read a plug in UI units like getAttr, without a cmds call
+    '''
+    attribute = plug.attribute()
+    if attribute.hasFn(om2.MFn.kUnitAttribute):
+        unit_type = om2.MFnUnitAttribute(attribute).unitType()
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(om2.MAngle.uiUnit())
+        if unit_type == om2.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(om2.MDistance.uiUnit())
+    elif attribute.hasFn(om2.MFn.kNumericAttribute):
+        numeric_type = om2.MFnNumericAttribute(attribute).numericType()
+        if numeric_type == om2.MFnNumericData.kBoolean:
+            return plug.asBool()
+        if numeric_type in (om2.MFnNumericData.kInt, om2.MFnNumericData.kShort, om2.MFnNumericData.kByte):
+            return plug.asInt()
+    elif attribute.hasFn(om2.MFn.kEnumAttribute):
+        return plug.asShort()
+    return plug.asDouble()
+
+
+def get_centimeters_per_unit():
+    '''
+    Centimeters in one UI distance unit. get_plug_value returns UI units,
+    world matrices, bounding boxes and the lens presets are in centimeters.
+    '''
+    return om2.MDistance(1.0, om2.MDistance.uiUnit()).asCentimeters()
+
+
+@contextlib.contextmanager
+def undo_suspended():
+    '''
+    Run a block without recording undo, stateWithoutFlush keeps the user's undo queue
+    '''
+    undo_enabled = cmds.undoInfo(query=True, state=True)
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        yield
+    finally:
+        cmds.undoInfo(stateWithoutFlush=undo_enabled)
+
+
+def commit_values(values):
+    '''
+    Write {"node.attribute": value} in one batched, undoable step
+    '''
+    with transaction("commitValues") as values_transaction:
+        values_transaction.set_values(values)
+
+
+def take_pending_modifier():
+    '''
+    Hand the queued modifier and anim curve change over to the commit command
+    '''
+    return pending_modifiers.pop()
+
+
+def commit(modifier, anim_curve_change=None):
+    '''
+    Run the modifier through alaCameraCommit so it can be undone in one step.
+    anim_curve_change holds keys already written with MFnAnimCurve so they
+    are undone together with the modifier.
+    '''
+    load_plugin()
+    run_commit_command(modifier, anim_curve_change)
+
+
+def run_commit_command(modifier, anim_curve_change=None):
+    '''
+    Hand a modifier to alaCameraCommit, the plugin has to be loaded already
+    '''
+    pending_modifiers.append((modifier, anim_curve_change))
+    try:
+        cmds.alaCameraCommit()
+    finally:
+        del pending_modifiers[:]
+
+
+class Transaction():
+    '''
+    Attribute writes, connections and deletions queued by one tool action.
+    Queue everything through the methods or straight on self.modifier,
+    cmds calls made inside the transaction share its undo chunk.
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.modifier = om2.MDagModifier()
+        # MAnimCurveChange of keys written by ala_camera_keys during the transaction
+        self.anim_curve_change = None
+        # Whether part of the modifier was applied with apply() before the commit
+        self.applied = False
+
+    def set_values(self, values):
+        '''
+        Queue {"node.attribute": value} writes, values are in UI units like setAttr
+        '''
+        set_plug_values(self.modifier, values)
+
+    def connect(self, source, destination):
+        '''
+        Queue a connection between two "node.attribute" plugs
+        '''
+        self.modifier.connect(get_plug(source), get_plug(destination))
+
+    def disconnect(self, source, destination):
+        '''
+        Queue breaking a connection between two "node.attribute" plugs
+        '''
+        self.modifier.disconnect(get_plug(source), get_plug(destination))
+
+    def delete(self, nodes):
+        '''
+        Queue deleting nodes
+        '''
+        for node in nodes:
+            self.modifier.deleteNode(get_node(node))
+
+    def create_camera(self, name):
+        '''
+        Create a camera transform and shape named like cmds.camera names them,
+        returns their names. The camera is applied straight away so later writes find it.
+        '''
+        transform = self.modifier.createNode('transform')
+        shape = self.modifier.createNode('camera', transform)
+        self.modifier.renameNode(transform, name)
+        self.modifier.renameNode(shape, name + 'Shape')
+        self.apply()
+        return om2.MFnDependencyNode(transform).name(), om2.MFnDependencyNode(shape).name()
+
+    def apply(self):
+        '''
+        Apply what is queued so far, e.g. new nodes or attributes later writes look up by name.
+        The commit still undoes it as part of the transaction.
+        '''
+        self.applied = True
+        self.modifier.doIt()
+
+    def commit(self):
+        '''
+        Apply everything queued as one alaCameraCommit,
+        or record it on the running job's commits inside a job step
+        '''
+        #from here on the commit owns the keys and the applied writes and reverts them if it fails
+        anim_curve_change, self.anim_curve_change = self.anim_curve_change, None
+        self.applied = False
+        if job_commits:
+            job_commits[-1].add(self.modifier, anim_curve_change)
+        else:
+            run_commit_command(self.modifier, anim_curve_change)
+
+    def discard(self):
+        '''
+        Revert keys and applied writes of the transaction that were never committed
+        '''
+        if self.anim_curve_change is not None:
+            self.anim_curve_change.undoIt()
+        if self.applied:
+            self.modifier.undoIt()
+
+
+@contextlib.contextmanager
+def transaction(name):
+    '''
+    Run a tool action as one transaction, e.g.
+
+        with transaction("disableDepthOfField") as dof_transaction:
+            dof_transaction.set_values({camera_shape + '.depthOfField': False})
+
+    Everything is committed through one DG modifier inside one undo chunk
+    while the viewport refresh is suspended. If anything raises, the queued
+    writes are dropped and cmds calls made inside the block are undone.
+    A transaction opened inside another one joins the outer transaction.
+    Inside a job step the commit is recorded on the job's commits, see job_step,
+    so job steps write through the modifier and keys only.
+    '''
+    if active_transactions:
+        yield active_transactions[-1]
+        return
+
+    load_plugin()
+    current = Transaction(name)
+    #in a job step nothing reaches the undo queue before the job ends, discard alone reverts a failure
+    undo_rollback = cmds.undoInfo(query=True, state=True) and not job_commits
+    suspend_refresh = not is_batch_mode()
+    active_transactions.append(current)
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    if suspend_refresh:
+        cmds.refresh(suspend=True)
+    succeeded = False
+    try:
+        if undo_rollback:
+            #an empty commit keeps the chunk from being empty, so the rollback never undoes an earlier action
+            run_commit_command(om2.MDGModifier())
+        yield current
+        current.commit()
+        succeeded = True
+    finally:
+        active_transactions.pop()
+        if suspend_refresh:
+            cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+        if not succeeded:
+            current.discard()
+            if undo_rollback:
+                cmds.undo()
+
+
+
+class JobCommits():
+    '''
+    Commits of one background job. Each transaction of the job is applied when
+    it commits and the job hands them all to alaCameraCommit once it ends,
+    so a job writing many batches is a single undo step and nothing is held
+    open while Maya handles other events between the job's steps.
+    Acts as the modifier of that command.
+    '''
+    def __init__(self):
+        self.commits = []
+        self.registered = False
+
+    def add(self, modifier, anim_curve_change=None):
+        '''
+        Apply a committed transaction and record it
+        '''
+        try:
+            modifier.doIt()
+        except RuntimeError:
+            #leave nothing half applied, like the commit command
+            modifier.undoIt()
+            if anim_curve_change:
+                anim_curve_change.undoIt()
+            raise
+        self.commits.append((modifier, anim_curve_change))
+
+    def register(self, name):
+        '''
+        Put the applied commits on the undo queue as one step
+        '''
+        if not self.commits:
+            return
+        cmds.undoInfo(openChunk=True, chunkName=name)
+        try:
+            run_commit_command(self)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    # Ignore C0103 warning because the commit command calls the modifier's camelCase methods
+    def doIt(self):  # pylint: disable=invalid-name
+        '''
+        Redo every commit, the command's first doIt only registers them as they are applied already
+        '''
+        if not self.registered:
+            self.registered = True
+            return
+        for modifier, anim_curve_change in self.commits:
+            modifier.doIt()
+            if anim_curve_change:
+                anim_curve_change.redoIt()
+
+    # Ignore C0103 warning because the commit command calls the modifier's camelCase methods
+    def undoIt(self):  # pylint: disable=invalid-name
+        '''
+        Revert every commit in reverse order, also how a failed job is rolled back
+        '''
+        for modifier, anim_curve_change in reversed(self.commits):
+            if anim_curve_change:
+                anim_curve_change.undoIt()
+            modifier.undoIt()
+
+
+@contextlib.contextmanager
+def job_step(commits):
+    '''
+    Record the transactions committed while a background job runs one step on its JobCommits
+    '''
+    job_commits.append(commits)
+    try:
+        yield commits
+    finally:
+        job_commits.pop()
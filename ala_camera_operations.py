@@ -0,0 +1,588 @@
+'''
+ala_camera_operations.py
+Camera tool operations without any UI.
+Used by the CameraTool window in ala_camera_tools.py and by the
+headless batch entry point in ala_camera_batch.py.
+'''
+import fnmatch
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+import ala_camera_presets
+import ala_camera_rigs
+import ala_camera_surface
+from ala_camera_modifier import get_plug
+from ala_camera_rigs import FOCUS_NODE_TYPE
+
+locator_scales = [
+    "5",
+    "10",
+    "15",
+    "20",
+    "25",
+    "30",
+    "35",
+    "45",
+    "55",
+    "70",
+    "85",
+    "100"
+]
+
+# Camera/object pairs rigged per transaction when DOF rigs are added as a background job
+DOF_BATCH_SIZE = 50
+
+class SelectionError(RuntimeError):
+    '''
+    Raised when the selection does not hold what a tool action needs
+    '''
+
+
+class SelectionSnapshot():
+    '''
+    Snapshot of the outliner selection, taken once per tool action.
+    Cameras, curves, distance dimensions and focus targets are classified
+    in a single pass so the cost stays linear in the selection size.
+    '''
+    def __init__(self, selection=None):
+        if selection is None:
+            selection = cmds.ls(sl=True, long=True) or []
+        self.selection = list(selection)
+        # (transform, shape, node type) of every selected object in selection order
+        self.entries = []
+        self.camera_transforms = []
+        self.camera_shapes = []
+        self.curves = []
+        self.distance_dimensions = []
+        self.focus_targets = []
+        self.classify()
+
+    def classify(self):
+        '''
+        Sort the selection into cameras, curves, distance dimensions and focus targets
+        '''
+        # cmds.ls with an empty list would list the whole scene
+        if not self.selection:
+            return
+        listed = cmds.ls(self.selection, long=True, showType=True) or []
+        selected = list(zip(listed[::2], listed[1::2]))
+        child_shapes = cmds.listRelatives([name for name, _ in selected], shapes=True, fullPath=True) or []
+        listed = cmds.ls(child_shapes, long=True, showType=True) if child_shapes else []
+        shapes_by_transform = {}
+        for shape, node_type in zip(listed[::2], listed[1::2]):
+            shapes_by_transform.setdefault(shape.rsplit('|', 1)[0], (shape, node_type))
+        selected_shapes = set(cmds.ls(self.selection, shapes=True, long=True) or [])
+        #a camera selected by both its transform and its shape is listed once
+        seen_cameras = set()
+
+        for name, node_type in selected:
+            shape = transform = name
+            if name in shapes_by_transform:
+                shape, node_type = shapes_by_transform[name]
+            elif name in selected_shapes:
+                #a shape picked directly in the outliner belongs to its parent transform
+                transform = name.rsplit('|', 1)[0]
+            self.entries.append((transform, shape, node_type))
+            if node_type == 'camera' and transform not in seen_cameras:
+                seen_cameras.add(transform)
+                self.camera_transforms.append(transform)
+                self.camera_shapes.append(shape)
+            elif node_type == 'nurbsCurve':
+                self.curves.append(transform)
+            elif node_type == 'distanceDimShape':
+                self.distance_dimensions.append(transform)
+
+        first_camera = self.camera_transforms[0] if self.camera_transforms else None
+        self.focus_targets = [transform for transform, _, _ in self.entries if transform != first_camera]
+
+    def require_camera(self):
+        '''
+        Get the (transform, shape) of the first selected camera
+        '''
+        if not self.camera_shapes:
+            raise SelectionError("No camera selected: select a camera in the outliner")
+        return self.camera_transforms[0], self.camera_shapes[0]
+
+    def require_cameras(self):
+        '''
+        Get the (transform, shape) of every selected camera
+        '''
+        if not self.camera_shapes:
+            raise SelectionError("No camera selected: select one or more cameras in the outliner")
+        return list(zip(self.camera_transforms, self.camera_shapes))
+
+    def require_focus_target(self):
+        '''
+        Get the first selected object that is not the camera
+        '''
+        if not self.focus_targets:
+            raise SelectionError("No object to focus on: select an object after the camera")
+        return self.focus_targets[0]
+
+    def require_curve(self):
+        '''
+        Get the first selected curve
+        '''
+        if not self.curves:
+            raise SelectionError("No curve selected: select the turntable curve")
+        return self.curves[0]
+
+    def require_distance_dimension(self):
+        '''
+        Get the first selected distance dimension
+        '''
+        if not self.distance_dimensions:
+            raise SelectionError("No distance dimension selected: select the DOF distance dimension")
+        return self.distance_dimensions[0]
+
+    def require_object(self):
+        '''
+        Get the first selected object of any type
+        '''
+        if not self.entries:
+            raise SelectionError("Nothing selected: select an object in the outliner")
+        return self.entries[0][0]
+
+
+def get_selected_cam_shape():
+    '''
+    function to get selected camera shape on the outliner
+    '''
+    snapshot = SelectionSnapshot()
+    return snapshot.camera_shapes[0] if snapshot.camera_shapes else None
+
+
+def get_selected_cam_transform():
+    '''
+    function to get selected camera transform on the outliner
+    '''
+    snapshot = SelectionSnapshot()
+    return snapshot.camera_transforms[0] if snapshot.camera_transforms else None
+
+
+def get_object_to_focus():
+    '''
+    function to get the object to focus for DOF
+    '''
+    snapshot = SelectionSnapshot()
+    return snapshot.focus_targets[0] if snapshot.focus_targets else None
+
+
+def get_obj():
+    '''
+    gets a selected object in general, likely to be used for other tools as well
+    '''
+    for obj in cmds.ls(sl=True):
+        if obj:
+            return obj
+    return None
+
+
+def get_aspect_ratios():
+    '''
+    Names of every delivery format preset, e.g. 16:9
+    '''
+    return ala_camera_presets.registry.names(ala_camera_presets.DELIVERY_FORMATS)
+
+
+def get_camera_bodies():
+    '''
+    Names of every camera body preset, e.g. AlexaLF
+    '''
+    return ala_camera_presets.registry.names(ala_camera_presets.CAMERA_BODIES)
+
+
+def get_lens_sets():
+    '''
+    Names of every lens set preset, e.g. Arri Master Prime
+    '''
+    return ala_camera_presets.registry.names(ala_camera_presets.LENS_SETS)
+
+
+def get_zoom_lenses():
+    '''
+    Names of every zoom lens preset, e.g. Example Zoom 19-80 (placeholder data)
+    '''
+    return ala_camera_presets.registry.names(ala_camera_presets.ZOOM_LENSES)
+
+
+def get_focal_lengths(lens_set=ala_camera_presets.DEFAULT_LENS_SET):
+    '''
+    Focal lengths of a lens set as strings for the dropdown menus
+    '''
+    return [str(focal_length) for focal_length in ala_camera_presets.registry.lens_set(lens_set)['focal_lengths']]
+
+
+def get_target_cameras(name_pattern=None, snapshot=None):
+    '''
+    Get the (transform, shape) of every camera matching a glob pattern,
+    or of every selected camera when there is no pattern
+    '''
+    if name_pattern:
+        cameras = get_scene_cameras(name_pattern)
+        if not cameras:
+            raise SelectionError(f"No camera matches {name_pattern!r}")
+        return cameras
+    return (snapshot or SelectionSnapshot()).require_cameras()
+
+
+def get_camera_shapes(camera_shapes=None):
+    '''
+    Camera shapes to work on: one shape, a list of shapes or every selected camera by default
+    '''
+    if camera_shapes is None:
+        return [camera_shape for _, camera_shape in SelectionSnapshot().require_cameras()]
+    if isinstance(camera_shapes, str):
+        return [camera_shapes]
+    return list(dict.fromkeys(camera_shapes))
+
+
+def read_camera_values(camera_shapes, attributes):
+    '''
+    Read {camera_shape: {attribute: value}} straight from the plugs in one pass
+    '''
+    selection = om2.MSelectionList()
+    for camera_shape in camera_shapes:
+        selection.add(camera_shape)
+    values = {}
+    for index, camera_shape in enumerate(camera_shapes):
+        node_fn = om2.MFnDependencyNode(selection.getDependNode(index))
+        values[camera_shape] = {attribute: ala_camera_modifier.get_plug_value(node_fn.findPlug(attribute, False)) for attribute in attributes}
+    return values
+
+
+def apply_camera_settings(camera_shapes, settings):
+    '''
+    Write the same {attribute: value} settings to many cameras in one transaction.
+    Returns {camera_shape: {attribute: (before, after)}} for every camera.
+    '''
+    camera_shapes = get_camera_shapes(camera_shapes)
+    before = read_camera_values(camera_shapes, settings)
+    with ala_camera_modifier.transaction("applyCameraSettings") as settings_transaction:
+        settings_transaction.set_values({camera_shape + '.' + attribute: value for camera_shape in camera_shapes for attribute, value in settings.items()})
+    #inside an outer transaction nothing is written yet, so report the values being written
+    return {camera_shape: {attribute: (before[camera_shape][attribute], value) for attribute, value in settings.items()} for camera_shape in camera_shapes}
+
+
+def format_camera_report(report):
+    '''
+    One "camera attribute: before -> after" line per camera setting
+    '''
+    lines = []
+    for camera_shape, values in report.items():
+        for attribute, (before, after) in values.items():
+            lines.append(f"{camera_shape.rsplit('|', 1)[-1]} {attribute}: {before} -> {after}")
+    return '\n'.join(lines)
+
+
+def apply_delivery_format(name):
+    '''
+    Push the resolution and device aspect ratio of a delivery format
+    to defaultResolution in one batched write
+    '''
+    attributes = ala_camera_presets.registry.delivery_format(name)['attributes']
+    with ala_camera_modifier.transaction("applyDeliveryFormat") as format_transaction:
+        format_transaction.set_values({'defaultResolution.' + attribute: value for attribute, value in attributes.items()})
+
+
+def apply_camera_body(camera_shapes=None, name=ala_camera_presets.DEFAULT_CAMERA_BODY):
+    '''
+    Push the film back and clip planes of a camera body to one or many cameras
+    and the render settings of its delivery format in one batched write.
+    Returns the before/after report of apply_camera_settings.
+    '''
+    camera_body = ala_camera_presets.registry.camera_body(name)
+    with ala_camera_modifier.transaction("applyCameraBody"):
+        report = apply_camera_settings(camera_shapes, camera_body['attributes'])
+        apply_delivery_format(camera_body['delivery_format'])
+    return report
+
+
+def set_default_settings():
+    '''
+    Set default resolution to 1920 * 1080 and aspect ratio (16/9)
+    '''
+    apply_delivery_format('16:9')
+
+
+def set_four_by_three_settings():
+    '''
+    set settings to aspect ratio 4/3, resolution: 1024 * 760
+    '''
+    apply_delivery_format('4:3')
+
+
+def set_sixteen_by_ten_settings():
+    '''
+    set settings to aspect ratio 16/10, resolution: 1440 * 900
+    '''
+    apply_delivery_format('16:10')
+
+
+def set_three_by_two_settings():
+    '''
+    Set settings to aspect ratio 3/2, resolution: 1080 * 720
+    '''
+    apply_delivery_format('3:2')
+
+
+def adjust_focal_length(focal_length, camera_shapes=None):
+    '''
+    Set the focal length of one or many cameras, every selected camera by default
+    '''
+    return apply_camera_settings(camera_shapes, {"focalLength": focal_length})
+
+
+def adjust_locator_scale(locator_scale, camera_shapes=None):
+    '''
+    Set the locator scale of one or many cameras, every selected camera by default
+    '''
+    return apply_camera_settings(camera_shapes, {"locatorScale": locator_scale})
+
+def assign_locators(shot_camera_transform, dist_dimension_shape):
+    '''
+    Assign locators between camera and object.
+    Only the 2 locators connected to the distance dimension are touched
+    so the cost does not grow with the number of locators in the scene.
+    '''
+    start_locator = cmds.listConnections(dist_dimension_shape + '.startPoint', source=True, destination=False)[0]
+    end_locator = cmds.listConnections(dist_dimension_shape + '.endPoint', source=True, destination=False)[0]
+    #parent the locator sitting on the camera so it follows the camera,
+    #long names on both sides so duplicate short names never match
+    camera_long_name = cmds.ls(shot_camera_transform, long=True)[0]
+    if camera_long_name not in (cmds.listRelatives(start_locator, parent=True, fullPath=True) or []):
+        start_locator = cmds.parent(start_locator, shot_camera_transform)[0]
+    end_locator = cmds.rename(end_locator, 'AimLocator')
+    return start_locator, end_locator
+
+
+def get_world_positions(nodes):
+    '''
+    Get the world space position of every node in one API query
+    '''
+    unique_nodes = list(dict.fromkeys(nodes))
+    selection = om2.MSelectionList()
+    for node in unique_nodes:
+        selection.add(node)
+    positions = {}
+    for index, node in enumerate(unique_nodes):
+        matrix = selection.getDagPath(index).inclusiveMatrix()
+        positions[node] = (matrix.getElement(3, 0), matrix.getElement(3, 1), matrix.getElement(3, 2))
+    return [positions[node] for node in nodes]
+
+
+def create_distance_rig(shot_camera_transform, shot_camera_coordinates, object_coord):
+    '''
+    Legacy DOF rig: use distance tool to create 2 locators between camera and object
+    '''
+    dist_dimension_shape = cmds.distanceDimension(sp=shot_camera_coordinates, ep=object_coord)
+    assign_locators(shot_camera_transform, dist_dimension_shape)
+    return dist_dimension_shape
+
+
+def get_focus_nodes(camera_shape):
+    '''
+    Get the alaFocusDistance nodes driving a camera
+    '''
+    return cmds.listConnections(camera_shape, source=True, destination=False, type=FOCUS_NODE_TYPE) or []
+
+
+def get_focus_target(camera_shape):
+    '''
+    Get the object the alaFocusDistance node of a camera focuses on
+    '''
+    for focus_node in get_focus_nodes(camera_shape):
+        targets = cmds.listConnections(focus_node + '.targetMatrix', source=True, destination=False)
+        if targets:
+            return targets[0]
+    return None
+
+
+# Refactored code common to both DOF methods
+def basic_depth_of_field_settings(snapshot=None):
+    '''
+    get selected camera transform and objec to focus for DOF
+    '''
+    snapshot = snapshot or SelectionSnapshot()
+    shot_camera_transform = snapshot.require_camera()[0]
+    object_to_focus = snapshot.require_focus_target()
+    return shot_camera_transform, object_to_focus
+
+
+def pair_cameras_with_targets(snapshot):
+    '''
+    Pair every selected camera with the object selected right after it,
+    e.g. camera1, target1, camera2, target2
+    '''
+    pairs = []
+    camera_transform = None
+    for transform, _, node_type in snapshot.entries:
+        if camera_transform is None and node_type == 'camera':
+            camera_transform = transform
+        elif camera_transform is not None:
+            pairs.append((camera_transform, transform))
+            camera_transform = None
+    return pairs
+
+
+def get_shapes_of_cameras(camera_transforms):
+    '''
+    Map every camera transform to the long name of its camera shape with one listRelatives call,
+    raises a SelectionError naming the transforms without a camera shape
+    '''
+    unique_transforms = list(dict.fromkeys(camera_transforms))
+    selection = om2.MSelectionList()
+    for transform in unique_transforms:
+        selection.add(transform)
+    long_names = [selection.getDagPath(index).fullPathName() for index in range(len(unique_transforms))]
+    shapes_by_transform = {}
+    for camera_shape in cmds.listRelatives(unique_transforms, type="camera", fullPath=True) or []:
+        shapes_by_transform.setdefault(camera_shape.rsplit('|', 1)[0], camera_shape)
+    missing = [transform for transform, long_name in zip(unique_transforms, long_names) if long_name not in shapes_by_transform]
+    if missing:
+        raise SelectionError(f"No camera shape under {', '.join(missing)}: pair every camera with the object to focus on")
+    return {transform: shapes_by_transform[long_name] for transform, long_name in zip(unique_transforms, long_names)}
+
+
+def batch_depth_of_field_job(pairs, use_f_stop=False, surface=False):
+    '''
+    Job adding a DOF rig to many (camera transform, object to focus) pairs, see ala_camera_jobs.py.
+    Every camera gets one alaFocusDistance node fed by the camera and object
+    world matrices. With surface=True the node also gets the object's mesh
+    and focuses on its nearest surface point instead of its pivot.
+    Rigs are committed DOF_BATCH_SIZE pairs at a time, each batch through one DG modifier.
+    Returns the (camera shape, focus node MFnDependencyNode) of every rig.
+    '''
+    if not pairs:
+        return []
+    #the focus node type has to exist before the modifier can create it
+    ala_camera_modifier.load_plugin()
+    camera_shapes = get_shapes_of_cameras([shot_camera_transform for shot_camera_transform, _ in pairs])
+    rigs = []
+    for batch_start in range(0, len(pairs), DOF_BATCH_SIZE):
+        with ala_camera_modifier.transaction("batchDepthOfField") as dof_transaction:
+            modifier = dof_transaction.modifier
+            for shot_camera_transform, object_to_focus in pairs[batch_start:batch_start + DOF_BATCH_SIZE]:
+                shot_camera_shape = camera_shapes[shot_camera_transform]
+                focus_node = om2.MFnDependencyNode(modifier.createNode(FOCUS_NODE_TYPE))
+                modifier.renameNode(focus_node.object(), shot_camera_transform.rsplit('|', 1)[-1] + '_focusDistance')
+                #tag the node so the rig registry knows what it drives
+                modifier.newPlugValueShort(focus_node.findPlug('rigMode', False), ala_camera_rigs.RIG_MODES.index('fStop' if use_f_stop else 'focusDistance'))
+                modifier.newPlugValueInt(focus_node.findPlug('rigVersion', False), ala_camera_rigs.RIG_VERSION)
+                modifier.connect(get_plug(shot_camera_transform + '.worldMatrix[0]'), focus_node.findPlug('cameraMatrix', False))
+                modifier.connect(get_plug(object_to_focus + '.worldMatrix[0]'), focus_node.findPlug('targetMatrix', False))
+                mesh_shape = ala_camera_surface.get_mesh_shape(object_to_focus) if surface else None
+                if mesh_shape is not None:
+                    modifier.connect(get_plug(mesh_shape + '.outMesh'), focus_node.findPlug('targetMesh', False))
+                elif surface:
+                    cmds.warning(f"{object_to_focus} has no mesh, {shot_camera_transform} focuses on its pivot")
+                modifier.newPlugValueBool(get_plug(shot_camera_shape + '.depthOfField'), True)
+                modifier.newPlugValueDouble(get_plug(shot_camera_shape + '.locatorScale'), 30)
+                if use_f_stop:
+                    modifier.connect(focus_node.findPlug('fStop', False), get_plug(shot_camera_shape + '.fStop'))
+                else:
+                    focus_distance_plug = focus_node.findPlug('focusDistance', False)
+                    modifier.connect(focus_distance_plug, get_plug(shot_camera_shape + '.focusDistance'))
+                    #do the same for arnold render view
+                    modifier.newPlugValueBool(get_plug(shot_camera_shape + '.aiEnableDOF'), True)
+                    modifier.newPlugValueDouble(get_plug(shot_camera_shape + '.aiApertureSize'), 2.8)
+                    modifier.connect(focus_distance_plug, get_plug(shot_camera_shape + '.aiFocusDistance'))
+                rigs.append((shot_camera_shape, focus_node))
+        yield ala_camera_jobs.progress(len(rigs), len(pairs), "Adding DOF rigs")
+    return rigs
+
+
+def batch_depth_of_field(pairs, use_f_stop=False, surface=False):
+    '''
+    Add a DOF rig to many (camera transform, object to focus) pairs at once,
+    see batch_depth_of_field_job. The whole batch is a single undo chunk.
+    Returns the (camera shape, focus node name) of every rig.
+    '''
+    with ala_camera_modifier.transaction("batchDepthOfField"):
+        rigs = ala_camera_jobs.run_now(batch_depth_of_field_job(pairs, use_f_stop, surface))
+    #the nodes are only renamed once the modifier is committed
+    return [(shot_camera_shape, focus_node.name()) for shot_camera_shape, focus_node in rigs]
+
+
+def get_scene_cameras(name_pattern=None):
+    '''
+    Get the (transform, shape) of every non default camera in the scene,
+    optionally only those whose transform name matches a glob pattern
+    '''
+    #the startup cameras (persp, top, front, side) are default nodes, one ls finds them all
+    startup_cameras = set(cmds.ls(type="camera", defaultNodes=True, long=True) or [])
+    cameras = []
+    for camera_shape in cmds.ls(type="camera", long=True) or []:
+        camera_transform = camera_shape.rsplit('|', 1)[0]
+        if camera_shape in startup_cameras:
+            continue
+        if name_pattern and not fnmatch.fnmatch(camera_transform.rsplit('|', 1)[-1], name_pattern):
+            continue
+        cameras.append((camera_transform, camera_shape))
+    return cameras
+
+
+def create_camera(camera_body=ala_camera_presets.DEFAULT_CAMERA_BODY):
+    '''
+    Creates a camera matching a camera body preset (AlexaLF by default),
+    which sets the film back, the Far Clip PLane and the render settings.
+    '''
+    with ala_camera_modifier.transaction("createCamera"):
+        camera = cmds.camera(n="ShotCamera")
+        apply_camera_body(camera[1], camera_body)
+    return camera
+
+
+def set_aspect_ratio(aspect_ratio):
+    '''
+    adjust aspect ratio, aspect_ratio is the name of a delivery format preset
+    '''
+    apply_delivery_format(aspect_ratio)
+
+
+def apply_alexa_settings(camera_shape):
+    '''
+    Sets the camera Aperature to match an AlexaLF camera.
+    And sets the scene Render Settings to HD.
+    '''
+    apply_camera_body(camera_shape, 'AlexaLF')
+
+
+def disable_depth_of_field(camera_shape):
+    '''
+    Disable Depth of Field of a camera (focal distance + fStop) and delete its rigs,
+    distance dimension rigs made before the alaFocusDistance node go with their locators
+    '''
+    ala_camera_rigs.delete_rigs(ala_camera_rigs.get_camera_rigs([camera_shape]), [camera_shape])
+
+
+def create_turntable_curve(obj):
+    '''
+    Create circular turntable curve around an object
+    '''
+    obj_x = cmds.getAttr(obj + '.translateX')
+    obj_y = cmds.getAttr(obj + '.translateY')
+    obj_z = cmds.getAttr(obj + '.translateZ')
+    with ala_camera_modifier.transaction("createTurntableCurve") as curve_transaction:
+        turntable_circle = cmds.circle(nr=(0, 0, 1), c=(obj_x, obj_y, obj_z), r=1000)
+        curve_transaction.set_values({turntable_circle[0] + '.rotateX': -90})
+    return turntable_circle[0]
+
+
+def animate_camera(cam, curve):
+    '''
+    - Creates turntable animation for moving the camera along the curve
+    - Increase camera angle at the Y axis by 45 degrees in every quarter
+    both tangent types are spline to use a non-linear interpolation
+    for a smoother animation for camera
+    '''
+    with ala_camera_modifier.transaction("animateCamera") as animation_transaction:
+        cmds.pathAnimation(curve,cam,stu = 0,etu = 180,follow = True,fractionMode = True)
+        animation_transaction.set_values({cam + '.rotateX': 0, cam + '.rotateY': 180})
+        # Keys are written as whole curves so the current time never moves
+        ala_camera_keys.write_anim_curves({
+            cam + '.rotateX': ([0], [0]),
+            cam + '.rotateY': ([0, 45, 90, 135, 180], [-180, -135, 0, 135, 180]),
+        }, tangent_type="spline")
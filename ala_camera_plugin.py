@@ -0,0 +1,229 @@
+'''
+ala_camera_plugin.py
+Maya plugin shipped with the camera tool.
+alaCameraCommit: applies the DG modifier queued by ala_camera_modifier.py
+as one undoable command.
+alaFocusDistance: computes the focus distance and a clamped f stop
+straight from the camera and target world matrices, or to the nearest
+surface point of the mesh connected to targetMesh. The mesh is only read
+from the node's datablock, so the node is safe under parallel evaluation.
+Each node keeps the surface index of its mesh and refits it when the mesh
+deforms. Its rigMode and
+rigVersion attributes tag it as a DOF rig of the tool (see ala_camera_rigs.py).
+'''
+# Ignore C0103 warning because Maya looks these names up on the plugin module
+# pylint: disable=invalid-name
+from maya.api import OpenMaya as om2
+import ala_camera_modifier
+import ala_camera_surface
+
+
+def maya_useNewAPI():
+    '''
+    Tell Maya this plugin uses the Python API 2.0
+    '''
+
+
+class CommitModifierCommand(om2.MPxCommand):
+    '''
+    Undoable command wrapping a DG modifier built by the camera tool
+    '''
+    COMMAND_NAME = 'alaCameraCommit'
+
+    def __init__(self):
+        super().__init__()
+        self.modifier = None
+        self.anim_curve_change = None
+
+    def doIt(self, _args):
+        '''
+        Take the pending modifier and apply it
+        '''
+        self.modifier, self.anim_curve_change = ala_camera_modifier.take_pending_modifier()
+        try:
+            self.modifier.doIt()
+        except RuntimeError:
+            #leave nothing half applied when one of the queued writes fails
+            self.undoIt()
+            raise
+
+    def redoIt(self):
+        '''
+        Apply the modifier and keys again after an undo
+        '''
+        self.modifier.doIt()
+        if self.anim_curve_change:
+            self.anim_curve_change.redoIt()
+
+    def undoIt(self):
+        '''
+        Revert everything the modifier and keys did
+        '''
+        if self.anim_curve_change:
+            self.anim_curve_change.undoIt()
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        '''
+        Keep the command on the undo queue
+        '''
+        return True
+
+    @staticmethod
+    def creator():
+        '''
+        Create a new instance of the command
+        '''
+        return CommitModifierCommand()
+
+
+class FocusDistanceNode(om2.MPxNode):
+    '''
+    DOF node replacing the distanceDimension + 2 locators rig
+    '''
+    TYPE_NAME = 'alaFocusDistance'
+    # Node ids 0x00000 - 0x7ffff are reserved for local use
+    TYPE_ID = om2.MTypeId(0x0007F1A0)
+
+    camera_matrix = None
+    target_matrix = None
+    target_mesh = None
+    min_f_stop = None
+    max_f_stop = None
+    focus_distance = None
+    f_stop = None
+    rig_mode = None
+    rig_version = None
+
+    def __init__(self):
+        super().__init__()
+        # SurfaceIndex of the targetMesh input in the normal context, refitted once the input changes
+        self.surface_index = None
+        self.mesh_dirty = True
+
+    def setDependentsDirty(self, plug, _affected_plugs):
+        '''
+        Mark the surface index stale when the target mesh changes, DG evaluation
+        '''
+        if plug.attribute() == FocusDistanceNode.target_mesh:
+            self.mesh_dirty = True
+
+    def preEvaluation(self, context, evaluation_node):
+        '''
+        Mark the surface index stale when the target mesh changes, parallel evaluation
+        '''
+        if context.isNormal() and evaluation_node.dirtyPlugExists(FocusDistanceNode.target_mesh):
+            self.mesh_dirty = True
+
+    def get_surface_index(self, mesh_data, context):
+        '''
+        SurfaceIndex of the mesh data from the datablock. Only the normal context keeps its index,
+        other contexts (background evaluation, DG context sampling) fit one from the current points.
+        '''
+        if not context.isNormal():
+            return ala_camera_surface.fit_index(ala_camera_surface.SurfaceIndex, *ala_camera_surface.read_mesh(mesh_data),
+                                                self.surface_index)
+        if self.surface_index is None or self.mesh_dirty:
+            self.surface_index = ala_camera_surface.fit_index(ala_camera_surface.SurfaceIndex, *ala_camera_surface.read_mesh(mesh_data),
+                                                              self.surface_index)
+            self.mesh_dirty = False
+        return self.surface_index
+
+    def compute(self, plug, data):
+        '''
+        Measure the distance between both world positions and clamp it for the f stop
+        '''
+        if plug.attribute() not in (FocusDistanceNode.focus_distance, FocusDistanceNode.f_stop):
+            return
+        camera_matrix = data.inputValue(FocusDistanceNode.camera_matrix).asMatrix()
+        target_matrix = data.inputValue(FocusDistanceNode.target_matrix).asMatrix()
+        camera_position = om2.MPoint(om2.MTransformationMatrix(camera_matrix).translation(om2.MSpace.kWorld))
+        #only the datablock is read, never the mesh node itself
+        mesh_data = data.inputValue(FocusDistanceNode.target_mesh).asMesh()
+        if mesh_data.isNull():
+            target_position = om2.MPoint(om2.MTransformationMatrix(target_matrix).translation(om2.MSpace.kWorld))
+        else:
+            #search in the object space of the mesh so moving it never refits the index
+            surface_index = self.get_surface_index(mesh_data, data.context())
+            nearest = surface_index.nearest_point(tuple(camera_position * target_matrix.inverse())[:3])
+            target_position = om2.MPoint(*nearest) * target_matrix
+        distance = (target_position - camera_position).length()
+        min_f_stop = data.inputValue(FocusDistanceNode.min_f_stop).asDouble()
+        max_f_stop = data.inputValue(FocusDistanceNode.max_f_stop).asDouble()
+
+        data.outputValue(FocusDistanceNode.focus_distance).setDouble(distance)
+        data.outputValue(FocusDistanceNode.f_stop).setDouble(min(max(distance, min_f_stop), max_f_stop))
+        data.setClean(FocusDistanceNode.focus_distance)
+        data.setClean(FocusDistanceNode.f_stop)
+
+    @staticmethod
+    def creator():
+        '''
+        Create a new instance of the node
+        '''
+        return FocusDistanceNode()
+
+    @staticmethod
+    def initialize():
+        '''
+        Add the matrix inputs, f stop range, outputs and rig tags of the node
+        '''
+        matrix_fn = om2.MFnMatrixAttribute()
+        typed_fn = om2.MFnTypedAttribute()
+        numeric_fn = om2.MFnNumericAttribute()
+        enum_fn = om2.MFnEnumAttribute()
+
+        FocusDistanceNode.camera_matrix = matrix_fn.create('cameraMatrix', 'cm', om2.MFnMatrixAttribute.kDouble)
+        FocusDistanceNode.target_matrix = matrix_fn.create('targetMatrix', 'tm', om2.MFnMatrixAttribute.kDouble)
+        #optional, the object space mesh of the target for nearest surface point focus
+        FocusDistanceNode.target_mesh = typed_fn.create('targetMesh', 'tms', om2.MFnData.kMesh)
+        typed_fn.storable = False
+
+        FocusDistanceNode.min_f_stop = numeric_fn.create('minFStop', 'mnf', om2.MFnNumericData.kDouble, 1.0)
+        numeric_fn.keyable = True
+        FocusDistanceNode.max_f_stop = numeric_fn.create('maxFStop', 'mxf', om2.MFnNumericData.kDouble, 64.0)
+        numeric_fn.keyable = True
+
+        FocusDistanceNode.focus_distance = numeric_fn.create('focusDistance', 'fd', om2.MFnNumericData.kDouble, 0.0)
+        numeric_fn.writable = False
+        numeric_fn.storable = False
+        FocusDistanceNode.f_stop = numeric_fn.create('fStop', 'fs', om2.MFnNumericData.kDouble, 0.0)
+        numeric_fn.writable = False
+        numeric_fn.storable = False
+
+        #tags only, they never affect the outputs
+        FocusDistanceNode.rig_mode = enum_fn.create('rigMode', 'rgm', 0)
+        enum_fn.addField('focusDistance', 0)
+        enum_fn.addField('fStop', 1)
+        FocusDistanceNode.rig_version = numeric_fn.create('rigVersion', 'rgv', om2.MFnNumericData.kInt, 0)
+        FocusDistanceNode.addAttribute(FocusDistanceNode.rig_mode)
+        FocusDistanceNode.addAttribute(FocusDistanceNode.rig_version)
+
+        inputs = (FocusDistanceNode.camera_matrix, FocusDistanceNode.target_matrix, FocusDistanceNode.target_mesh,
+                  FocusDistanceNode.min_f_stop, FocusDistanceNode.max_f_stop)
+        outputs = (FocusDistanceNode.focus_distance, FocusDistanceNode.f_stop)
+        for attribute in inputs + outputs:
+            FocusDistanceNode.addAttribute(attribute)
+        for input_attribute in inputs:
+            for output_attribute in outputs:
+                FocusDistanceNode.attributeAffects(input_attribute, output_attribute)
+
+
+def initializePlugin(plugin):
+    '''
+    Register the camera tool commands and nodes
+    '''
+    plugin_fn = om2.MFnPlugin(plugin, 'Jeffrey Chung', '1.0')
+    plugin_fn.registerCommand(CommitModifierCommand.COMMAND_NAME, CommitModifierCommand.creator)
+    plugin_fn.registerNode(FocusDistanceNode.TYPE_NAME, FocusDistanceNode.TYPE_ID,
+                           FocusDistanceNode.creator, FocusDistanceNode.initialize)
+
+
+def uninitializePlugin(plugin):
+    '''
+    Deregister the camera tool commands and nodes
+    '''
+    plugin_fn = om2.MFnPlugin(plugin)
+    ala_camera_surface.clear_surface_indexes()
+    plugin_fn.deregisterCommand(CommitModifierCommand.COMMAND_NAME)
+    plugin_fn.deregisterNode(FocusDistanceNode.TYPE_ID)
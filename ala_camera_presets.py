@@ -0,0 +1,108 @@
+'''
+ala_camera_presets.py
+Camera body, lens set, zoom lens and delivery format presets of the camera tool.
+Presets are read from the JSON files in the presets folder next to this
+script (and any folder listed in ALA_CAMERA_PRESETS_PATH) the first time
+they are needed, then looked up by name through an in-memory index.
+Adding a new camera body only needs a new JSON file, e.g.
+
+    {"camera_bodies": [{"name": "...", "attributes": {...}, "delivery_format": "16:9"}]}
+'''
+import glob
+import json
+import os
+
+CAMERA_BODIES = 'camera_bodies'
+LENS_SETS = 'lens_sets'
+DELIVERY_FORMATS = 'delivery_formats'
+ZOOM_LENSES = 'zoom_lenses'
+
+DEFAULT_CAMERA_BODY = 'AlexaLF'
+DEFAULT_LENS_SET = 'Arri Master Prime'
+DEFAULT_DELIVERY_FORMAT = '16:9'
+
+PRESETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'presets')
+
+
+def get_presets_dirs():
+    '''
+    Folders searched for preset files, studio folders override the shipped presets
+    '''
+    extra_dirs = [path for path in os.environ.get('ALA_CAMERA_PRESETS_PATH', '').split(os.pathsep) if path]
+    return [PRESETS_DIR] + extra_dirs
+
+
+class PresetRegistry():
+    '''
+    Lazily loaded presets indexed by category and name
+    '''
+    def __init__(self, presets_dirs=None):
+        self.presets_dirs = presets_dirs
+        # {category: {name: preset}}, None until the files are read
+        self.index = None
+
+    def load(self):
+        '''
+        Read every preset file once and index the presets by name
+        '''
+        if self.index is not None:
+            return self.index
+        index = {}
+        for presets_dir in self.presets_dirs or get_presets_dirs():
+            for file_path in sorted(glob.glob(os.path.join(presets_dir, '*.json'))):
+                with open(file_path, encoding='utf-8') as preset_file:
+                    for category, presets in json.load(preset_file).items():
+                        category_index = index.setdefault(category, {})
+                        for preset in presets:
+                            category_index[preset['name']] = preset
+        self.index = index
+        return index
+
+    def reload(self):
+        '''
+        Forget the loaded presets so the files are read again on next use
+        '''
+        self.index = None
+
+    def names(self, category):
+        '''
+        Names of every preset in a category, in file order
+        '''
+        return list(self.load().get(category, {}))
+
+    def get(self, category, name):
+        '''
+        Get one preset by name
+        '''
+        try:
+            return self.load()[category][name]
+        except KeyError:
+            raise KeyError(f"No {category} preset named {name!r}, expected one of {self.names(category)}") from None
+
+    def camera_body(self, name):
+        '''
+        Get a camera body preset
+        '''
+        return self.get(CAMERA_BODIES, name)
+
+    def lens_set(self, name):
+        '''
+        Get a lens set preset
+        '''
+        return self.get(LENS_SETS, name)
+
+    def zoom_lens(self, name):
+        '''
+        Get a zoom lens preset
+        '''
+        return self.get(ZOOM_LENSES, name)
+
+    def delivery_format(self, name):
+        '''
+        Get a delivery format preset
+        '''
+        return self.get(DELIVERY_FORMATS, name)
+
+
+# Registry shared by the tool, the batch entry point and the UI
+registry = PresetRegistry()
@@ -0,0 +1,245 @@
+'''
+ala_camera_profiler.py
+Opt-in profiling of the camera tool.
+While enabled, every maya.cmds call made by the tool modules is timed and
+attributed to the tool action (button click) it ran in. Results can be
+saved as a Chrome trace (open it in chrome://tracing or Perfetto) when
+profiling stops and printed as a summary table. Nothing is wrapped until enable() is called,
+so the tool runs at full speed when profiling is off.
+
+    import ala_camera_profiler
+    ala_camera_profiler.enable('/tmp/camera_tool_trace.json')
+    ...click buttons...
+    print(ala_camera_profiler.disable().summary_table())
+'''
+import collections
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Modules whose cmds calls are profiled are the imported modules with this prefix
+PROFILED_MODULE_PREFIX = 'ala_camera_'
+
+# Commands that make Maya evaluate the dependency graph
+DG_EVALUATION_COMMANDS = {'currentTime', 'refresh', 'dgeval', 'playblast', 'bakeResults'}
+
+OUTSIDE_ACTIONS = '(outside actions)'
+
+# Profiler collecting calls, None while profiling is off
+# Ignore C0103 warning because enable() and disable() swap the profiler, it is not a constant
+active_profiler = None  # pylint: disable=invalid-name
+# module -> its original cmds module, restored by disable()
+original_cmds = {}
+
+
+def triggers_evaluation(command_name, flags):
+    '''
+    Whether a cmds call makes Maya evaluate the scene, getAttr only does so at another time
+    '''
+    return command_name in DG_EVALUATION_COMMANDS or (command_name == 'getAttr' and 'time' in flags)
+
+
+# Ignore R0903 warning because the stats are a record filled in by the profiler
+class ActionStats():  # pylint: disable=too-few-public-methods
+    '''
+    Totals of every run of one tool action
+    '''
+    def __init__(self):
+        self.runs = 0
+        self.seconds = 0.0
+        self.dg_evaluations = 0
+        self.command_calls = collections.Counter()
+        self.command_seconds = collections.defaultdict(float)
+
+    def slowest_commands(self, count=5):
+        '''
+        (name, calls, seconds) of the commands that took the most time
+        '''
+        names = sorted(self.command_seconds, key=self.command_seconds.get, reverse=True)[:count]
+        return [(name, self.command_calls[name], self.command_seconds[name]) for name in names]
+
+
+class Profiler():
+    '''
+    Records tool actions and the cmds calls made inside them
+    '''
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.start = time.perf_counter()
+        # Chrome trace "complete" events
+        self.events = []
+        self.actions = collections.defaultdict(ActionStats)
+        self.action_stack = []
+
+    def timestamp(self, seconds):
+        '''
+        Microseconds since the profiler started, the Chrome trace time unit
+        '''
+        return (seconds - self.start) * 1e6
+
+    def add_event(self, name, category, start, end, args=None):
+        '''
+        Record one Chrome trace event
+        '''
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': self.timestamp(start),
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args or {},
+        })
+
+    def current_action(self):
+        '''
+        Name of the innermost running tool action, None outside actions
+        '''
+        return self.action_stack[-1] if self.action_stack else None
+
+    @contextlib.contextmanager
+    def action(self, name, new_run=True):
+        '''
+        Attribute the cmds calls made inside the block to a tool action,
+        new_run=False adds a later step of a run, e.g. of the job an action submitted
+        '''
+        self.action_stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.action_stack.pop()
+            stats = self.actions[name]
+            stats.runs += new_run
+            stats.seconds += end - start
+            self.add_event(name, 'action', start, end)
+
+    def call_command(self, command_name, command, args, flags):
+        '''
+        Run a cmds command and record its time under the current action
+        '''
+        start = time.perf_counter()
+        try:
+            return command(*args, **flags)
+        finally:
+            end = time.perf_counter()
+            stats = self.actions[self.action_stack[-1] if self.action_stack else OUTSIDE_ACTIONS]
+            stats.command_calls[command_name] += 1
+            stats.command_seconds[command_name] += end - start
+            evaluates = triggers_evaluation(command_name, flags)
+            if evaluates:
+                stats.dg_evaluations += 1
+            #the first argument is usually the node or plug the command works on
+            self.add_event(command_name, 'dg_evaluation' if evaluates else 'cmds', start, end,
+                           {'target': str(args[0])[:200]} if args else None)
+
+    def chrome_trace(self):
+        '''
+        Recorded events in the Chrome trace JSON format
+        '''
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, trace_path=None):
+        '''
+        Save the Chrome trace, to the path given to enable() by default
+        '''
+        with open(trace_path or self.trace_path, 'w', encoding='utf-8') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+    def summary_table(self, command_count=5):
+        '''
+        Runs, time, cmds calls and DG evaluations of every action with its slowest commands
+        '''
+        lines = [f"{'action':32} {'runs':>5} {'seconds':>9} {'cmds':>7} {'cmds s':>9} {'DG evals':>8}"]
+        for name, stats in sorted(self.actions.items(), key=lambda item: item[1].seconds, reverse=True):
+            command_seconds = sum(stats.command_seconds.values())
+            lines.append(f"{name:32} {stats.runs:5} {stats.seconds:9.4f} {sum(stats.command_calls.values()):7} "
+                         f"{command_seconds:9.4f} {stats.dg_evaluations:8}")
+            for command_name, calls, seconds in stats.slowest_commands(command_count):
+                lines.append(f"    {command_name:28} {'':5} {'':9} {calls:7} {seconds:9.4f}")
+        return '\n'.join(lines)
+
+
+# Ignore R0903 warning because every command is reached through __getattr__
+class ProfiledCmds():  # pylint: disable=too-few-public-methods
+    '''
+    Stands in for maya.cmds in a tool module and times every command
+    '''
+    def __init__(self, cmds_module, profiler):
+        self.cmds_module = cmds_module
+        self.profiler = profiler
+
+    def __getattr__(self, command_name):
+        command = getattr(self.cmds_module, command_name)
+        if not callable(command):
+            return command
+        cmds_module = self.cmds_module
+        profiler = self.profiler
+
+        @functools.wraps(command)
+        def profiled_command(*args, **flags):
+            #look the command up on every call like the tool modules do
+            return profiler.call_command(command_name, getattr(cmds_module, command_name), args, flags)
+        #cache the wrapper so later calls skip __getattr__
+        setattr(self, command_name, profiled_command)
+        return profiled_command
+
+
+def get_profiled_modules():
+    '''
+    Names of every imported tool module, whatever imported them
+    '''
+    return sorted(name for name in sys.modules if name.startswith(PROFILED_MODULE_PREFIX) and name != __name__)
+
+
+def enable(trace_path=None, module_names=None):
+    '''
+    Start profiling the cmds calls of the already imported tool modules, every module
+    named ala_camera_* by default. With a trace_path the Chrome trace is saved by disable().
+    '''
+    # Ignore W0603 warning because the slots and modules share one profiler
+    global active_profiler  # pylint: disable=global-statement
+    if active_profiler is not None:
+        disable()
+    active_profiler = Profiler(trace_path)
+    for module_name in module_names or get_profiled_modules():
+        module = sys.modules.get(module_name)
+        if module is not None and hasattr(module, 'cmds'):
+            original_cmds[module] = module.cmds
+            module.cmds = ProfiledCmds(module.cmds, active_profiler)
+    return active_profiler
+
+
+def disable():
+    '''
+    Stop profiling and put the original cmds back, returns the finished profiler
+    '''
+    # Ignore W0603 warning because the slots and modules share one profiler
+    global active_profiler  # pylint: disable=global-statement
+    for module, cmds_module in original_cmds.items():
+        module.cmds = cmds_module
+    original_cmds.clear()
+    profiler, active_profiler = active_profiler, None
+    if profiler is not None and profiler.trace_path:
+        profiler.write_chrome_trace()
+    return profiler
+
+
+def profile_action(slot):
+    '''
+    Profile a CameraTool slot as one tool action, only a None check while profiling is off
+    '''
+    @functools.wraps(slot)
+    def wrapper(self, *_args):
+        profiler = active_profiler
+        if profiler is None:
+            return slot(self)
+        with profiler.action(slot.__name__):
+            return slot(self)
+    return wrapper
@@ -0,0 +1,162 @@
+'''
+ala_camera_rigs.py
+Registry of the DOF rigs in a scene.
+Rigs are found with one typed query instead of a scene scan: alaFocusDistance
+nodes, tagged with their rigMode and rigVersion when the tool builds them,
+and the distance dimensions of rigs made by older versions that still drive
+a camera. Listing, enabling, disabling and deleting work on any number of
+rigs at once, each bulk action is one transaction.
+'''
+import collections
+from maya import cmds
+import ala_camera_modifier
+from ala_camera_modifier import get_plug, get_plug_value
+
+FOCUS_NODE_TYPE = 'alaFocusDistance'
+LEGACY_RIG_NODE_TYPE = 'distanceDimShape'
+
+# rigMode enum fields of the alaFocusDistance node
+RIG_MODES = ('focusDistance', 'fStop')
+LEGACY_RIG_MODE = 'legacy'
+# rigVersion tag of new rigs, rigs built before the tags read 0
+RIG_VERSION = 1
+
+DOF_FLAGS = ('depthOfField', 'aiEnableDOF')
+
+# One DOF rig. node is the alaFocusDistance node or distance dimension shape,
+# nodes are deleted with the rig, camera_shape and target are None once orphaned
+DofRig = collections.namedtuple('DofRig', ['node', 'mode', 'version', 'camera_shape', 'target', 'enabled', 'nodes'])
+
+
+def plug_node(plug_name):
+    '''
+    Node name of a "node.attribute" plug
+    '''
+    return plug_name.split('.', 1)[0]
+
+
+def get_rig_connections(rig_nodes):
+    '''
+    {rig node: {attribute: [connected plugs]}} of every rig node in one query
+    '''
+    connections = collections.defaultdict(lambda: collections.defaultdict(list))
+    if not rig_nodes:
+        return connections
+    listed = cmds.listConnections(rig_nodes, connections=True, plugs=True, source=True, destination=True) or []
+    for own_plug, connected_plug in zip(listed[::2], listed[1::2]):
+        node, attribute = own_plug.split('.', 1)
+        #worldPosition[0] and worldMatrix[0] are looked up without their index
+        connections[node][attribute.split('[', 1)[0]].append(connected_plug)
+    return connections
+
+
+def is_dof_enabled(camera_shape):
+    '''
+    Whether depth of field is switched on for a camera, read without a cmds call
+    '''
+    return camera_shape is not None and bool(get_plug_value(get_plug(camera_shape + '.depthOfField')))
+
+
+def build_rigs(focus_nodes, legacy_nodes):
+    '''
+    DofRig records of alaFocusDistance nodes and distance dimension shapes,
+    distance dimensions that do not drive a camera are not rigs and are left out
+    '''
+    connections = get_rig_connections(focus_nodes + legacy_nodes)
+    rigs = []
+    for node in focus_nodes:
+        node_connections = connections[node]
+        camera_shapes = [plug_node(plug) for attribute in RIG_MODES for plug in node_connections[attribute]]
+        targets = [plug_node(plug) for plug in node_connections['targetMatrix']]
+        version = get_plug_value(get_plug(node + '.rigVersion'))
+        if version:
+            mode = RIG_MODES[get_plug_value(get_plug(node + '.rigMode'))]
+        else:
+            #untagged rigs only tell their mode through the camera attribute they drive
+            mode = 'fStop' if node_connections['fStop'] else 'focusDistance'
+        camera_shape = camera_shapes[0] if camera_shapes else None
+        rigs.append(DofRig(node, mode, version, camera_shape, targets[0] if targets else None,
+                           is_dof_enabled(camera_shape), (node,)))
+
+    for shape in legacy_nodes:
+        node_connections = connections[shape]
+        camera_shapes = [plug_node(plug) for plug in node_connections['distance']]
+        if not camera_shapes:
+            continue
+        locator_shapes = [plug_node(plug) for attribute in ('startPoint', 'endPoint') for plug in node_connections[attribute]]
+        #delete the transforms so no empty transform is left behind, the end locator is the focus target
+        nodes = tuple(cmds.listRelatives([shape] + locator_shapes, parent=True, fullPath=True) or ())
+        target = nodes[-1] if len(locator_shapes) == 2 else None
+        rigs.append(DofRig(shape, LEGACY_RIG_MODE, 0, camera_shapes[0], target, is_dof_enabled(camera_shapes[0]), nodes))
+    return rigs
+
+
+def list_rigs():
+    '''
+    Every DOF rig in the scene, found with one typed query
+    '''
+    listed = cmds.ls(type=[FOCUS_NODE_TYPE, LEGACY_RIG_NODE_TYPE], showType=True) or []
+    focus_nodes = []
+    legacy_nodes = []
+    for node, node_type in zip(listed[::2], listed[1::2]):
+        (focus_nodes if node_type == FOCUS_NODE_TYPE else legacy_nodes).append(node)
+    return build_rigs(focus_nodes, legacy_nodes)
+
+
+def get_camera_rigs(camera_shapes):
+    '''
+    DOF rigs driving the given cameras
+    '''
+    if not camera_shapes:
+        return []
+    focus_nodes = cmds.listConnections(camera_shapes, source=True, destination=False, type=FOCUS_NODE_TYPE) or []
+    legacy_nodes = cmds.listConnections(camera_shapes, source=True, destination=False, type=LEGACY_RIG_NODE_TYPE, shapes=True) or []
+    return build_rigs(list(dict.fromkeys(focus_nodes)), list(dict.fromkeys(legacy_nodes)))
+
+
+def get_rig_cameras(rigs):
+    '''
+    Cameras driven by the rigs, orphaned rigs have none
+    '''
+    return list(dict.fromkeys(rig.camera_shape for rig in rigs if rig.camera_shape is not None))
+
+
+def set_rigs_enabled(rigs, enabled):
+    '''
+    Switch depth of field on or off for the cameras of the rigs, the rigs are kept
+    '''
+    with ala_camera_modifier.transaction("setDofRigsEnabled") as rigs_transaction:
+        rigs_transaction.set_values({camera_shape + '.' + flag: enabled for camera_shape in get_rig_cameras(rigs) for flag in DOF_FLAGS})
+    return len(rigs)
+
+
+def delete_rigs(rigs, camera_shapes=None):
+    '''
+    Delete rigs with every node they are made of and switch depth of field off
+    on camera_shapes, the cameras of the rigs by default
+    '''
+    nodes = list(dict.fromkeys(node for rig in rigs for node in rig.nodes))
+    if camera_shapes is None:
+        camera_shapes = get_rig_cameras(rigs)
+    with ala_camera_modifier.transaction("deleteDofRigs") as rigs_transaction:
+        rigs_transaction.delete(nodes)
+        rigs_transaction.set_values({camera_shape + '.' + flag: False for camera_shape in camera_shapes for flag in DOF_FLAGS})
+    return len(rigs)
+
+
+def clean_up_rigs():
+    '''
+    Delete every DOF rig in the scene, orphaned ones included
+    '''
+    return delete_rigs(list_rigs())
+
+
+def format_rig_report(rigs):
+    '''
+    One line per rig with its camera, target, mode and state
+    '''
+    lines = [f"{len(rigs)} DOF rigs"]
+    for rig in rigs:
+        state = 'orphaned' if rig.camera_shape is None else ('enabled' if rig.enabled else 'disabled')
+        lines.append(f"  {rig.node}: {rig.camera_shape or '-'} -> {rig.target or '-'} ({rig.mode}, v{rig.version}, {state})")
+    return '\n'.join(lines)
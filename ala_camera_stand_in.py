@@ -0,0 +1,1064 @@
+'''
+ala_camera_stand_in.py
+In-memory stand-in for the parts of Maya the camera tool talks to:
+maya.cmds, maya.api.OpenMaya, maya.api.OpenMayaAnim, maya.standalone and
+maya.utils, whose deferred calls are run by FakeScene.run_deferred().
+Every cmds call is counted so benchmarks can report how many round trips
+an operation makes, and synthetic scenes with thousands of cameras and
+locators can be generated without a Maya licence.
+
+    import ala_camera_stand_in
+    scene = ala_camera_stand_in.install()
+    import ala_camera_operations   # now talks to the stand-in
+
+Only translation is modelled for world matrices, rotation and scale are ignored.
+The OpenMaya classes are in ala_camera_stand_in_api.py.
+'''
+# Ignore C0302 warning because every modelled cmds command lives in the one FakeCmds class
+# pylint: disable=too-many-lines
+import collections
+import itertools
+import math
+import sys
+from time import perf_counter, sleep
+import types
+import numpy as np
+import ala_camera_stand_in_api
+
+# Attributes that are not plain doubles, anything missing is a double
+ANGLE_ATTRIBUTES = {'rotateX', 'rotateY', 'rotateZ'}
+DISTANCE_ATTRIBUTES = {'translateX', 'translateY', 'translateZ', 'farClipPlane', 'nearClipPlane', 'focusDistance'}
+INT_ATTRIBUTES = {'width', 'height', 'rigVersion'}
+BOOL_ATTRIBUTES = {'depthOfField', 'aiEnableDOF', 'visibility'}
+ENUM_ATTRIBUTES = {'rotateOrder', 'rigMode', 'filmFit'}
+
+ATTRIBUTE_ALIASES = {
+    'fl': 'focalLength',
+    'tx': 'translateX', 'ty': 'translateY', 'tz': 'translateZ',
+    'rx': 'rotateX', 'ry': 'rotateY', 'rz': 'rotateZ',
+}
+
+DEFAULT_VALUES = {
+    'camera': {
+        'focalLength': 35.0, 'fStop': 5.6, 'focusDistance': 5.0, 'locatorScale': 1.0,
+        'horizontalFilmAperture': 1.417, 'verticalFilmAperture': 0.945,
+        'nearClipPlane': 0.1, 'farClipPlane': 10000.0, 'depthOfField': False,
+        'aiEnableDOF': False, 'aiApertureSize': 0.0, 'aiFocusDistance': 100.0, 'filmFit': 0,
+    },
+    'renderGlobals': {'imageFilePrefix': ''},
+    'resolution': {'width': 640, 'height': 480, 'deviceAspectRatio': 1.333},
+    'alaFocusDistance': {'minFStop': 1.0, 'maxFStop': 64.0, 'rigMode': 0, 'rigVersion': 0},
+}
+
+STARTUP_CAMERAS = ('persp', 'top', 'front', 'side')
+
+# Commands that change the scene, each one is an undo entry and a viewport refresh of its own.
+# camera is charged by the command itself because it is also used for queries.
+SCENE_CHANGING_COMMANDS = {
+    'setAttr', 'connectAttr', 'disconnectAttr', 'delete', 'circle', 'pathAnimation', 'setKeyframe',
+    'distanceDimension', 'parent', 'rename', 'spaceLocator', 'createNode', 'alaCameraCommit', 'addAttr',
+}
+
+# Node types that live under a transform in the outliner
+SHAPE_TYPES = {'camera', 'locator', 'nurbsCurve', 'distanceDimShape', 'mesh'}
+
+# Abstract node types ls can filter on -> the stand-in node types deriving from them
+INHERITED_TYPES = {'geometryFilter': {'skinCluster', 'blendShape', 'cluster', 'nonLinear'}}
+
+
+def split_plug(plug_name):
+    '''
+    Split "|parent|node.attribute[0]" into ("node", "attribute")
+    '''
+    node_name, _, attribute = plug_name.partition('.')
+    attribute = attribute.split('[', 1)[0]
+    return node_name.rsplit('|', 1)[-1], ATTRIBUTE_ALIASES.get(attribute, attribute)
+
+
+def renamed_plug(plug_name, old_name, new_name):
+    '''
+    "old.attribute" -> "new.attribute", plugs of other nodes are kept
+    '''
+    node_name, attribute = plug_name.split('.', 1)
+    return (new_name if node_name == old_name else node_name) + '.' + attribute
+
+
+def as_list(items):
+    '''
+    Accept a single name or any sequence of names
+    '''
+    if items is None:
+        return []
+    if isinstance(items, str):
+        return [items]
+    return list(items)
+
+
+# Ignore R0903 warning because nodes are plain records of the scene
+class FakeNode():  # pylint: disable=too-few-public-methods
+    '''
+    A DG/DAG node of the stand-in scene
+    '''
+    def __init__(self, name, node_type, parent=None):
+        self.name = name
+        self.node_type = node_type
+        self.parent = parent
+        self.children = []
+        self.attributes = dict(DEFAULT_VALUES.get(node_type, {}))
+        # [(time, value)] of anim curve nodes
+        self.keys = []
+        # (vertex array, triangle corners) of mesh shapes, see FakeScene.set_mesh
+        self.geometry = None
+
+    def long_name(self):
+        '''
+        Full DAG path of the node
+        '''
+        if self.node_type not in SHAPE_TYPES and self.node_type != 'transform':
+            return self.name
+        path = '|' + self.name
+        parent = self.parent
+        while parent is not None:
+            path = '|' + parent.name + path
+            parent = parent.parent
+        return path
+
+
+# Ignore R0902/R0904 warnings because the scene holds all of Maya's state in one place
+class FakeScene():  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    '''
+    In-memory scene with the cmds commands used by the camera tool as methods
+    '''
+    def __init__(self):
+        self.call_counts = collections.Counter()
+        self.viewport_refreshes = 0
+        self.undo_entries = 0
+        # Simulated seconds of viewport redraw charged for every refresh
+        self.refresh_seconds = 0.0
+        self.batch_mode = False
+        self.scene_files = {}
+        self.saved_files = []
+        self.warnings = []
+        self.plugin_commands = {}
+        # (command, camera, width, height, time, file prefix) of every render and playblast
+        self.outputs = []
+        # Simulated seconds charged for every rendered or playblasted frame
+        self.render_seconds = 0.0
+        # Calls queued by maya.utils.executeDeferred from any thread, run by run_deferred()
+        self.deferred = collections.deque()
+        self.reset()
+
+    def reset(self):
+        '''
+        Start from an empty scene holding only Maya's default nodes
+        '''
+        self.nodes = {}
+        # destination plug -> source plug, both as "node.attribute"
+        self.connections = {}
+        # node name -> destination plugs of every connection touching the node
+        self.connected_plugs = collections.defaultdict(set)
+        # base name -> last number appended by unique_name
+        self.name_counters = {}
+        self.selection = []
+        self.look_through = 'persp'
+        self.current_time = 1.0
+        self.context_time = None
+        self.playback_range = (1.0, 120.0)
+        self.undo_chunk_depth = 0
+        self.undo_chunk_changed = False
+        self.undo_enabled = True
+        self.undo_calls = 0
+        self.refresh_suspended = False
+        self.file_name = None
+        # node -> {callback id: function(dirty attribute)} added by MNodeMessage
+        self.dirty_callbacks = collections.defaultdict(dict)
+        # event name -> {callback id: function()} added by MEventMessage
+        self.event_callbacks = collections.defaultdict(dict)
+        self.callback_ids = itertools.count(1)
+        # nodes every new scene starts with, listed by ls(defaultNodes=True)
+        self.default_nodes = {self.add_node('defaultResolution', 'resolution'), self.add_node('defaultRenderGlobals', 'renderGlobals')}
+        for camera_name in STARTUP_CAMERAS:
+            self.default_nodes.update(self.add_camera(camera_name))
+
+    # --- scene building helpers -------------------------------------------------
+
+    def unique_name(self, name):
+        '''
+        Append a number to a name already used in the scene, like Maya does
+        '''
+        if name not in self.nodes:
+            return name
+        base = name.rstrip('0123456789')
+        index = self.name_counters.get(base, 0) + 1
+        while f"{base}{index}" in self.nodes:
+            index += 1
+        self.name_counters[base] = index
+        return f"{base}{index}"
+
+    def add_node(self, name, node_type, parent=None):
+        '''
+        Add a node with a unique name and return it
+        '''
+        node = FakeNode(self.unique_name(name), node_type, parent)
+        self.nodes[node.name] = node
+        if parent is not None:
+            parent.children.append(node)
+        return node
+
+    def add_camera(self, name, translate=(0.0, 0.0, 0.0)):
+        '''
+        Add a camera transform + shape and return both
+        '''
+        transform = self.add_node(name, 'transform')
+        transform.attributes.update(zip(('translateX', 'translateY', 'translateZ'), translate))
+        shape = self.add_node(transform.name + 'Shape', 'camera', transform)
+        return transform, shape
+
+    def add_locator(self, name, translate=(0.0, 0.0, 0.0)):
+        '''
+        Add a locator transform + shape and return both
+        '''
+        transform = self.add_node(name, 'transform')
+        transform.attributes.update(zip(('translateX', 'translateY', 'translateZ'), translate))
+        shape = self.add_node(transform.name + 'Shape', 'locator', transform)
+        return transform, shape
+
+    def node(self, name):
+        '''
+        Find a node by short or long name
+        '''
+        short_name = name.rsplit('|', 1)[-1]
+        if short_name not in self.nodes:
+            raise ValueError(f"No object matches name: {name}")
+        return self.nodes[short_name]
+
+    def set_parent(self, node, parent):
+        '''
+        Move a DAG node under another one
+        '''
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        parent.children.append(node)
+
+    def record_change(self):
+        '''
+        Charge a scene changing command: an undo entry unless a chunk is open,
+        a viewport refresh unless the refresh is suspended
+        '''
+        if self.undo_enabled:
+            if self.undo_chunk_depth:
+                self.undo_chunk_changed = True
+            else:
+                self.undo_entries += 1
+        if not self.refresh_suspended:
+            self.viewport_refreshes += 1
+            if self.refresh_seconds:
+                sleep(self.refresh_seconds)
+
+    def plug(self, plug_name):
+        '''
+        (node, attribute) of a "node.attribute" plug name
+        '''
+        node_name, attribute = split_plug(plug_name)
+        return self.node(node_name), attribute
+
+    @staticmethod
+    def attribute_type(attribute):
+        '''
+        'angle', 'distance', 'int', 'bool', 'enum' or 'double'
+        '''
+        if attribute in ANGLE_ATTRIBUTES:
+            return 'angle'
+        if attribute in DISTANCE_ATTRIBUTES:
+            return 'distance'
+        if attribute in INT_ATTRIBUTES:
+            return 'int'
+        if attribute in BOOL_ATTRIBUTES:
+            return 'bool'
+        if attribute in ENUM_ATTRIBUTES:
+            return 'enum'
+        return 'double'
+
+    # --- evaluation -------------------------------------------------------------
+
+    def evaluation_time(self, time=None):
+        '''
+        Time used for evaluation: explicit, then the context time, then the current time
+        '''
+        if time is not None:
+            return float(time)
+        if self.context_time is not None:
+            return self.context_time
+        return self.current_time
+
+    def value(self, node, attribute, time=None):
+        '''
+        Evaluate an attribute, following incoming connections
+        '''
+        source = self.connections.get(node.name + '.' + attribute)
+        if source is None:
+            if attribute == 'translate':
+                return tuple(self.value(node, axis, time) for axis in ('translateX', 'translateY', 'translateZ'))
+            return node.attributes.get(attribute, 0.0)
+        source_node_name, source_attribute = split_plug(source)
+        source_node = self.nodes[source_node_name]
+        if source_node.node_type.startswith('animCurve'):
+            return self.evaluate_curve(source_node, self.evaluation_time(time))
+        if source_node.node_type == 'alaFocusDistance':
+            return self.evaluate_focus_node(source_node, source_attribute, time)
+        if source_node.node_type == 'distanceDimShape' and source_attribute == 'distance':
+            return self.evaluate_distance_dimension(source_node, time)
+        return self.value(source_node, source_attribute, time)
+
+    def evaluate_curve(self, curve, time):
+        '''
+        Linear interpolation of anim curve keys, angular curves hold radians
+        '''
+        keys = curve.keys
+        if not keys:
+            return 0.0
+        if time <= keys[0][0]:
+            value = keys[0][1]
+        elif time >= keys[-1][0]:
+            value = keys[-1][1]
+        else:
+            for (start_time, start_value), (end_time, end_value) in zip(keys, keys[1:]):
+                if start_time <= time <= end_time:
+                    weight = (time - start_time) / (end_time - start_time)
+                    value = start_value + (end_value - start_value) * weight
+                    break
+        return math.degrees(value) if curve.node_type == 'animCurveTA' else value
+
+    def world_position(self, node, time=None):
+        '''
+        World translation of a node, shapes use their transform
+        '''
+        if node.node_type in SHAPE_TYPES:
+            node = node.parent
+        position = [0.0, 0.0, 0.0]
+        while node is not None:
+            for axis, attribute in enumerate(('translateX', 'translateY', 'translateZ')):
+                position[axis] += self.value(node, attribute, time)
+            node = node.parent
+        return tuple(position)
+
+    def is_visible(self, node):
+        '''
+        Whether a node and all of its parents are visible
+        '''
+        while node is not None:
+            if not node.attributes.get('visibility', True):
+                return False
+            node = node.parent
+        return True
+
+    def source_position(self, node, attribute, time):
+        '''
+        World position of the node connected into a matrix/point attribute
+        '''
+        source = self.connections.get(node.name + '.' + attribute)
+        if source is None:
+            return (0.0, 0.0, 0.0)
+        return self.world_position(self.nodes[split_plug(source)[0]], time)
+
+    def evaluate_focus_node(self, node, attribute, time):
+        '''
+        Same maths as the alaFocusDistance plugin node
+        '''
+        camera_position = self.source_position(node, 'cameraMatrix', time)
+        target_position = self.source_position(node, 'targetMatrix', time)
+        mesh_source = self.connections.get(node.name + '.targetMesh')
+        if mesh_source is not None:
+            target_position = self.nearest_surface_point(self.nodes[split_plug(mesh_source)[0]], camera_position, target_position)
+        distance = math.dist(camera_position, target_position)
+        if attribute == 'fStop':
+            return min(max(distance, node.attributes['minFStop']), node.attributes['maxFStop'])
+        return distance
+
+    @staticmethod
+    def nearest_surface_point(mesh, point, translation):
+        '''
+        Closest point to point of a mesh moved by translation, brute force over every triangle
+        '''
+        # Ignore C0415 warning because ala_camera_surface imports the maya modules this stand-in installs
+        import ala_camera_surface  # pylint: disable=import-outside-toplevel
+        if mesh.geometry is None:
+            #synthetic props have no geometry unless set_mesh gave them one
+            return translation
+        points, triangles = mesh.geometry
+        candidates = ala_camera_surface.closest_points_on_triangles(point, points[triangles] + translation)
+        return tuple(candidates[np.argmin(np.linalg.norm(candidates - point, axis=1))])
+
+    def evaluate_distance_dimension(self, node, time):
+        '''
+        Distance between the 2 locators of a distance dimension
+        '''
+        return math.dist(self.source_position(node, 'startPoint', time), self.source_position(node, 'endPoint', time))
+
+    # --- mutation used by cmds and the OpenMaya classes -------------------------
+
+    def connect(self, source, destination, force=False):
+        '''
+        Connect two "node.attribute" plugs
+        '''
+        source_node, source_attribute = split_plug(source)
+        destination_node, destination_attribute = split_plug(destination)
+        destination = destination_node + '.' + destination_attribute
+        if destination in self.connections:
+            if not force:
+                raise RuntimeError(f"{destination} already has an incoming connection")
+            self.disconnect(destination)
+        self.connections[destination] = source_node + '.' + source_attribute
+        self.connected_plugs[source_node].add(destination)
+        self.connected_plugs[destination_node].add(destination)
+
+    def disconnect(self, destination):
+        '''
+        Break the incoming connection of a "node.attribute" plug
+        '''
+        source = self.connections.pop(destination, None)
+        if source is not None:
+            self.connected_plugs[source.split('.', 1)[0]].discard(destination)
+            self.connected_plugs[destination.split('.', 1)[0]].discard(destination)
+
+    def set_value(self, node, attribute, value):
+        '''
+        Set a plain attribute value
+        '''
+        if attribute in INT_ATTRIBUTES:
+            value = int(value)
+        elif attribute in BOOL_ATTRIBUTES:
+            value = bool(value)
+        node.attributes[attribute] = value
+        self.dirty(node, attribute)
+
+    def dirty(self, node, attribute):
+        '''
+        Call the dirty plug callbacks of a node
+        '''
+        for callback in list(self.dirty_callbacks.get(node, {}).values()):
+            callback(attribute)
+
+    def emit(self, event_name):
+        '''
+        Call the callbacks of a named event such as SelectionChanged
+        '''
+        for callback in list(self.event_callbacks.get(event_name, {}).values()):
+            callback()
+
+    def delete_node(self, node):
+        '''
+        Delete a node, its children and all of its connections
+        '''
+        if self.nodes.get(node.name) is not node:
+            #already deleted together with its parent
+            return
+        for child in list(node.children):
+            self.delete_node(child)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        self.nodes.pop(node.name, None)
+        for destination in list(self.connected_plugs.pop(node.name, ())):
+            self.disconnect(destination)
+        if node.name in self.selection:
+            self.selection.remove(node.name)
+            self.emit('SelectionChanged')
+
+    def rename_node(self, node, new_name):
+        '''
+        Rename a node and keep its connections
+        '''
+        old_name = node.name
+        connections = [(destination, self.connections[destination]) for destination in self.connected_plugs.pop(old_name, ())]
+        for destination, _ in connections:
+            self.disconnect(destination)
+        del self.nodes[old_name]
+        node.name = self.unique_name(new_name)
+        self.nodes[node.name] = node
+        for destination, source in connections:
+            self.connect(renamed_plug(source, old_name, node.name), renamed_plug(destination, old_name, node.name))
+        return node.name
+
+    def set_mesh(self, shape_name, points, triangles):
+        '''
+        Set the object space geometry of a mesh shape, dirtying its outMesh
+        '''
+        node = self.node(shape_name)
+        node.geometry = (np.asarray(points, dtype=np.float64).reshape(-1, 3), np.asarray(triangles, dtype=np.int64).reshape(-1, 3))
+        self.dirty(node, 'outMesh')
+
+    # --- idle queue -------------------------------------------------------------
+
+    def execute_deferred(self, function, *args, **kwargs):
+        '''
+        Queue a call for the next idle time like maya.utils.executeDeferred
+        '''
+        self.deferred.append((function, args, kwargs))
+
+    def run_deferred(self, until, timeout=600.0):
+        '''
+        Play Maya's idle loop: run the deferred calls in order, waiting for the ones
+        queued by worker threads, until until() is true.
+        Returns the seconds of the longest call, the longest the UI was blocked.
+        '''
+        longest = 0.0
+        deadline = perf_counter() + timeout
+        while not until():
+            if perf_counter() > deadline:
+                raise TimeoutError(f"Deferred calls still pending after {timeout} s")
+            if not self.deferred:
+                sleep(0.001)
+                continue
+            function, args, kwargs = self.deferred.popleft()
+            start = perf_counter()
+            function(*args, **kwargs)
+            longest = max(longest, perf_counter() - start)
+        return longest
+
+    # --- generators -------------------------------------------------------------
+
+    def build_synthetic_scene(self, camera_count=0, locator_count=0, mesh_count=0, spacing=10.0):
+        '''
+        Fill the scene with cameras, locators and mesh transforms laid out on a grid.
+        Returns the transform names of each kind.
+        '''
+        cameras = [self.add_camera(f"shotCam{index}", (index * spacing, 0.0, 0.0))[0].name for index in range(camera_count)]
+        locators = [self.add_locator(f"setLocator{index}", (index * spacing, 5.0, -50.0))[0].name for index in range(locator_count)]
+        meshes = []
+        for index in range(mesh_count):
+            transform = self.add_node(f"prop{index}", 'transform')
+            transform.attributes.update({'translateX': index * spacing, 'translateY': 0.0, 'translateZ': -100.0})
+            self.add_node(transform.name + 'Shape', 'mesh', transform)
+            meshes.append(transform.name)
+        return {'cameras': cameras, 'locators': locators, 'meshes': meshes}
+
+
+def uv_sphere(radius=1.0, rings=16, segments=32):
+    '''
+    Vertex array and triangle corners of a UV sphere for the meshes of synthetic scenes
+    '''
+    polar, azimuth = np.meshgrid(np.linspace(0.0, np.pi, rings + 1)[1:-1], np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False), indexing='ij')
+    ring_points = np.stack([np.sin(polar) * np.cos(azimuth), np.cos(polar), np.sin(polar) * np.sin(azimuth)], axis=-1).reshape(-1, 3)
+    points = np.vstack([[(0.0, 1.0, 0.0)], ring_points, [(0.0, -1.0, 0.0)]]) * radius
+    bottom = len(points) - 1
+    segment = np.arange(segments)
+    next_segment = (segment + 1) % segments
+    triangles = [np.stack([np.zeros(segments, dtype=np.int64), 1 + next_segment, 1 + segment], axis=-1)]
+    for ring in range(rings - 2):
+        upper, lower = 1 + ring * segments, 1 + (ring + 1) * segments
+        triangles.append(np.stack([upper + segment, upper + next_segment, lower + segment], axis=-1))
+        triangles.append(np.stack([upper + next_segment, lower + next_segment, lower + segment], axis=-1))
+    last_ring = 1 + (rings - 2) * segments
+    triangles.append(np.stack([last_ring + segment, last_ring + next_segment, np.full(segments, bottom)], axis=-1))
+    return points, np.concatenate(triangles)
+
+
+# Ignore R0904 warning because every cmds command is a method
+class FakeCmds(types.ModuleType):  # pylint: disable=too-many-public-methods
+    '''
+    maya.cmds stand-in, every command call is counted on the scene
+    '''
+    def __init__(self, scene):
+        super().__init__('maya.cmds')
+        self.scene = scene
+
+    def __getattribute__(self, name):
+        scene = object.__getattribute__(self, 'scene')
+        if not name.startswith('_') and name != 'scene':
+            scene.call_counts[name] += 1
+            if name in SCENE_CHANGING_COMMANDS:
+                scene.record_change()
+            if name in scene.plugin_commands:
+                return scene.plugin_commands[name]
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name):
+        raise AttributeError(f"maya.cmds stand-in has no command {name}")
+
+    # Ignore C0103/W0613/W0622/R0913/R0917 warnings because the flags mirror the maya.cmds signatures
+    # pylint: disable=invalid-name,unused-argument,redefined-builtin,too-many-arguments,too-many-positional-arguments
+
+    def ls(self, *objects, sl=False, selection=False, long=False, l=False, showType=False, type=None, exactType=None, visible=False,
+           shapes=False, defaultNodes=False, **_flags):
+        '''
+        List nodes by selection, name, type or visibility
+        '''
+        scene = self.scene
+        if sl or selection:
+            nodes = [scene.nodes[name] for name in scene.selection]
+        elif objects:
+            nodes = [scene.node(name) for name in as_list(objects[0]) if name.rsplit('|', 1)[-1] in scene.nodes]
+        else:
+            nodes = list(scene.nodes.values())
+        node_types = set(as_list(exactType))
+        for node_type in as_list(type):
+            node_types |= INHERITED_TYPES.get(node_type, {node_type})
+        if node_types:
+            nodes = [node for node in nodes if node.node_type in node_types]
+        if shapes:
+            nodes = [node for node in nodes if node.node_type in SHAPE_TYPES]
+        if defaultNodes:
+            nodes = [node for node in nodes if node in scene.default_nodes]
+        if visible:
+            nodes = [node for node in nodes if scene.is_visible(node)]
+        result = []
+        for node in nodes:
+            result.append(node.long_name() if long or l else node.name)
+            if showType:
+                result.append(node.node_type)
+        return result
+
+    def listRelatives(self, objects=None, shapes=False, parent=False, type=None, fullPath=False, children=False, **_flags):
+        '''
+        List parents or shape children
+        '''
+        scene = self.scene
+        result = []
+        for name in as_list(objects):
+            node = scene.node(name)
+            if parent:
+                relatives = [node.parent] if node.parent else []
+            else:
+                relatives = node.children
+                if shapes or type:
+                    relatives = [child for child in relatives if child.node_type in SHAPE_TYPES]
+            if type:
+                relatives = [relative for relative in relatives if relative.node_type in as_list(type)]
+            result.extend(relative.long_name() if fullPath else relative.name for relative in relatives)
+        return result or None
+
+    def listConnections(self, items, source=True, destination=True, type=None, plugs=False, shapes=False, connections=False, **_flags):
+        '''
+        List nodes or plugs connected to nodes or plugs,
+        with connections=True every match is preceded by the plug of the item
+        '''
+        scene = self.scene
+        result = []
+        for item in as_list(items):
+            node_name, attribute = split_plug(item)
+            matches = []
+            for destination_plug in sorted(scene.connected_plugs.get(node_name, ())):
+                source_plug = scene.connections[destination_plug]
+                if source:
+                    destination_node, destination_attribute = destination_plug.split('.', 1)
+                    if destination_node == node_name and (not attribute or destination_attribute == attribute):
+                        matches.append((destination_plug, source_plug))
+                if destination:
+                    source_node, source_attribute = source_plug.split('.', 1)
+                    if source_node == node_name and (not attribute or source_attribute == attribute):
+                        matches.append((source_plug, destination_plug))
+            for own_plug, plug in matches:
+                node = scene.nodes[plug.split('.', 1)[0]]
+                if type and node.node_type not in as_list(type):
+                    continue
+                if connections:
+                    result.append(own_plug)
+                if plugs:
+                    result.append(plug)
+                elif node.node_type in SHAPE_TYPES and not shapes:
+                    result.append(node.parent.name)
+                else:
+                    result.append(node.name)
+        return result or None
+
+    def listHistory(self, items, pruneDagObjects=False, **_flags):
+        '''
+        Nodes upstream of items through their incoming connections, items included
+        unless pruneDagObjects drops every DAG node
+        '''
+        scene = self.scene
+        pending = [scene.node(name) for name in as_list(items)]
+        history = []
+        while pending:
+            node = pending.pop(0)
+            if node in history:
+                continue
+            history.append(node)
+            pending += [scene.node(name) for name in self.listConnections(node.name, destination=False, shapes=True) or []]
+        if pruneDagObjects:
+            history = [node for node in history if node.node_type not in SHAPE_TYPES and node.node_type != 'transform']
+        return [node.name for node in history] or None
+
+    def getAttr(self, plug, time=None, **_flags):
+        '''
+        Get an attribute value, compound translate returns [(x, y, z)]
+        '''
+        node_name, attribute = split_plug(plug)
+        value = self.scene.value(self.scene.node(node_name), attribute, time)
+        return [value] if isinstance(value, tuple) else value
+
+    def setAttr(self, plug, *values, type=None, **_flags):
+        '''
+        Set an attribute value
+        '''
+        node_name, attribute = split_plug(plug)
+        node = self.scene.node(node_name)
+        if attribute == 'translate' or type == 'double3':
+            node.attributes.update(zip(('translateX', 'translateY', 'translateZ'), values))
+        else:
+            self.scene.set_value(node, attribute, values[0])
+
+    def connectAttr(self, source, destination, force=False, **_flags):
+        '''
+        Connect two plugs
+        '''
+        self.scene.connect(source, destination, force)
+
+    def disconnectAttr(self, source, destination, **_flags):
+        '''
+        Break a connection
+        '''
+        destination_node, destination_attribute = split_plug(destination)
+        self.scene.disconnect(destination_node + '.' + destination_attribute)
+
+    def distanceDimension(self, sp=(0, 0, 0), ep=(0, 0, 0), **_flags):
+        '''
+        Create a distance dimension between 2 new locators
+        '''
+        scene = self.scene
+        start_locator = scene.add_locator('locator1', sp)[1]
+        end_locator = scene.add_locator('locator1', ep)[1]
+        transform = scene.add_node('distanceDimension1', 'transform')
+        shape = scene.add_node('distanceDimensionShape1', 'distanceDimShape', transform)
+        scene.connect(start_locator.name + '.worldPosition', shape.name + '.startPoint')
+        scene.connect(end_locator.name + '.worldPosition', shape.name + '.endPoint')
+        return shape.name
+
+    def parent(self, child, parent_name, **_flags):
+        '''
+        Parent a DAG node under another one
+        '''
+        node = self.scene.node(child)
+        self.scene.set_parent(node, self.scene.node(parent_name))
+        return [node.name]
+
+    def rename(self, old_name, new_name, **_flags):
+        '''
+        Rename a node
+        '''
+        return self.scene.rename_node(self.scene.node(old_name), new_name)
+
+    def delete(self, *objects, **_flags):
+        '''
+        Delete nodes
+        '''
+        for name in as_list(objects[0] if len(objects) == 1 else objects):
+            if name.rsplit('|', 1)[-1] in self.scene.nodes:
+                self.scene.delete_node(self.scene.node(name))
+
+    def camera(self, camera_name=None, query=False, q=False, startupCamera=False, n=None, name=None, **flags):
+        '''
+        Create a camera or query whether it is one of the startup cameras
+        '''
+        scene = self.scene
+        if query or q:
+            node = scene.node(camera_name)
+            transform = node.parent if node.node_type == 'camera' else node
+            return transform.name in STARTUP_CAMERAS
+        scene.record_change()
+        transform, shape = scene.add_camera(n or name or 'camera1')
+        shape.attributes.update({key: value for key, value in flags.items() if key in shape.attributes})
+        return [transform.name, shape.name]
+
+    def spaceLocator(self, n=None, name=None, position=(0.0, 0.0, 0.0), **_flags):
+        '''
+        Create a locator
+        '''
+        return [self.scene.add_locator(n or name or 'locator1', position)[0].name]
+
+    def circle(self, nr=(0, 0, 1), c=(0, 0, 0), r=1.0, **_flags):
+        '''
+        Create a NURBS circle
+        '''
+        scene = self.scene
+        transform = scene.add_node('nurbsCircle1', 'transform')
+        transform.attributes.update({'translateX': c[0], 'translateY': c[1], 'translateZ': c[2], 'radius': r})
+        scene.add_node(transform.name + 'Shape', 'nurbsCurve', transform)
+        return [transform.name, scene.add_node('makeNurbCircle1', 'makeNurbCircle').name]
+
+    def pathAnimation(self, curve, obj, **_flags):
+        '''
+        Attach an object to a curve through a motion path node
+        '''
+        motion_path = self.scene.add_node('motionPath1', 'motionPath')
+        self.scene.connect(self.scene.node(curve).name + '.worldSpace', motion_path.name + '.geometryPath')
+        return motion_path.name
+
+    def setKeyframe(self, obj, attribute=None, value=None, time=None, **_flags):
+        '''
+        Key one attribute at the given or current time
+        '''
+        scene = self.scene
+        node = scene.node(obj)
+        attribute = ATTRIBUTE_ALIASES.get(attribute, attribute)
+        key_time = scene.current_time if time is None else float(time)
+        if value is None:
+            value = scene.value(node, attribute)
+        destination = node.name + '.' + attribute
+        curve_plug = scene.connections.get(destination)
+        if curve_plug is None:
+            curve_type = 'animCurveTA' if attribute in ANGLE_ATTRIBUTES else 'animCurveTL' if attribute in DISTANCE_ATTRIBUTES else 'animCurveTU'
+            curve = scene.add_node(f"{node.name}_{attribute}", curve_type)
+            scene.connect(curve.name + '.output', destination)
+        else:
+            curve = scene.nodes[curve_plug.split('.', 1)[0]]
+        stored = math.radians(value) if curve.node_type == 'animCurveTA' else float(value)
+        if curve.keys and curve.keys[-1][0] < key_time:
+            curve.keys.append((key_time, stored))
+        else:
+            curve.keys = sorted([key for key in curve.keys if key[0] != key_time] + [(key_time, stored)])
+        return 1
+
+    def keyframe(self, curve, query=False, q=False, timeChange=False, valueChange=False, **_flags):
+        '''
+        Query the keys of an anim curve, times and values are interleaved when both are asked for
+        '''
+        node = self.scene.node(curve)
+        result = []
+        for key_time, stored in node.keys:
+            if timeChange:
+                result.append(key_time)
+            if valueChange:
+                result.append(math.degrees(stored) if node.node_type == 'animCurveTA' else stored)
+        return result or None
+
+    def keyTangent(self, curve, query=False, q=False, inTangentType=False, outTangentType=False, **_flags):
+        '''
+        Query one tangent setting per key, the stand-in only has linear keys with flat weights
+        '''
+        node = self.scene.node(curve)
+        value = 'linear' if inTangentType or outTangentType else 0.0
+        return [value] * len(node.keys) or None
+
+    def setInfinity(self, curve, query=False, q=False, preInfinite=False, postInfinite=False, **_flags):
+        '''
+        Query the infinity of an anim curve, always constant in the stand-in
+        '''
+        return ['constant'] * (int(preInfinite) + int(postInfinite))
+
+    def currentTime(self, time=None, query=False, q=False, **_flags):
+        '''
+        Query or change the current time, changing it triggers a scene evaluation in Maya
+        that dirties the animated plugs
+        '''
+        scene = self.scene
+        if query or q or time is None:
+            return scene.current_time
+        scene.current_time = float(time)
+        for node in [node for node, callbacks in scene.dirty_callbacks.items() if callbacks]:
+            for destination in list(scene.connected_plugs.get(node.name, ())):
+                if destination.split('.', 1)[0] == node.name:
+                    scene.dirty(node, destination.split('.', 1)[1])
+        return scene.current_time
+
+    def playbackOptions(self, query=False, q=False, minTime=False, maxTime=False, **flags):
+        '''
+        Query or set the playback range
+        '''
+        scene = self.scene
+        if query or q:
+            return scene.playback_range[0] if minTime else scene.playback_range[1]
+        scene.playback_range = (flags.get('min', scene.playback_range[0]), flags.get('max', scene.playback_range[1]))
+        return None
+
+    def undoInfo(self, openChunk=False, closeChunk=False, state=None, stateWithoutFlush=None, query=False, q=False, **_flags):
+        '''
+        Track undo chunks and the undo state, a closed chunk is one undo entry
+        '''
+        scene = self.scene
+        if openChunk:
+            scene.undo_chunk_depth += 1
+        if closeChunk:
+            scene.undo_chunk_depth -= 1
+            if not scene.undo_chunk_depth and scene.undo_chunk_changed:
+                scene.undo_entries += 1
+                scene.undo_chunk_changed = False
+        if state is not None and not (query or q):
+            scene.undo_enabled = state
+        if stateWithoutFlush is not None:
+            scene.undo_enabled = stateWithoutFlush
+        return scene.undo_enabled
+
+    def undo(self, **_flags):
+        '''
+        Count undo calls, the stand-in keeps no undo history to revert
+        '''
+        self.scene.undo_calls += 1
+
+    def refresh(self, suspend=None, **_flags):
+        '''
+        Suspend or resume the viewport refresh, or refresh it now
+        '''
+        if suspend is None:
+            self.scene.viewport_refreshes += 1
+        else:
+            self.scene.refresh_suspended = suspend
+
+    def about(self, batch=False, **_flags):
+        '''
+        Whether Maya runs without a UI
+        '''
+        return self.scene.batch_mode
+
+    def pluginInfo(self, plugin_name, query=False, loaded=False, **_flags):
+        '''
+        Report the camera tool plugin as loaded once loadPlugin ran
+        '''
+        return 'alaCameraCommit' in self.scene.plugin_commands
+
+    def loadPlugin(self, plugin_path, quiet=False, **_flags):
+        '''
+        Register the commands of ala_camera_plugin.py, its nodes are evaluated by the scene
+        '''
+        def ala_camera_commit():
+            # Ignore C0415 warning because the modifier module imports this stand-in's cmds
+            import ala_camera_modifier  # pylint: disable=import-outside-toplevel
+            modifier, anim_curve_change = ala_camera_modifier.take_pending_modifier()
+            try:
+                modifier.doIt()
+            except Exception:
+                modifier.undoIt()
+                if anim_curve_change:
+                    anim_curve_change.undoIt()
+                raise
+            return anim_curve_change
+        self.scene.plugin_commands['alaCameraCommit'] = ala_camera_commit
+        return ['ala_camera_plugin']
+
+    def createNode(self, node_type, name=None, parent=None, **_flags):
+        '''
+        Create a node of any type
+        '''
+        parent_node = self.scene.node(parent) if parent else None
+        return self.scene.add_node(name or node_type + '1', node_type, parent_node).name
+
+    def nodeType(self, node_name, **_flags):
+        '''
+        Type of a node
+        '''
+        return self.scene.node(node_name).node_type
+
+    def addAttr(self, node_name, longName=None, defaultValue=0.0, dataType=None, **_flags):
+        '''
+        Add a dynamic attribute holding its default value, string attributes start empty
+        '''
+        node = self.scene.node(node_name)
+        if longName in node.attributes:
+            raise RuntimeError(f"Found an attribute named {longName} on {node_name}")
+        node.attributes[longName] = '' if dataType == 'string' else float(defaultValue)
+
+    def attributeQuery(self, attribute, node=None, exists=False, **_flags):
+        '''
+        Only exists queries of dynamic and default attributes are modelled
+        '''
+        return attribute in self.scene.node(node).attributes
+
+    def render(self, camera, x=None, y=None, **_flags):
+        '''
+        Record a render of the current frame, returns the image path
+        '''
+        scene = self.scene
+        prefix = scene.nodes['defaultRenderGlobals'].attributes['imageFilePrefix']
+        scene.outputs.append(('render', camera, x, y, scene.current_time, prefix))
+        if scene.render_seconds:
+            sleep(scene.render_seconds)
+        return f"{prefix}.{int(scene.current_time):04d}.exr"
+
+    def playblast(self, filename=None, startTime=None, endTime=None, widthHeight=None, **_flags):
+        '''
+        Record a playblast of the frame range through the camera looked through
+        '''
+        scene = self.scene
+        for frame in range(int(startTime), int(endTime) + 1):
+            scene.outputs.append(('playblast', scene.look_through, widthHeight[0], widthHeight[1], float(frame), filename))
+            if scene.render_seconds:
+                sleep(scene.render_seconds)
+        return filename
+
+    def lookThru(self, camera=None, query=False, q=False, **_flags):
+        '''
+        Look through a camera in the viewport, or query the camera looked through
+        '''
+        if query or q:
+            return self.scene.look_through
+        self.scene.look_through = camera
+        return None
+
+    def objExists(self, node_name, **_flags):
+        '''
+        Whether a node exists
+        '''
+        return split_plug(node_name)[0] in self.scene.nodes
+
+    def select(self, *objects, clear=False, **_flags):
+        '''
+        Replace the selection
+        '''
+        self.scene.selection = [] if clear or not objects else [self.scene.node(name).name for name in as_list(objects[0])]
+        self.scene.emit('SelectionChanged')
+
+    def warning(self, message, **_flags):
+        '''
+        Record a warning
+        '''
+        self.scene.warnings.append(message)
+
+    def currentUnit(self, query=False, q=False, linear=False, time=False, **_flags):
+        '''
+        Only the default units are modelled
+        '''
+        return 'film' if time else 'cm'
+
+    def file(self, path=None, new=False, open=False, save=False, rename=None, force=False, **_flags):
+        '''
+        New, open, rename and save scenes, opening runs the builder registered in scene_files
+        '''
+        scene = self.scene
+        if new:
+            scene.reset()
+        elif open:
+            if path not in scene.scene_files:
+                raise RuntimeError(f"File not found: {path}")
+            scene.reset()
+            scene.scene_files[path](scene)
+            scene.file_name = path
+        elif rename:
+            scene.file_name = rename
+        elif save:
+            scene.saved_files.append(scene.file_name)
+        return scene.file_name
+
+    # pylint: enable=invalid-name,unused-argument,redefined-builtin,too-many-arguments,too-many-positional-arguments
+
+
+def install(scene=None):
+    '''
+    Put the stand-in maya modules into sys.modules and return the scene they use.
+    Must run before any camera tool module is imported.
+    '''
+    scene = scene or FakeScene()
+    maya = types.ModuleType('maya')
+    maya.__path__ = []
+    cmds = maya.cmds = FakeCmds(scene)
+    maya_api = types.ModuleType('maya.api')
+    maya_api.__path__ = []
+    maya.api = maya_api
+    open_maya = maya_api.OpenMaya = ala_camera_stand_in_api.build_open_maya_module(scene)
+    open_maya_anim = maya_api.OpenMayaAnim = ala_camera_stand_in_api.build_open_maya_anim_module(scene, open_maya)
+    maya_standalone = types.ModuleType('maya.standalone')
+    maya_standalone.initialize = lambda name='python': None
+    maya_standalone.uninitialize = lambda: None
+    maya.standalone = maya_standalone
+    maya_utils = maya.utils = types.ModuleType('maya.utils')
+    maya_utils.executeDeferred = scene.execute_deferred
+    sys.modules.update({
+        'maya': maya,
+        'maya.cmds': cmds,
+        'maya.api': maya_api,
+        'maya.api.OpenMaya': open_maya,
+        'maya.api.OpenMayaAnim': open_maya_anim,
+        'maya.standalone': maya_standalone,
+        'maya.utils': maya_utils,
+    })
+    return scene
@@ -0,0 +1,794 @@
+'''
+ala_camera_stand_in_api.py
+maya.api.OpenMaya and maya.api.OpenMayaAnim stand-ins for ala_camera_stand_in.py.
+Only the classes and methods the camera tool calls are modelled, every
+class works on the stand-in scene handed to the module builders.
+'''
+import types
+import numpy as np
+
+
+def build_open_maya_module(scene):
+    '''
+    maya.api.OpenMaya stand-in covering what the camera tool uses
+    '''
+    # Ignore C0103/R0903/W0613 warnings because the classes mirror the OpenMaya API
+    # pylint: disable=invalid-name,too-few-public-methods,unused-argument
+    module = types.ModuleType('maya.api.OpenMaya')
+
+    class MFn():
+        '''
+        Function set type constants
+        '''
+        kUnitAttribute = 1
+        kNumericAttribute = 2
+        kEnumAttribute = 3
+        kInvalid = 0
+        kTransform = 110
+        kCamera = 250
+        kMesh = 296
+
+    class MFnNumericData():
+        '''
+        Numeric type constants
+        '''
+        kBoolean, kByte, kShort, kInt, kFloat, kDouble = range(6)
+
+    class MAttribute():
+        '''
+        Attribute handle, the type comes from the attribute name
+        '''
+        def __init__(self, name):
+            self.name = name
+            #default value of an attribute made with MFnNumericAttribute.create
+            self.default = 0.0
+
+        def hasFn(self, function_type):
+            '''
+            Unit attributes are angles/distances, enums are enums, everything else is numeric
+            '''
+            attribute_type = scene.attribute_type(self.name)
+            if attribute_type in ('angle', 'distance'):
+                return function_type == MFn.kUnitAttribute
+            if attribute_type == 'enum':
+                return function_type == MFn.kEnumAttribute
+            return function_type == MFn.kNumericAttribute
+
+    class MFnUnitAttribute():
+        '''
+        Unit attribute function set
+        '''
+        kAngle, kDistance, kTime = range(3)
+
+        def __init__(self, attribute):
+            self.attribute = attribute
+
+        def unitType(self):
+            '''
+            Angle or distance
+            '''
+            return MFnUnitAttribute.kAngle if scene.attribute_type(self.attribute.name) == 'angle' else MFnUnitAttribute.kDistance
+
+    class MFnNumericAttribute():
+        '''
+        Numeric attribute function set, attribute limits are not modelled
+        '''
+        def __init__(self, attribute=None):
+            self.attribute = attribute
+            self.keyable = False
+
+        def create(self, long_name, _short_name, _numeric_type, default=0.0):
+            '''
+            New dynamic attribute for MDGModifier.addAttribute
+            '''
+            self.attribute = MAttribute(long_name)
+            self.attribute.default = default
+            return self.attribute
+
+        def setMin(self, _minimum):
+            '''
+            Limits are not modelled
+            '''
+
+        def numericType(self):
+            '''
+            Bool, int or double
+            '''
+            if scene.attribute_type(self.attribute.name) == 'bool':
+                return MFnNumericData.kBoolean
+            if scene.attribute_type(self.attribute.name) == 'int':
+                return MFnNumericData.kInt
+            return MFnNumericData.kDouble
+
+    class MObject():
+        '''
+        Node handle, stays valid across renames
+        '''
+        def __init__(self, node=None):
+            self.node = node
+
+        def isNull(self):
+            '''
+            Whether the handle points at nothing
+            '''
+            return self.node is None
+
+    class MMatrix():
+        '''
+        Translation only matrix
+        '''
+        def __init__(self, translation=(0.0, 0.0, 0.0)):
+            self.translation = translation
+
+        def getElement(self, row, column):
+            '''
+            Identity with the translation in the last row
+            '''
+            if row == 3:
+                return self.translation[column] if column < 3 else 1.0
+            return 1.0 if row == column else 0.0
+
+    class MFnMatrixData():
+        '''
+        Matrix data function set
+        '''
+        def __init__(self, data):
+            self.data = data
+
+        def matrix(self):
+            '''
+            The wrapped matrix
+            '''
+            return self.data
+
+    class MPlug():
+        '''
+        Plug on a node
+        '''
+        def __init__(self, node, attribute):
+            self.node = node
+            self.attribute_name = attribute
+
+        def name(self):
+            '''
+            "node.attribute"
+            '''
+            return self.node.name + '.' + self.attribute_name
+
+        def attribute(self):
+            '''
+            Attribute handle of the plug
+            '''
+            return MAttribute(self.attribute_name)
+
+        def partialName(self, **_flags):
+            '''
+            Attribute name of the plug
+            '''
+            return self.attribute_name
+
+        def elementByLogicalIndex(self, _index):
+            '''
+            Array plugs are not modelled
+            '''
+            return self
+
+        def asDouble(self):
+            '''
+            Value of the plug evaluated in the current context
+            '''
+            return float(scene.value(self.node, self.attribute_name))
+
+        def asInt(self):
+            '''
+            Integer value of the plug
+            '''
+            return int(scene.value(self.node, self.attribute_name))
+
+        def asShort(self):
+            '''
+            Enum value of the plug
+            '''
+            return int(scene.value(self.node, self.attribute_name))
+
+        def asBool(self):
+            '''
+            Boolean value of the plug
+            '''
+            return bool(scene.value(self.node, self.attribute_name))
+
+        def asMAngle(self):
+            '''
+            Angle value of the plug, the scene stores degrees
+            '''
+            return MAngle(self.asDouble())
+
+        def asMDistance(self):
+            '''
+            Distance value of the plug
+            '''
+            return MDistance(self.asDouble())
+
+        def asMObject(self):
+            '''
+            World matrix data evaluated in the current context, the mesh itself for outMesh
+            '''
+            if self.attribute_name == 'outMesh':
+                return MObject(self.node)
+            return MMatrix(scene.world_position(self.node))
+
+    class MDagPath():
+        '''
+        DAG path of a node
+        '''
+        def __init__(self, node):
+            self.dag_node = node
+
+        def inclusiveMatrix(self):
+            '''
+            World matrix of the node
+            '''
+            return MMatrix(scene.world_position(self.dag_node))
+
+        def node(self):
+            '''
+            Node handle at the end of the path
+            '''
+            return MObject(self.dag_node)
+
+        def apiType(self):
+            '''
+            Function set type of the node at the end of the path
+            '''
+            return {'transform': MFn.kTransform, 'camera': MFn.kCamera, 'mesh': MFn.kMesh}.get(self.dag_node.node_type, MFn.kInvalid)
+
+        def extendToShape(self):
+            '''
+            Extend a transform path to its only shape, shapes stay as they are
+            '''
+            if self.dag_node.node_type == 'transform':
+                shapes = [child for child in self.dag_node.children if child.node_type != 'transform']
+                if len(shapes) != 1:
+                    raise RuntimeError("(kInvalidParameter): Object does not have exactly one shape")
+                self.dag_node = shapes[0]
+            elif self.dag_node.parent is None:
+                raise RuntimeError("(kInvalidParameter): Object is not a DAG node")
+            return self
+
+        def partialPathName(self):
+            '''
+            Shortest unique name of the node
+            '''
+            return self.dag_node.name
+
+        def fullPathName(self):
+            '''
+            Long name of the node
+            '''
+            return self.dag_node.long_name()
+
+    class MSelectionList():
+        '''
+        List of nodes and plugs
+        '''
+        def __init__(self):
+            self.items = []
+
+        def add(self, item, *_args):
+            '''
+            Add a node or "node.attribute" name
+            '''
+            self.items.append(item)
+            return self
+
+        def length(self):
+            '''
+            Number of items
+            '''
+            return len(self.items)
+
+        def getDependNode(self, index):
+            '''
+            Node handle of an item
+            '''
+            return MObject(scene.plug(self.items[index])[0])
+
+        def getDagPath(self, index):
+            '''
+            DAG path of an item
+            '''
+            return MDagPath(scene.plug(self.items[index])[0])
+
+        def getPlug(self, index):
+            '''
+            Plug of a "node.attribute" item
+            '''
+            return MPlug(*scene.plug(self.items[index]))
+
+    class MFnDependencyNode():
+        '''
+        Dependency node function set
+        '''
+        def __init__(self, node_object=None):
+            self.dag_nodeobject = node_object
+
+        def findPlug(self, attribute, _want_networked_plug=False):
+            '''
+            Plug of an attribute of the node
+            '''
+            return MPlug(self.dag_nodeobject.node, attribute)
+
+        def name(self):
+            '''
+            Current name of the node
+            '''
+            return self.dag_nodeobject.node.name
+
+        def object(self):
+            '''
+            Node handle
+            '''
+            return self.dag_nodeobject
+
+    class MPoint():
+        '''
+        Point with x, y and z
+        '''
+        def __init__(self, x=0.0, y=0.0, z=0.0):
+            self.x, self.y, self.z = float(x), float(y), float(z)
+
+    class MBoundingBox():
+        '''
+        Axis aligned box between two points
+        '''
+        def __init__(self, corner1=None, corner2=None):
+            self.min = corner1 or MPoint()
+            self.max = corner2 or MPoint()
+
+    class MFnDagNode(MFnDependencyNode):
+        '''
+        DAG node function set
+        '''
+        def __init__(self, dag_path=None):
+            super().__init__(dag_path.node())
+
+        @property
+        def boundingBox(self):
+            '''
+            Object space bounding box of the geometry set with FakeScene.set_mesh, empty without geometry
+            '''
+            geometry = self.dag_nodeobject.node.geometry
+            if geometry is None or geometry[0].size == 0:
+                return MBoundingBox()
+            return MBoundingBox(MPoint(*geometry[0].min(axis=0)), MPoint(*geometry[0].max(axis=0)))
+
+    class MDGModifier():
+        '''
+        Queues node creation, renames, connections and plug values until doIt
+        '''
+        def __init__(self):
+            self.operations = []
+            self.undo_operations = []
+            #operations run by the last doIt, the next one only runs the ones queued since
+            self.done_count = 0
+
+        def createNode(self, node_type):
+            '''
+            Create a node, it is removed again on undo
+            '''
+            node = scene.add_node(node_type + '1', node_type)
+            self.undo_operations.append(lambda: scene.delete_node(node))
+            return MObject(node)
+
+        def renameNode(self, node_object, new_name):
+            '''
+            Queue a rename
+            '''
+            self.operations.append(lambda: scene.rename_node(node_object.node, new_name))
+
+        def connect(self, source, destination):
+            '''
+            Queue a connection
+            '''
+            def do_connect():
+                scene.connect(source.name(), destination.name())
+                self.undo_operations.append(lambda: scene.disconnect(destination.name()))
+            self.operations.append(do_connect)
+
+        def disconnect(self, source, destination):
+            '''
+            Queue breaking a connection
+            '''
+            def do_disconnect():
+                scene.disconnect(destination.name())
+                self.undo_operations.append(lambda: scene.connect(source.name(), destination.name()))
+            self.operations.append(do_disconnect)
+
+        def addAttribute(self, node_object, attribute):
+            '''
+            Queue adding a dynamic attribute holding its default value
+            '''
+            def do_add():
+                node_object.node.attributes[attribute.name] = float(attribute.default)
+                self.undo_operations.append(lambda: node_object.node.attributes.pop(attribute.name))
+            self.operations.append(do_add)
+
+        def deleteNode(self, node_object):
+            '''
+            Queue deleting a node, the stand-in cannot bring it back on undo
+            '''
+            self.operations.append(lambda: scene.delete_node(node_object.node))
+
+        def set_plug_value(self, plug, value):
+            '''
+            Queue a plug value, the previous value is restored on undo
+            '''
+            def do_set():
+                previous = plug.node.attributes.get(plug.attribute_name)
+                scene.set_value(plug.node, plug.attribute_name, value)
+                self.undo_operations.append(lambda: plug.node.attributes.__setitem__(plug.attribute_name, previous))
+            self.operations.append(do_set)
+
+        def newPlugValueBool(self, plug, value):
+            '''
+            Queue a bool value
+            '''
+            self.set_plug_value(plug, bool(value))
+
+        def newPlugValueInt(self, plug, value):
+            '''
+            Queue an int value
+            '''
+            self.set_plug_value(plug, int(value))
+
+        def newPlugValueShort(self, plug, value):
+            '''
+            Queue an enum value
+            '''
+            self.set_plug_value(plug, int(value))
+
+        def newPlugValueDouble(self, plug, value):
+            '''
+            Queue a double value
+            '''
+            self.set_plug_value(plug, float(value))
+
+        def newPlugValueMAngle(self, plug, angle):
+            '''
+            Queue an angle, stored in degrees
+            '''
+            self.set_plug_value(plug, angle.value)
+
+        def newPlugValueMDistance(self, plug, distance):
+            '''
+            Queue a distance
+            '''
+            self.set_plug_value(plug, distance.value)
+
+        def doIt(self):
+            '''
+            Run the operations queued since the last doIt, all of them again after undoIt
+            '''
+            for operation in self.operations[self.done_count:]:
+                operation()
+            self.done_count = len(self.operations)
+
+        def undoIt(self):
+            '''
+            Revert the operations in reverse order
+            '''
+            for operation in reversed(self.undo_operations):
+                operation()
+            self.undo_operations = []
+            self.done_count = 0
+
+    class MDagModifier(MDGModifier):
+        '''
+        DG modifier that also creates DAG nodes under a parent
+        '''
+        def createNode(self, node_type, parent=None):
+            '''
+            Create a node under parent, it is removed again on undo
+            '''
+            node = scene.add_node(node_type + '1', node_type, parent.node if parent is not None else None)
+            self.undo_operations.append(lambda: scene.delete_node(node))
+            return MObject(node)
+
+    class MUnitValue():
+        '''
+        Base of MAngle, MDistance and MTime
+        '''
+        def __init__(self, value=0.0, unit=None):
+            self.value = value
+            self.unit = unit
+
+        @staticmethod
+        def uiUnit():
+            '''
+            Only the default UI units are modelled
+            '''
+            return 0
+
+        def asUnits(self, _unit):
+            '''
+            Only the default UI units are modelled
+            '''
+            return self.value
+
+    class MAngle(MUnitValue):
+        '''
+        Angle in degrees
+        '''
+
+    class MDistance(MUnitValue):
+        '''
+        Distance in centimeters
+        '''
+        def asCentimeters(self):
+            '''
+            Only centimeters are modelled
+            '''
+            return self.value
+
+    class MTime(MUnitValue):
+        '''
+        Time in frames of the UI unit, modelled as film (24 fps), or in seconds
+        '''
+        kSeconds = 'seconds'
+        FRAMES_PER_SECOND = 24.0
+
+        def asUnits(self, unit):
+            '''
+            Convert between seconds and frames
+            '''
+            if self.unit == MTime.kSeconds and unit != MTime.kSeconds:
+                return self.value * MTime.FRAMES_PER_SECOND
+            return self.value
+
+    class MDGContext():
+        '''
+        Evaluation context at a given time
+        '''
+        def __init__(self, time=None):
+            self.time = time
+
+        def makeCurrent(self):
+            '''
+            Evaluate at this context's time, returns the previous context
+            '''
+            previous = MDGContext(None if scene.context_time is None else MTime(scene.context_time))
+            scene.context_time = None if self.time is None else float(self.time.value)
+            return previous
+
+    class MSpace():
+        '''
+        Coordinate space constants
+        '''
+        kInvalid, kTransform, kPreTransform, kPostTransform, kWorld, kObject = range(6)
+
+    class MFnMesh():
+        '''
+        Mesh function set reading the geometry set with FakeScene.set_mesh
+        '''
+        def __init__(self, mesh_object):
+            self.node = mesh_object.node
+
+        def getPoints(self, _space=MSpace.kObject):
+            '''
+            Object space vertices as (x, y, z, w) rows
+            '''
+            points = self.node.geometry[0]
+            return np.hstack([points, np.ones((len(points), 1))])
+
+        def getTriangles(self):
+            '''
+            Triangle count of every polygon and the corners of every triangle,
+            the stand-in meshes are made of triangles only
+            '''
+            triangles = self.node.geometry[1]
+            return [1] * len(triangles), triangles.ravel()
+
+    class MObjectHandle():
+        '''
+        Handle telling whether a node still exists
+        '''
+        def __init__(self, node_object):
+            self.node = node_object.node
+
+        def hashCode(self):
+            '''
+            Hash of the node
+            '''
+            return id(self.node)
+
+        def isValid(self):
+            '''
+            Whether the node was not deleted
+            '''
+            return scene.nodes.get(self.node.name) is self.node
+
+    class MMessage():
+        '''
+        Callback registry
+        '''
+        @staticmethod
+        def removeCallback(callback_id):
+            '''
+            Remove a callback added by one of the message classes
+            '''
+            for callbacks in list(scene.dirty_callbacks.values()) + list(scene.event_callbacks.values()):
+                callbacks.pop(callback_id, None)
+
+    class MNodeMessage(MMessage):
+        '''
+        Node callbacks
+        '''
+        @staticmethod
+        def addNodeDirtyPlugCallback(node_object, function, client_data=None):
+            '''
+            Call function(node, plug, client_data) when a plug of the node is dirtied
+            '''
+            callback_id = next(scene.callback_ids)
+            scene.dirty_callbacks[node_object.node][callback_id] = (
+                lambda attribute: function(node_object, MPlug(node_object.node, attribute), client_data))
+            return callback_id
+
+    class MEventMessage(MMessage):
+        '''
+        Named event callbacks
+        '''
+        @staticmethod
+        def addEventCallback(event_name, function, client_data=None):
+            '''
+            Call function(client_data) whenever the event happens
+            '''
+            callback_id = next(scene.callback_ids)
+            scene.event_callbacks[event_name][callback_id] = lambda: function(client_data)
+            return callback_id
+
+    class MGlobal():
+        '''
+        Global scene state
+        '''
+        @staticmethod
+        def getActiveSelectionList():
+            '''
+            The selected nodes
+            '''
+            selection = MSelectionList()
+            for name in scene.selection:
+                selection.add(name)
+            return selection
+
+    for item in (MFn, MFnNumericData, MAttribute, MFnUnitAttribute, MFnNumericAttribute, MObject, MMatrix,
+                 MFnMatrixData, MPlug, MDagPath, MSelectionList, MFnDependencyNode, MPoint, MBoundingBox, MFnDagNode, MDGModifier, MDagModifier,
+                 MAngle, MDistance, MTime, MDGContext, MSpace, MFnMesh, MObjectHandle, MMessage, MNodeMessage,
+                 MEventMessage, MGlobal):
+        setattr(module, item.__name__, item)
+    module.MTimeArray = list
+    module.MDoubleArray = list
+    module.MObjectArray = list
+    return module
+
+
+def build_open_maya_anim_module(scene, open_maya):
+    '''
+    maya.api.OpenMayaAnim stand-in covering the bulk key writer
+    '''
+    # Ignore C0103/R0903/W0613/R0913/R0917 warnings because the classes mirror the OpenMaya API
+    # pylint: disable=invalid-name,too-few-public-methods,unused-argument,too-many-arguments,too-many-positional-arguments
+    module = types.ModuleType('maya.api.OpenMayaAnim')
+
+    class MFnAnimCurve():
+        '''
+        Anim curve function set
+        '''
+        kAnimCurveTA, kAnimCurveTL, kAnimCurveTT, kAnimCurveTU = range(4)
+        kTangentSmooth, kTangentLinear, kTangentFlat, kTangentStep, kTangentClamped, kTangentAuto = range(6)
+        CURVE_NODE_TYPES = {0: 'animCurveTA', 1: 'animCurveTL', 2: 'animCurveTT', 3: 'animCurveTU'}
+
+        def __init__(self, curve_object=None):
+            self.curve_object = curve_object
+
+        def create(self, plug, curve_type, modifier=None):
+            '''
+            Create a curve node driving the plug, connected through the modifier
+            '''
+            curve = scene.add_node(f"{plug.node.name}_{plug.attribute_name}", MFnAnimCurve.CURVE_NODE_TYPES[curve_type])
+            self.curve_object = open_maya.MObject(curve)
+            output = open_maya.MPlug(curve, 'output')
+            if modifier is None:
+                scene.connect(output.name(), plug.name())
+            else:
+                modifier.connect(output, plug)
+            return self.curve_object
+
+        def setObject(self, curve_object):
+            '''
+            Work on an existing curve
+            '''
+            self.curve_object = curve_object
+
+        @property
+        def animCurveType(self):
+            '''
+            Type constant of the curve
+            '''
+            node_type = self.curve_object.node.node_type
+            return next(key for key, value in MFnAnimCurve.CURVE_NODE_TYPES.items() if value == node_type)
+
+        def timedAnimCurveTypeForPlug(self, plug):
+            '''
+            Angle, distance or unitless curve for a plug
+            '''
+            attribute_type = scene.attribute_type(plug.attribute_name)
+            if attribute_type == 'angle':
+                return MFnAnimCurve.kAnimCurveTA
+            if attribute_type == 'distance':
+                return MFnAnimCurve.kAnimCurveTL
+            return MFnAnimCurve.kAnimCurveTU
+
+        def addKeys(self, times, values, tangent_in=0, tangent_out=0, keep_existing_keys=False, change=None):
+            '''
+            Add every key in one call
+            '''
+            curve = self.curve_object.node
+            new_keys = [(float(time.value), float(value)) for time, value in zip(times, values)]
+            if keep_existing_keys:
+                new_times = {time for time, _ in new_keys}
+                new_keys += [key for key in curve.keys if key[0] not in new_times]
+            curve.keys = sorted(new_keys)
+
+        def name(self):
+            '''
+            Name of the curve node
+            '''
+            return self.curve_object.node.name
+
+    class MAnimUtil():
+        '''
+        Animation utilities
+        '''
+        @staticmethod
+        def findAnimation(plug):
+            '''
+            Anim curves directly driving a plug
+            '''
+            source = scene.connections.get(plug.name())
+            if source is None:
+                return []
+            node = scene.nodes[source.split('.', 1)[0]]
+            return [open_maya.MObject(node)] if node.node_type.startswith('animCurve') else []
+
+        @staticmethod
+        def isAnimated(dag_path, checkParent=False):
+            '''
+            Whether an attribute of the node, or of a parent with checkParent, is driven by an anim curve
+            '''
+            node = dag_path.dag_node
+            while node is not None:
+                for destination in scene.connected_plugs.get(node.name, ()):
+                    source = scene.connections.get(destination)
+                    if destination.split('.', 1)[0] == node.name and scene.nodes[source.split('.', 1)[0]].node_type.startswith('animCurve'):
+                        return True
+                node = node.parent if checkParent else None
+            return False
+
+    class MAnimCurveChange():
+        '''
+        Key changes for undo, the stand-in keeps no history
+        '''
+        def undoIt(self):
+            '''
+            No history to revert
+            '''
+
+        def redoIt(self):
+            '''
+            No history to reapply
+            '''
+
+    module.MFnAnimCurve = MFnAnimCurve
+    module.MAnimUtil = MAnimUtil
+    module.MAnimCurveChange = MAnimCurveChange
+    return module
@@ -0,0 +1,749 @@
+'''
+ala_camera_stand_in_benchmarks.py
+Benchmarks of every camera tool operation on the in-memory stand-in scene
+from ala_camera_stand_in.py, runs with plain Python and no Maya licence:
+
+    python ala_camera_stand_in_benchmarks.py --output results.json --compare previous.json
+
+Each benchmark reports its wall time and the number of cmds calls it made.
+Results are written as JSON so runs from different commits can be compared.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import ala_camera_stand_in
+
+scene = ala_camera_stand_in.install()
+
+# Ignore C0411/C0413 warnings because the tool modules must import the stand-in maya modules
+# pylint: disable=wrong-import-order,wrong-import-position
+from maya import cmds
+import ala_camera_autofocus
+import ala_camera_bake
+import ala_camera_batch
+import ala_camera_columns
+import ala_camera_delivery
+import ala_camera_export
+import ala_camera_focus_cache
+import ala_camera_inspector
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_lens_import
+import ala_camera_modifier
+import ala_camera_operations
+import ala_camera_presets
+import ala_camera_rigs
+import ala_camera_surface
+import ala_camera_turntable
+import ala_camera_visibility
+import ala_camera_zoom
+# pylint: enable=wrong-import-order,wrong-import-position
+
+
+def measure(operation):
+    '''
+    Run an operation on the stand-in scene, returns its seconds and cmds call counts
+    '''
+    scene.call_counts.clear()
+    scene.viewport_refreshes = 0
+    scene.undo_entries = 0
+    start = time.perf_counter()
+    operation()
+    seconds = time.perf_counter() - start
+    return {
+        'seconds': seconds,
+        'cmds_calls': sum(scene.call_counts.values()),
+        'viewport_refreshes': scene.viewport_refreshes,
+        'undo_entries': scene.undo_entries,
+        'calls': dict(scene.call_counts),
+    }
+
+
+def benchmark_camera_creation(camera_count=200):
+    '''
+    Create cameras with the default camera body preset
+    '''
+    scene.reset()
+    result = measure(lambda: [ala_camera_operations.create_camera() for _ in range(camera_count)])
+    result['camera_count'] = camera_count
+    return result
+
+
+def benchmark_dof_rigging(rig_counts=(10, 100, 1000)):
+    '''
+    Batch DOF rigs for growing numbers of camera/target pairs, seconds per rig should stay flat
+    '''
+    results = []
+    for rig_count in rig_counts:
+        scene.reset()
+        built = scene.build_synthetic_scene(camera_count=rig_count, locator_count=rig_count)
+        pairs = list(zip(built['cameras'], built['locators']))
+        result = measure(lambda pairs=pairs: ala_camera_operations.batch_depth_of_field(pairs))
+        result.update({'rig_count': rig_count, 'seconds_per_rig': result['seconds'] / rig_count})
+        results.append(result)
+    return results
+
+
+def benchmark_legacy_rig_locator_count(locator_counts=(0, 10000)):
+    '''
+    Legacy distance dimension rig in scenes with more and more locators,
+    the cmds calls made should not grow with the locator count
+    '''
+    results = []
+    for locator_count in locator_counts:
+        scene.reset()
+        built = scene.build_synthetic_scene(camera_count=1, locator_count=locator_count + 1)
+        camera_transform, target = built['cameras'][0], built['locators'][-1]
+
+        def build_rig(camera_transform=camera_transform, target=target):
+            camera_position, target_position = ala_camera_operations.get_world_positions([camera_transform, target])
+            ala_camera_operations.create_distance_rig(camera_transform, camera_position, target_position)
+
+        result = measure(build_rig)
+        result['locator_count'] = locator_count
+        results.append(result)
+    return results
+
+
+def benchmark_disable(rig_count=500):
+    '''
+    Disable the DOF rig of every camera one by one
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=rig_count, locator_count=rig_count)
+    rigs = ala_camera_operations.batch_depth_of_field(list(zip(built['cameras'], built['locators'])))
+    result = measure(lambda: [ala_camera_operations.disable_depth_of_field(camera_shape) for camera_shape, _ in rigs])
+    result['rig_count'] = rig_count
+    return result
+
+
+def benchmark_dof_rig_registry(rig_count=2000):
+    '''
+    List, disable and clean up every DOF rig of a scene with thousands of rigged cameras
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=rig_count, locator_count=rig_count)
+    ala_camera_operations.batch_depth_of_field(list(zip(built['cameras'], built['locators'])))
+    rigs = ala_camera_rigs.list_rigs()
+    return {
+        'rig_count': rig_count,
+        'list': measure(ala_camera_rigs.list_rigs),
+        'disable_all': measure(lambda: ala_camera_rigs.set_rigs_enabled(rigs, False)),
+        'clean_up': measure(ala_camera_rigs.clean_up_rigs),
+    }
+
+
+def benchmark_surface_focus(resolutions=(100, 1000), query_count=1000):
+    '''
+    Build the nearest surface point index of UV spheres of growing resolution
+    (1000 rings x 1000 segments is about 2 million triangles), then time queries
+    from random camera positions against a brute force search of every vertex
+    '''
+    random = np.random.default_rng(0)
+    results = []
+    for resolution in resolutions:
+        points, triangles = ala_camera_stand_in.uv_sphere(50.0, resolution, resolution)
+        queries = random.uniform(-200.0, 200.0, (query_count, 3))
+        start = time.perf_counter()
+        surface_index = ala_camera_surface.SurfaceIndex(points, triangles)
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        surface_index.nearest_points(queries)
+        query_seconds = (time.perf_counter() - start) / query_count
+        start = time.perf_counter()
+        for query in queries[:20]:
+            np.argmin(np.einsum('ij,ij->i', points - query, points - query))
+        brute_force_seconds = (time.perf_counter() - start) / 20
+        results.append({
+            'vertex_count': len(points),
+            'triangle_count': len(triangles),
+            'build_seconds': build_seconds,
+            'query_milliseconds': query_seconds * 1000,
+            'brute_force_vertex_query_milliseconds': brute_force_seconds * 1000,
+        })
+    return results
+
+
+def benchmark_autofocus(mesh_count=200, frame_count=1000):
+    '''
+    Bake autofocus for a camera tracking along a row of UV spheres (8k triangles each),
+    every tenth sphere is animated. The first bake builds the BVH of every mesh,
+    the second one reuses them.
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=mesh_count)
+    points, triangles = ala_camera_stand_in.uv_sphere(5.0, 64, 64)
+    for mesh in built['meshes']:
+        scene.set_mesh(mesh + 'Shape', points, triangles)
+    camera_transform = built['cameras'][0]
+    end_frame = float(frame_count)
+    ala_camera_keys.write_anim_curves({camera_transform + '.translateX': ([1.0, end_frame], [0.0, (mesh_count - 1) * 10.0])}, tangent_type='linear')
+    ala_camera_keys.write_anim_curves({mesh + '.translateY': ([1.0, end_frame], [0.0, 8.0]) for mesh in built['meshes'][::10]}, tangent_type='linear')
+    ala_camera_surface.clear_surface_indexes()
+
+    def bake():
+        return ala_camera_autofocus.bake_autofocus(camera_transform, 1.0, end_frame, smoothing=5)
+
+    return {
+        'frame_count': frame_count,
+        'triangle_count': mesh_count * len(triangles),
+        'first_bake': measure(bake),
+        'cached_bake': measure(bake),
+    }
+
+
+def benchmark_columnar_export(camera_count=20, frame_count=2000, file_camera_count=100, file_frame_count=10000):
+    '''
+    Export animated cameras from the stand-in scene, then write a file of
+    file_camera_count cameras x file_frame_count frames straight through the
+    column writer and load one camera's focal length back. Peak memory is
+    traced to show it depends on the chunk size, not on the file size.
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=camera_count)
+    key_frames = [1.0, float(frame_count)]
+    ala_camera_keys.write_anim_curves({camera + '.translateX': (key_frames, [0.0, 100.0]) for camera in built['cameras']}, tangent_type='linear')
+    ala_camera_keys.write_anim_curves({camera + 'Shape.focalLength': (key_frames, [35.0, 85.0]) for camera in built['cameras']}, tangent_type='linear')
+    cameras = ala_camera_operations.get_scene_cameras()
+    chunk_frames = ala_camera_export.DEFAULT_CHUNK_FRAMES
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        export_path = os.path.join(export_dir, 'export' + ala_camera_export.EXPORT_EXTENSION)
+        tracemalloc.start()
+        export = measure(lambda: ala_camera_export.export_cameras(export_path, cameras, 1.0, float(frame_count)))
+        export['peak_traced_megabytes'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        file_path = os.path.join(export_dir, 'large' + ala_camera_export.EXPORT_EXTENSION)
+        columns = ala_camera_export.get_export_columns(file_camera_count)
+        metadata = {'cameras': [f"shotCam{index}" for index in range(file_camera_count)]}
+        tracemalloc.start()
+        start = time.perf_counter()
+        with ala_camera_columns.ColumnWriter(file_path, columns, file_frame_count, metadata) as writer:
+            for chunk_start in range(0, file_frame_count, chunk_frames):
+                rows = min(chunk_frames, file_frame_count - chunk_start)
+                writer.write(chunk_start, {name: np.ones((rows,) + row_shape) for name, (_, row_shape) in columns.items()})
+        write_seconds = time.perf_counter() - start
+        peak_megabytes = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        column_file = ala_camera_columns.ColumnFile(file_path)
+        focal_lengths = np.array(column_file.camera_column('focalLength', f"shotCam{file_camera_count // 2}"))
+        load_seconds = time.perf_counter() - start
+        file_megabytes = os.path.getsize(file_path) / 1e6
+        #drop the memory map before the directory is removed
+        del column_file
+    return {
+        'export': export,
+        'export_camera_frames': camera_count * frame_count,
+        'file_camera_frames': file_camera_count * file_frame_count,
+        'file_megabytes': file_megabytes,
+        'file_write_seconds': write_seconds,
+        'file_write_peak_traced_megabytes': peak_megabytes,
+        'load_one_column_milliseconds': load_seconds * 1000,
+        'loaded_values': len(focal_lengths),
+    }
+
+
+def benchmark_lens_import(row_count=300000):
+    '''
+    Import an ARRI style lens metadata CSV with one row per frame: a prime lens,
+    a focus pull on every frame and one iris change
+    '''
+    scene.reset()
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    frames = np.arange(row_count)
+    #start at 10:00:00:00, film is 24 fps
+    timecode_frames = frames + 10 * 60 * 60 * 24
+    focus_distances = 1000.0 + 500.0 * np.sin(frames / 200.0)
+    with tempfile.TemporaryDirectory() as import_dir:
+        path = os.path.join(import_dir, 'lens.csv')
+        with open(path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write('Master TC,Lens Focal Length,Lens Focus Distance (mm),Lens Iris\n')
+            for frame, timecode_frame, focus_distance in zip(frames.tolist(), timecode_frames.tolist(), focus_distances.tolist()):
+                seconds, frame_number = divmod(timecode_frame, 24)
+                minutes, seconds = divmod(seconds, 60)
+                hours, minutes = divmod(minutes, 60)
+                iris = 'T2.8' if frame < row_count // 2 else 'T4'
+                csv_file.write(f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frame_number:02d},50,{focus_distance:.2f},{iris}\n")
+        file_megabytes = os.path.getsize(path) / 1e6
+        summary = {}
+        result = measure(lambda: summary.update(ala_camera_lens_import.import_lens_metadata(path, camera_shape, 1001.0)))
+    result.update({'row_count': row_count, 'file_megabytes': file_megabytes, 'keys': summary['keys']})
+    return result
+
+
+def benchmark_focus_cache(pair_count=20, frame_count=2000):
+    '''
+    Bake the focus of many camera/target pairs to the nearest surface point, then re-bake
+    them unchanged (cache hits) and after moving the targets (cache misses)
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=pair_count, mesh_count=pair_count)
+    points, triangles = ala_camera_stand_in.uv_sphere(5.0, 64, 64)
+    for mesh in built['meshes']:
+        scene.set_mesh(mesh + 'Shape', points, triangles)
+    end_frame = float(frame_count)
+    ala_camera_keys.write_anim_curves({camera + '.translateZ': ([1.0, end_frame], [50.0, 500.0]) for camera in built['cameras']},
+                                      tangent_type='linear')
+    ala_camera_focus_cache.focus_curves.clear()
+    ala_camera_focus_cache.focus_curves.stats.clear()
+
+    def bake_all():
+        for camera, target in zip(built['cameras'], built['meshes']):
+            ala_camera_bake.bake_depth_of_field(camera, target, 1.0, end_frame, surface=True)
+
+    def move_targets():
+        for target in built['meshes']:
+            cmds.setAttr(target + '.translateY', 1.0)
+
+    first = measure(bake_all)
+    unchanged = measure(bake_all)
+    move_targets()
+    moved = measure(bake_all)
+    return {
+        'pair_count': pair_count,
+        'frame_count': frame_count,
+        'first_bake': first,
+        'unchanged_rebake': unchanged,
+        'rebake_after_moving_targets': moved,
+        'stats': dict(ala_camera_focus_cache.focus_curves.stats),
+        'cache_megabytes': ala_camera_focus_cache.focus_curves.size_bytes / (1024 * 1024),
+    }
+
+
+def benchmark_camera_inspector(camera_count=2000, selection_events=500, frame_count=1000):
+    '''
+    Box-select growing sets of cameras and play back an animated focal length,
+    without and with the camera inspector following the selection.
+    Every debounce timer restart is counted, the refresh runs once after each burst.
+    '''
+    scene.reset()
+    cameras = scene.build_synthetic_scene(camera_count=camera_count)['cameras']
+    ala_camera_keys.write_anim_curves({cameras[0] + 'Shape.focalLength': ([1.0, float(frame_count)], [18.0, 135.0])})
+    step = max(1, camera_count // selection_events)
+
+    def box_select():
+        for end in range(step, camera_count + 1, step):
+            cmds.select(cameras[:end])
+
+    def play_back():
+        cmds.select(cameras[0])
+        for frame in range(1, frame_count + 1):
+            cmds.currentTime(frame)
+
+    scheduled = []
+    inspector = ala_camera_inspector.CameraInspector(lambda: scheduled.append(True))
+    results = {'camera_count': camera_count, 'selection_events': camera_count // step, 'frame_count': frame_count}
+    for name, action in (('box_select', box_select), ('playback', play_back)):
+        without = measure(action)
+        inspector.start()
+        inspector.refresh()
+        scheduled.clear()
+        inspector.stats.clear()
+        with_inspector = measure(action)
+        refresh = measure(inspector.refresh)
+        values = inspector.refresh()
+        inspector.stop()
+        with_inspector['timer_restarts'] = len(scheduled)
+        with_inspector['callback_events'] = inspector.stats['events']
+        with_inspector['overhead_seconds'] = with_inspector['seconds'] - without['seconds']
+        results[name] = {'without_inspector': without, 'with_inspector': with_inspector, 'debounced_refresh': refresh,
+                         'inspected_values': values}
+    results['callbacks_left_after_stop'] = (sum(len(callbacks) for callbacks in scene.dirty_callbacks.values())
+                                            + sum(len(callbacks) for callbacks in scene.event_callbacks.values()))
+    return results
+
+
+def benchmark_focus_breathing(frame_counts=(1000, 100000), lens_name='Example Zoom 19-80'):
+    '''
+    Build a zoom lens lookup table, look up the effective focal length of every frame
+    of a zooming and refocusing shot, then bake it. The lookup is the compute alone,
+    the bake adds sampling the zoom position and focus distance and writing the keys.
+    '''
+    ala_camera_zoom.zoom_tables.clear()
+    build = measure(lambda: ala_camera_zoom.get_zoom_table(lens_name))
+    cached = measure(lambda: ala_camera_zoom.get_zoom_table(lens_name))
+    table = ala_camera_zoom.get_zoom_table(lens_name)
+    results = {'lens': lens_name, 'table_build': build, 'cached_table': cached, 'shots': []}
+    for frame_count in frame_counts:
+        scene.reset()
+        camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+        end_frame = float(frame_count)
+        ala_camera_keys.write_anim_curves({
+            camera_shape + '.focalLength': ([1.0, end_frame], [19.0, 80.0]),
+            camera_shape + '.focusDistance': ([1.0, end_frame / 2, end_frame], [40.0, 2000.0, 100.0]),
+        }, tangent_type='linear')
+        zoom_focal_lengths = np.linspace(19.0, 80.0, frame_count)
+        focus_distances = np.geomspace(40.0, 2000.0, frame_count)
+        lookup = measure(lambda zoom=zoom_focal_lengths, focus=focus_distances: table.lookup(zoom, focus))
+        lookup['frames_per_second'] = frame_count / lookup['seconds']
+        summaries = []
+        bake = measure(lambda camera_shape=camera_shape, end_frame=end_frame, summaries=summaries: summaries.append(
+            ala_camera_zoom.bake_focus_breathing(camera_shape, lens_name, 1.0, end_frame)))
+        bake['summary'] = summaries[0]
+        results['shots'].append({'frame_count': frame_count, 'lookup': lookup, 'bake': bake})
+    return results
+
+
+def benchmark_frustum_visibility(object_count=50000, frame_count=1000, moving_every=100, spacing=2.0):
+    '''
+    Test a row of object_count unit cubes against the frustum of a camera trucking
+    along it on every frame, every moving_every-th cube is animated. Reports the
+    objects seen per frame, the suggested far clip plane, and writes the table out.
+    still_compute leaves out the animated cubes, whose sampling dominates compute.
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=object_count, spacing=spacing)
+    points = np.array([[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)])
+    triangles = np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                          [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]])
+    for mesh in built['meshes']:
+        scene.set_mesh(mesh + 'Shape', points, triangles)
+    camera_transform = built['cameras'][0]
+    end_frame = float(frame_count)
+    cmds.setAttr(camera_transform + 'Shape.farClipPlane', 100000.0)
+    ala_camera_keys.write_anim_curves({camera_transform + '.translateX': ([1.0, end_frame], [0.0, (object_count - 1) * spacing])},
+                                      tangent_type='linear')
+    ala_camera_keys.write_anim_curves({mesh + '.translateY': ([1.0, end_frame], [0.0, 50.0]) for mesh in built['meshes'][::moving_every]},
+                                      tangent_type='linear')
+    cameras = [(camera_transform, camera_transform + 'Shape')]
+    frames = ala_camera_bake.get_frames(1.0, end_frame)
+    shapes = ala_camera_autofocus.get_scene_meshes()
+    results = []
+    compute = measure(lambda: results.append(ala_camera_visibility.compute_visibility(cameras, frames, shapes)))
+    visibility = results[0]
+    camera_result = visibility['cameras'][camera_transform]
+    compute['object_frames_per_second'] = object_count * frame_count / compute['seconds']
+    still_shapes = [mesh + 'Shape' for index, mesh in enumerate(built['meshes']) if index % moving_every]
+    still_compute = measure(lambda: ala_camera_visibility.compute_visibility(cameras, frames, still_shapes))
+    still_compute['object_frames_per_second'] = len(still_shapes) * frame_count / still_compute['seconds']
+    with tempfile.TemporaryDirectory() as table_dir:
+        table_path = os.path.join(table_dir, 'shot' + ala_camera_visibility.VISIBILITY_EXTENSION)
+        write = measure(lambda: ala_camera_visibility.write_visibility(table_path, visibility))
+        write['megabytes'] = os.path.getsize(table_path) / 1e6
+        columns = ala_camera_columns.ColumnFile(table_path)
+        visible = np.unpackbits(columns.camera_column('visible', camera_transform), axis=-1, count=object_count).astype(bool)
+        write['round_trip'] = bool(np.array_equal(visible, camera_result['visible']))
+    apply = measure(lambda: ala_camera_visibility.apply_far_clips(cameras, visibility))
+    return {
+        'object_count': object_count,
+        'frame_count': frame_count,
+        'moving_objects': len(built['meshes'][::moving_every]),
+        'compute': compute,
+        'still_compute': still_compute,
+        'objects_per_frame': float(camera_result['visible'].sum(axis=1).mean()),
+        'suggested_far_clip': camera_result['far_clip'],
+        'write_table': write,
+        'apply_far_clip': apply,
+    }
+
+
+def keep_stand_in_scene():
+    '''
+    Worker initializer of the stand-in batches, forked workers inherit the installed stand-in
+    '''
+
+
+def benchmark_delivery_batch(scene_count=4, camera_count=3, frame_count=24, workers=(0, 4), render_seconds=0.005):
+    '''
+    Render every camera of several scenes in every format of its delivery set, in this
+    process and with pools of forked workers. render_seconds is charged per rendered frame.
+    '''
+    format_names = ['4:3', '16:9', '16:10', '3:2']
+    scene.render_seconds = render_seconds
+
+    def build_shot(shot_scene):
+        cameras = shot_scene.build_synthetic_scene(camera_count=camera_count)['cameras']
+        shot_scene.playback_range = (1.0, float(frame_count))
+        #the first camera carries its own set, the others get the batch formats
+        shot_scene.node(cameras[0] + 'Shape').attributes[ala_camera_delivery.DELIVERY_ATTRIBUTE] = '["16:9", "DCI 4K"]'
+
+    results = {'scene_count': scene_count, 'camera_count': camera_count, 'frame_count': frame_count, 'runs': []}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scene_paths = [os.path.join(temp_dir, f"shot{index}.mb") for index in range(scene_count)]
+        for scene_path in scene_paths:
+            scene.scene_files[scene_path] = build_shot
+        for worker_count in workers:
+            scene.reset()
+            scene.outputs.clear()
+            operations = {'cameras': 'shotCam*', 'delivery_formats': format_names, 'deliver': 'render',
+                          'delivery_dir': os.path.join(temp_dir, 'deliveries')}
+            journal_path = os.path.join(temp_dir, f"journal_{worker_count}.jsonl")
+            batch_results = []
+            run = measure(lambda worker_count=worker_count, operations=operations, journal_path=journal_path, batch_results=batch_results:
+                          batch_results.extend(ala_camera_batch.run_delivery_batch(scene_paths, operations, worker_count, journal_path, keep_stand_in_scene)))
+            run['workers'] = worker_count
+            run['jobs'] = len(batch_results)
+            run['failed'] = [result for result in batch_results if result['status'] != 'ok']
+            run['job_seconds'] = sum(result['seconds'] for result in batch_results)
+            run['worker_processes'] = len({result['worker'] for result in batch_results})
+            if worker_count <= 0:
+                run['rendered_frames'] = len(scene.outputs)
+                run['resolution_restored'] = scene.nodes['defaultResolution'].attributes['width']
+            results['runs'].append(run)
+    scene.render_seconds = 0.0
+    return results
+
+
+def benchmark_background_jobs(object_count=500, frame_count=240, bake_frames=5000):
+    '''
+    Bake turntables for an asset library and a long DOF bake straight away and as
+    background jobs played through the stand-in idle loop. The longest main thread
+    step is the longest the Camera Tool window would stop responding.
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=object_count)
+    camera_transform, props = built['cameras'][0], built['meshes']
+    ala_camera_keys.write_anim_curves({camera_transform + '.translateX': ([1.0, float(bake_frames)], [0.0, 1000.0])}, tangent_type='linear')
+
+    def run_straight_away():
+        ala_camera_turntable.bake_turntables(props, frame_count=frame_count)
+        ala_camera_bake.bake_depth_of_field(camera_transform, props[0], 1.0, float(bake_frames))
+
+    runner = ala_camera_jobs.JobRunner(defer=scene.execute_deferred)
+    longest_steps = []
+
+    def run_as_jobs():
+        runner.submit("Bake Turntable", ala_camera_turntable.bake_turntables_job(props, frame_count=frame_count))
+        bake_job = runner.submit("Bake DOF", ala_camera_bake.bake_depth_of_field_job(camera_transform, props[0], 1.0, float(bake_frames)))
+        longest_steps.append(scene.run_deferred(lambda: bake_job.finished))
+
+    straight_away = measure(run_straight_away)
+    jobs = measure(run_as_jobs)
+    jobs['longest_main_step_milliseconds'] = longest_steps[0] * 1000
+    jobs['jobs'] = [job.format_timing() for job in runner.finished_jobs]
+    runner.executor.shutdown()
+    return {'object_count': object_count, 'frame_count': frame_count, 'bake_frames': bake_frames,
+            'straight_away': straight_away, 'background_jobs': jobs}
+
+
+def benchmark_turntable(camera_count=200):
+    '''
+    Create a turntable curve around a prop and animate a camera along it
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=camera_count, mesh_count=camera_count)
+
+    def animate():
+        for camera_transform, prop in zip(built['cameras'], built['meshes']):
+            ala_camera_operations.animate_camera(camera_transform, ala_camera_operations.create_turntable_curve(prop))
+
+    result = measure(animate)
+    result['camera_count'] = camera_count
+    return result
+
+
+def benchmark_turntable_keys(object_counts=(10, 100), frame_count=240):
+    '''
+    Bake analytic turntables for a growing asset library, reports the baked keys per second
+    of the orbit maths alone and of the whole bake including the key writes
+    '''
+    results = []
+    for object_count in object_counts:
+        scene.reset()
+        props = scene.build_synthetic_scene(mesh_count=object_count)['meshes']
+        key_count = object_count * frame_count * (len(ala_camera_turntable.TRANSLATE_ATTRIBUTES) + len(ala_camera_turntable.ROTATE_ATTRIBUTES))
+        centers = ala_camera_turntable.get_orbit_centers(props, None)
+        compute = measure(lambda centers=centers: ala_camera_turntable.compute_orbits(centers, frame_count=frame_count))
+        bake = measure(lambda props=props: ala_camera_turntable.bake_turntables(props, frame_count=frame_count))
+        compute['keys_per_second'] = key_count / compute['seconds']
+        bake['keys_per_second'] = key_count / bake['seconds']
+        results.append({'object_count': object_count, 'frame_count': frame_count, 'key_count': key_count, 'compute': compute, 'bake': bake})
+    return results
+
+
+def benchmark_selection(selection_size=5000):
+    '''
+    Classify a large outliner selection of cameras and locators
+    '''
+    scene.reset()
+    built = scene.build_synthetic_scene(camera_count=selection_size // 2, locator_count=selection_size // 2)
+    cmds.select(built['cameras'] + built['locators'])
+    result = measure(ala_camera_operations.SelectionSnapshot)
+    result['selection_size'] = selection_size
+    return result
+
+
+def benchmark_keyframe_writer(key_count=10000):
+    '''
+    Keying with currentTime + setKeyframe against the bulk anim curve writer,
+    currentTime calls are the scene evaluations a real Maya session would pay for
+    '''
+    scene.reset()
+    scrubbed_camera, bulk_camera = scene.build_synthetic_scene(camera_count=2)['cameras']
+
+    def scrub():
+        for frame in range(key_count):
+            cmds.currentTime(frame)
+            cmds.setKeyframe(scrubbed_camera, attribute='rotateY', value=frame % 360)
+
+    def bulk():
+        ala_camera_keys.write_anim_curves({bulk_camera + '.rotateY': (range(key_count), [frame % 360 for frame in range(key_count)])})
+
+    return {'key_count': key_count, 'scrubbed': measure(scrub), 'bulk': measure(bulk)}
+
+
+def benchmark_transactions(camera_count=100, refresh_seconds=0.001):
+    '''
+    Camera body + delivery format + DOF flags written with one setAttr per attribute
+    against one transaction per camera. Every viewport refresh is charged
+    refresh_seconds of simulated redraw time.
+    '''
+    scene.reset()
+    cameras = scene.build_synthetic_scene(camera_count=camera_count)['cameras']
+    camera_body = ala_camera_presets.registry.camera_body(ala_camera_presets.DEFAULT_CAMERA_BODY)
+    delivery_format = ala_camera_presets.registry.delivery_format(camera_body['delivery_format'])
+    flags = {'depthOfField': True, 'aiEnableDOF': True}
+
+    def set_attributes():
+        for camera_transform in cameras:
+            camera_shape = camera_transform + 'Shape'
+            for attribute, value in {**camera_body['attributes'], **flags}.items():
+                cmds.setAttr(camera_shape + '.' + attribute, value)
+            for attribute, value in delivery_format['attributes'].items():
+                cmds.setAttr('defaultResolution.' + attribute, value)
+
+    def transactions():
+        for camera_transform in cameras:
+            camera_shape = camera_transform + 'Shape'
+            with ala_camera_modifier.transaction("benchmarkCameraSetup") as setup_transaction:
+                ala_camera_operations.apply_camera_body(camera_shape)
+                setup_transaction.set_values({camera_shape + '.' + attribute: value for attribute, value in flags.items()})
+
+    scene.refresh_seconds = refresh_seconds
+    try:
+        return {
+            'camera_count': camera_count,
+            'simulated_refresh_seconds': refresh_seconds,
+            'set_attributes': measure(set_attributes),
+            'transactions': measure(transactions),
+        }
+    finally:
+        scene.refresh_seconds = 0.0
+
+
+def benchmark_bulk_camera_settings(camera_counts=(300, 3000)):
+    '''
+    Re-lens many cameras in one call against a getAttr/setAttr loop per camera,
+    finding the cameras by name pattern is measured on its own
+    '''
+    results = []
+    for camera_count in camera_counts:
+        scene.reset()
+        camera_shapes = [camera + 'Shape' for camera in scene.build_synthetic_scene(camera_count=camera_count)['cameras']]
+
+        def loop(camera_shapes=camera_shapes):
+            for camera_shape in camera_shapes:
+                cmds.getAttr(camera_shape + '.focalLength')
+                cmds.setAttr(camera_shape + '.focalLength', 40.0)
+
+        results.append({
+            'camera_count': camera_count,
+            'loop': measure(loop),
+            'bulk': measure(lambda camera_shapes=camera_shapes: ala_camera_operations.adjust_focal_length(50.0, camera_shapes)),
+            'name_pattern_lookup': measure(lambda: ala_camera_operations.get_target_cameras('shotCam*')),
+        })
+    return results
+
+
+BENCHMARKS = {
+    'autofocus': benchmark_autofocus,
+    'background_jobs': benchmark_background_jobs,
+    'camera_inspector': benchmark_camera_inspector,
+    'columnar_export': benchmark_columnar_export,
+    'camera_creation': benchmark_camera_creation,
+    'dof_rigging': benchmark_dof_rigging,
+    'delivery_batch': benchmark_delivery_batch,
+    'legacy_rig_locator_count': benchmark_legacy_rig_locator_count,
+    'disable': benchmark_disable,
+    'dof_rig_registry': benchmark_dof_rig_registry,
+    'focus_breathing': benchmark_focus_breathing,
+    'focus_cache': benchmark_focus_cache,
+    'frustum_visibility': benchmark_frustum_visibility,
+    'lens_import': benchmark_lens_import,
+    'surface_focus': benchmark_surface_focus,
+    'turntable': benchmark_turntable,
+    'turntable_keys': benchmark_turntable_keys,
+    'selection': benchmark_selection,
+    'keyframe_writer': benchmark_keyframe_writer,
+    'transactions': benchmark_transactions,
+    'bulk_camera_settings': benchmark_bulk_camera_settings,
+}
+
+
+def get_commit():
+    '''
+    Short hash of the checked out commit, None outside a git checkout
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def collect_seconds(results, prefix=''):
+    '''
+    Flatten nested results into {"benchmark.path": seconds}
+    '''
+    if isinstance(results, list):
+        return {key: value for index, item in enumerate(results) for key, value in collect_seconds(item, f"{prefix}[{index}]").items()}
+    if not isinstance(results, dict):
+        return {}
+    seconds = {prefix: results['seconds']} if 'seconds' in results else {}
+    for key, value in results.items():
+        if isinstance(value, (dict, list)) and key != 'calls':
+            seconds.update(collect_seconds(value, f"{prefix}.{key}" if prefix else key))
+    return seconds
+
+
+def print_comparison(previous, current):
+    '''
+    Print the timings of two result files side by side
+    '''
+    previous_seconds = collect_seconds(previous['benchmarks'])
+    print(f"{'benchmark':48} {previous['commit'] or 'previous':>10} {current['commit'] or 'current':>10}  ratio")
+    for name, seconds in collect_seconds(current['benchmarks']).items():
+        if name in previous_seconds:
+            ratio = seconds / previous_seconds[name] if previous_seconds[name] else float('inf')
+            print(f"{name:48} {previous_seconds[name]:10.4f} {seconds:10.4f}  {ratio:5.2f}x")
+
+
+def main(argv=None):
+    '''
+    Run the selected benchmarks, write the JSON results and compare them with an earlier run
+    '''
+    parser = argparse.ArgumentParser(description="Benchmark the camera tool on the in-memory stand-in scene")
+    parser.add_argument('benchmarks', nargs='*', help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {
+        'commit': get_commit(),
+        'python': sys.version.split()[0],
+        'benchmarks': {name: BENCHMARKS[name]() for name in args.benchmarks or BENCHMARKS},
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as previous:
+            print_comparison(json.load(previous), results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,376 @@
+'''
+ala_camera_surface.py
+Nearest surface point focus for DOF rigs and bakes.
+A KD-tree is built once from the vertex array of a mesh with NumPy and
+cached per mesh until its geometry changes, so every query only visits a
+few leaves. The nearest vertex is refined to the closest point on the
+triangles around it, which is exact wherever the closest face touches the
+closest vertex. Everything is kept in the object space of the mesh so
+moving or animating a prop never rebuilds its tree. When a deformer moves
+the points of a mesh the tree is refitted instead of rebuilt: the nodes keep
+their vertices and only their boxes are recomputed, which is a few NumPy
+reductions but still reads the whole mesh every time its geometry changes.
+'''
+import copy
+import heapq
+import itertools
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_jobs
+
+# Points per KD-tree leaf, compared with one vectorized distance computation.
+# Large leaves keep the number of NumPy calls per query low on dense meshes
+LEAF_SIZE = 256
+
+# MObjectHandle hash code of a mesh shape -> {'handle', 'indexes', 'previous', 'version', 'callback'},
+# indexes maps an index class such as SurfaceIndex to the index built from the mesh,
+# previous holds the indexes of the geometry before the last change, to be refitted
+surface_indexes = {}
+
+# Geometry versions, a mesh gets a new one whenever its geometry changes
+mesh_versions = itertools.count(1)
+
+
+# Ignore R0902 warning because the nodes are kept as one flat list per field
+class KDTree():  # pylint: disable=too-many-instance-attributes
+    '''
+    Static KD-tree over an (N, 3) point array, nodes are stored in flat lists.
+    Leaves hold consecutive rows of self.points, self.indices maps them back
+    to the rows of the original array.
+    '''
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if points.size == 0:
+            raise ValueError("Cannot build a KD-tree without points")
+        order = np.arange(len(points))
+        self.starts = []
+        self.ends = []
+        self.lefts = []
+        self.rights = []
+        self.split_axes = []
+        self.split_values = []
+        # (min x, min y, min z, max x, max y, max z) of the points under every node
+        self.boxes = []
+
+        pending = [self.add_node(points, order, 0, len(points))]
+        while pending:
+            node = pending.pop()
+            start, end = self.starts[node], self.ends[node]
+            if end - start <= leaf_size:
+                continue
+            box = self.boxes[node]
+            axis = int(np.argmax(np.subtract(box[3:], box[:3])))
+            middle = (start + end) // 2
+            block = order[start:end]
+            #median split, only partitioned instead of sorted
+            order[start:end] = block[np.argpartition(points[block, axis], middle - start)]
+            self.split_axes[node] = axis
+            self.split_values[node] = float(points[order[middle], axis])
+            self.lefts[node] = self.add_node(points, order, start, middle)
+            self.rights[node] = self.add_node(points, order, middle, end)
+            pending += [self.lefts[node], self.rights[node]]
+
+        self.points = points[order]
+        self.indices = order
+
+    def refit(self, points):
+        '''
+        KD-tree over moved points with the same nodes, only the node boxes are recomputed.
+        Queries stay exact, they slow down as the points drift from the split planes.
+        '''
+        tree = copy.copy(self)
+        tree.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)[self.indices]
+        #every node covers consecutive rows, one reduceat over start, end, start, end... bounds them all
+        ranges = np.ravel(np.column_stack([self.starts, self.ends]))
+        lows = np.minimum.reduceat(np.vstack([tree.points, [np.inf] * 3]), ranges)[::2]
+        highs = np.maximum.reduceat(np.vstack([tree.points, [-np.inf] * 3]), ranges)[::2]
+        tree.boxes = [tuple(box) for box in np.hstack([lows, highs]).tolist()]
+        return tree
+
+    def add_node(self, points, order, start, end):
+        '''
+        Add a leaf over order[start:end], returns its node index
+        '''
+        block = points[order[start:end]]
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lefts.append(-1)
+        self.rights.append(-1)
+        self.split_axes.append(0)
+        self.split_values.append(0.0)
+        self.boxes.append(tuple(block.min(axis=0).tolist() + block.max(axis=0).tolist()))
+        return len(self.starts) - 1
+
+    def box_distance(self, node, point):
+        '''
+        Squared distance from a point to the box of a node, 0 inside the box
+        '''
+        x, y, z = point
+        min_x, min_y, min_z, max_x, max_y, max_z = self.boxes[node]
+        box_x = min_x - x if x < min_x else (x - max_x if x > max_x else 0.0)
+        box_y = min_y - y if y < min_y else (y - max_y if y > max_y else 0.0)
+        box_z = min_z - z if z < min_z else (z - max_z if z > max_z else 0.0)
+        return box_x * box_x + box_y * box_y + box_z * box_z
+
+    def nearest(self, point):
+        '''
+        Row of the original points closest to point and its squared distance.
+        Nodes are visited nearest box first, the search stops once the nearest
+        remaining box is further away than the best point found.
+        '''
+        point = tuple(float(value) for value in point)
+        best_row, best_distance = -1, float('inf')
+        pending = [(0.0, 0)]
+        while pending:
+            node_distance, node = heapq.heappop(pending)
+            if node_distance >= best_distance:
+                break
+            if self.lefts[node] < 0:
+                offsets = self.points[self.starts[node]:self.ends[node]] - point
+                distances = np.einsum('ij,ij->i', offsets, offsets)
+                row = int(distances.argmin())
+                if distances[row] < best_distance:
+                    best_row, best_distance = self.starts[node] + row, float(distances[row])
+                continue
+            for child in (self.lefts[node], self.rights[node]):
+                child_distance = self.box_distance(child, point)
+                if child_distance < best_distance:
+                    heapq.heappush(pending, (child_distance, child))
+        return int(self.indices[best_row]), best_distance
+
+
+def closest_points_on_triangles(point, corners):
+    '''
+    Closest point to point on each of the (T, 3, 3) triangle corners,
+    the region tests of Ericson's Real-Time Collision Detection, vectorized
+    '''
+    point = np.asarray(point, dtype=np.float64)
+    corner_a, corner_b, corner_c = corners[:, 0], corners[:, 1], corners[:, 2]
+    edge_ab = corner_b - corner_a
+    edge_ac = corner_c - corner_a
+
+    def dots(vectors, others):
+        return np.einsum('ij,ij->i', vectors, others)
+
+    to_a, to_b, to_c = point - corner_a, point - corner_b, point - corner_c
+    d1, d2 = dots(edge_ab, to_a), dots(edge_ac, to_a)
+    d3, d4 = dots(edge_ab, to_b), dots(edge_ac, to_b)
+    d5, d6 = dots(edge_ab, to_c), dots(edge_ac, to_c)
+    area_c = d1 * d4 - d3 * d2
+    area_b = d5 * d2 - d1 * d6
+    area_a = d3 * d6 - d5 * d4
+
+    #branches that are not picked may divide by zero, their results are thrown away
+    with np.errstate(divide='ignore', invalid='ignore'):
+        on_ab = corner_a + (d1 / (d1 - d3))[:, np.newaxis] * edge_ab
+        on_ac = corner_a + (d2 / (d2 - d6))[:, np.newaxis] * edge_ac
+        on_bc = corner_b + ((d4 - d3) / ((d4 - d3) + (d5 - d6)))[:, np.newaxis] * (corner_c - corner_b)
+        total = area_a + area_b + area_c
+        inside = corner_a + (area_b / total)[:, np.newaxis] * edge_ab + (area_c / total)[:, np.newaxis] * edge_ac
+
+    regions = [
+        (d1 <= 0) & (d2 <= 0),
+        (d3 >= 0) & (d4 <= d3),
+        (area_c <= 0) & (d1 >= 0) & (d3 <= 0),
+        (d6 >= 0) & (d5 <= d6),
+        (area_b <= 0) & (d2 >= 0) & (d6 <= 0),
+        (area_a <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+    ]
+    closest = inside
+    #apply the regions from last to first so the first matching one wins
+    for region, region_points in reversed(list(zip(regions, (corner_a, corner_b, on_ab, corner_c, on_ac, on_bc)))):
+        closest = np.where(region[:, np.newaxis], region_points, closest)
+    return closest
+
+
+class SurfaceIndex():
+    '''
+    Nearest surface point queries on one mesh, in the object space of the mesh
+    '''
+    def __init__(self, points, triangles):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.tree = KDTree(self.points)
+        #triangles around every vertex: vertex_triangles[vertex_offsets[v]:vertex_offsets[v + 1]]
+        corners = self.triangles.ravel()
+        self.vertex_triangles = np.argsort(corners, kind='stable') // 3
+        self.vertex_offsets = np.concatenate([[0], np.cumsum(np.bincount(corners, minlength=len(self.points)))])
+
+    def refit(self, points, triangles):
+        '''
+        Index of the same triangles over moved points, None when the topology changed
+        '''
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        if points.shape != self.points.shape or not np.array_equal(triangles, self.triangles):
+            return None
+        index = copy.copy(self)
+        index.points = points
+        index.tree = self.tree.refit(points)
+        return index
+
+    def nearest_point(self, point):
+        '''
+        Closest point of the surface to an object space point
+        '''
+        vertex, _ = self.tree.nearest(point)
+        triangles = self.vertex_triangles[self.vertex_offsets[vertex]:self.vertex_offsets[vertex + 1]]
+        if triangles.size == 0:
+            return self.points[vertex]
+        candidates = closest_points_on_triangles(point, self.points[self.triangles[triangles]])
+        offsets = candidates - point
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        if np.isnan(distances).all():
+            #only degenerate triangles around the vertex
+            return self.points[vertex]
+        return candidates[np.nanargmin(distances)]
+
+    def nearest_points(self, points):
+        '''
+        Closest surface point of every row of an (N, 3) array
+        '''
+        return np.array([self.nearest_point(point) for point in np.asarray(points, dtype=np.float64).reshape(-1, 3)])
+
+
+def read_mesh(mesh_object):
+    '''
+    Object space vertex array and triangle corners of a mesh shape
+    '''
+    mesh_fn = om2.MFnMesh(mesh_object)
+    points = np.array(mesh_fn.getPoints(om2.MSpace.kObject), dtype=np.float64)[:, :3]
+    _, triangle_vertices = mesh_fn.getTriangles()
+    return points, np.array(triangle_vertices, dtype=np.int64)
+
+
+def fit_index(index_class, points, triangles, previous=None):
+    '''
+    index_class(points, triangles), refitted from the previous index of the mesh when only
+    its points moved, e.g. under a deformer. Index classes without a refit method are rebuilt.
+    '''
+    if isinstance(previous, index_class) and hasattr(previous, 'refit'):
+        index = previous.refit(points, triangles)
+        if index is not None:
+            return index
+    return index_class(points, triangles)
+
+
+def on_mesh_dirty(_node, plug, key):
+    '''
+    Mark the indexes of a mesh stale once its geometry changes, moving the mesh does not count.
+    The stale indexes are kept to be refitted to the new points.
+    '''
+    if plug.partialName(useLongNames=True) == 'outMesh' and key in surface_indexes:
+        cached = surface_indexes[key]
+        if cached['indexes']:
+            cached['previous'] = cached['indexes']
+        #a new dict, so indexes still being built from the old geometry are never cached
+        cached['indexes'] = {}
+        cached['version'] = next(mesh_versions)
+
+
+def get_mesh_cache(mesh_object):
+    '''
+    Cache entry of a mesh shape MObject, created with its dirty callback on first use
+    '''
+    handle = om2.MObjectHandle(mesh_object)
+    key = handle.hashCode()
+    cached = surface_indexes.get(key)
+    if cached is not None and not cached['handle'].isValid():
+        forget_surface_index(key)
+        cached = None
+    if cached is None:
+        cached = surface_indexes[key] = {
+            'handle': handle,
+            'indexes': {},
+            'previous': {},
+            'version': next(mesh_versions),
+            #the callback stays registered, it only drops the stale indexes
+            'callback': om2.MNodeMessage.addNodeDirtyPlugCallback(mesh_object, on_mesh_dirty, key),
+        }
+    return cached
+
+
+def get_mesh_index(mesh_object, index_class):
+    '''
+    index_class(points, triangles) of a mesh shape MObject, built on first use
+    and refitted or rebuilt after every geometry change
+    '''
+    cached = get_mesh_cache(mesh_object)
+    indexes = cached['indexes']
+    if index_class not in indexes:
+        indexes[index_class] = fit_index(index_class, *read_mesh(mesh_object), cached['previous'].get(index_class))
+    return indexes[index_class]
+
+
+def mesh_indexes_job(mesh_objects, index_class):
+    '''
+    Job steps getting the index_class of every mesh shape MObject like get_mesh_index,
+    meshes are read on the main thread and the missing indexes built or refitted by the
+    worker threads, one mesh each at a time so only a few vertex arrays are held at once
+    '''
+    caches = [get_mesh_cache(mesh_object) for mesh_object in mesh_objects]
+    cached_indexes = [cached['indexes'] for cached in caches]
+    missing = [position for position, indexes in enumerate(cached_indexes) if index_class not in indexes]
+    for group_start in range(0, len(missing), ala_camera_jobs.DEFAULT_WORKERS):
+        group = missing[group_start:group_start + ala_camera_jobs.DEFAULT_WORKERS]
+        built = yield [ala_camera_jobs.work(fit_index, index_class, *read_mesh(mesh_objects[position]),
+                                            caches[position]['previous'].get(index_class)) for position in group]
+        for position, index in zip(group, built):
+            cached_indexes[position][index_class] = index
+        yield ala_camera_jobs.progress(group_start + len(group), len(missing), "Building mesh indexes")
+    return [indexes[index_class] for indexes in cached_indexes]
+
+
+def get_mesh_version(mesh_object):
+    '''
+    Geometry version of a mesh shape MObject, unique across meshes and changes
+    '''
+    return get_mesh_cache(mesh_object)['version']
+
+
+def get_surface_index(mesh_object):
+    '''
+    SurfaceIndex of a mesh shape MObject
+    '''
+    return get_mesh_index(mesh_object, SurfaceIndex)
+
+
+def forget_surface_index(key):
+    '''
+    Remove the cached indexes of a mesh and its dirty callback
+    '''
+    cached = surface_indexes.pop(key, None)
+    if cached is not None:
+        om2.MMessage.removeCallback(cached['callback'])
+
+
+def clear_surface_indexes():
+    '''
+    Remove every cached index, e.g. when the plugin is unloaded
+    '''
+    for key in list(surface_indexes):
+        forget_surface_index(key)
+
+
+def get_mesh_shape(obj):
+    '''
+    First non intermediate mesh shape of an object, None if it has no mesh
+    '''
+    meshes = cmds.listRelatives(obj, shapes=True, type='mesh', noIntermediate=True, fullPath=True)
+    return meshes[0] if meshes else None
+
+
+def surface_distances(camera_positions, target_matrices, surface_index):
+    '''
+    Distance from (frames, 3) camera positions to the nearest surface point of a mesh
+    moving with (frames, 4, 4) world matrices, nearest points are searched in object space
+    '''
+    camera_positions = np.asarray(camera_positions, dtype=np.float64)
+    target_matrices = np.asarray(target_matrices, dtype=np.float64)
+    ones = np.ones((len(camera_positions), 1))
+    #Maya matrices multiply row vectors, translation is in the last row
+    local_positions = np.einsum('fi,fij->fj', np.hstack([camera_positions, ones]), np.linalg.inv(target_matrices))[:, :3]
+    nearest = surface_index.nearest_points(local_positions)
+    world_nearest = np.einsum('fi,fij->fj', np.hstack([nearest, ones]), target_matrices)[:, :3]
+    return np.linalg.norm(world_nearest - camera_positions, axis=1)
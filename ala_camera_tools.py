@@ -4,199 +4,88 @@ This tool creates a camera based on a real world camera
 and lets user set Arri Master Prime focal lengths.
 This is done so that DOF is maintained regardless of distance.
 '''
-from PySide2.QtCore import *
-from PySide2.QtWidgets import *
-from PySide2.QtGui import *
+# Ignore C0302 warning because every tab of the window and its slots live in the one CameraTool class
+# pylint: disable=too-many-lines
+import os
+import time
+IMPORT_START = time.perf_counter()
+# Ignore C0413 warning because the timer has to start before the other imports
+# pylint: disable=wrong-import-position
+import functools
+from PySide2.QtCore import Qt, QTimer
+from PySide2.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QDoubleSpinBox,
+    QFileDialog,
+    QFormLayout,
+    QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QMainWindow,
+    QPlainTextEdit,
+    QProgressBar,
+    QPushButton,
+    QSpinBox,
+    QTabWidget,
+    QVBoxLayout,
+    QWidget,
+)
+from PySide2.QtGui import QFont
 from shiboken2 import wrapInstance
 from maya import OpenMayaUI as omui
 from maya import cmds
-
-aspect_ratios = [
-    '4:3',
-    '16:9',
-    '16:10',
-    '3:2'
-]
-
-focal_lengths = [
-    "12",
-    "14",
-    "16",
-    "18",
-    "21",
-    "25",
-    "27",
-    "32",
-    "35",
-    "45",
-    "55",
-    "65",
-    "75",
-    "100",
-    "135",
-    "150"
-]
-
-locator_scales = [
-    "5",
-    "10",
-    "15",
-    "20",
-    "25",
-    "30",
-    "35",
-    "45",
-    "55",
-    "70",
-    "85",
-    "100"
-]
-
-def get_selected_cam_shape():
-    '''
-    function to get selected camera shape on the outliner
-    '''
-    for each_camera_transform in cmds.ls(sl=True):
-        camera_shape = cmds.listRelatives(each_camera_transform,type="camera")
-        if camera_shape:
-            return camera_shape[0]
-    return None
-
-
-def get_selected_cam_transform():
-    '''
-    function to get selected camera transform on the outliner
-    '''
-    camera_transform = cmds.listRelatives(get_selected_cam_shape(), parent=True)
-    return camera_transform[0]
-
-
-def get_object_to_focus():
-    '''
-    function to get the object to focus for DOF
-    '''
-    for obj in cmds.ls(sl=True):
-        if obj != get_selected_cam_transform():
-            return obj
-    return None
-
-
-def get_obj():
-    '''
-    gets a selected object in general, likely to be used for other tools as well
-    '''
-    for obj in cmds.ls(sl=True):
-        if obj:
-            return obj
-    return None
-
-
-def get_all_locator_transform():
-    '''
-    function to get all locator transform nodes in the scene
-    '''
-    locators = cmds.ls(exactType=('locator'), l=True) or []
-    locator_transform = cmds.listRelatives(locators, parent=True)
-    return locator_transform
-
-
-def set_default_settings():
+import ala_camera_autofocus
+import ala_camera_bake
+import ala_camera_delivery
+import ala_camera_focus_cache
+import ala_camera_inspector
+import ala_camera_jobs
+import ala_camera_lens_import
+import ala_camera_operations
+import ala_camera_presets
+import ala_camera_profiler
+import ala_camera_rigs
+import ala_camera_turntable
+import ala_camera_visibility
+import ala_camera_zoom
+from ala_camera_operations import (
+    locator_scales,
+    SelectionError,
+    SelectionSnapshot,
+    adjust_focal_length,
+    adjust_locator_scale,
+    basic_depth_of_field_settings,
+    batch_depth_of_field_job,
+    format_camera_report,
+    get_focus_target,
+    pair_cameras_with_targets,
+)
+from ala_camera_profiler import profile_action
+# pylint: enable=wrong-import-position
+
+WINDOW_OBJECT_NAME = 'alaCameraToolWindow'
+
+# Milliseconds without selection or attribute changes before the camera inspector refreshes
+INSPECTOR_DEBOUNCE_MS = 150
+
+# Seconds spent importing this module, creating the window and building each tab
+startup_timings = {'import_seconds': time.perf_counter() - IMPORT_START, 'window_seconds': None, 'tabs': {}}
+
+
+def report_selection_errors(slot):
     '''
-    Set default resolution to 1920 * 1080 and aspect ratio (16/9)
+    Show selection problems of a tool action as a Maya warning
     '''
-    cmds.setAttr('defaultResolution.width', 1920)
-    cmds.setAttr('defaultResolution.height', 1080)
-    cmds.setAttr('defaultResolution.deviceAspectRatio', 1.778)
-
-
-def set_four_by_three_settings():
-    '''
-    set settings to aspect ratio 4/3, resolution: 1024 * 760
-    '''
-    cmds.setAttr('defaultResolution.width', 1024)
-    cmds.setAttr('defaultResolution.height', 768)
-    cmds.setAttr('defaultResolution.deviceAspectRatio', 1.333)
-
-
-def set_sixteen_by_ten_settings():
-    '''
-    set settings to aspect ratio 16/10, resolution: 1440 * 900
-    '''
-    cmds.setAttr('defaultResolution.width', 1440)
-    cmds.setAttr('defaultResolution.height', 900)
-    cmds.setAttr('defaultResolution.deviceAspectRatio', 1.6)
-
-
-def set_three_by_two_settings():
-    '''
-    Set settings to aspect ratio 3/2, resolution: 1080 * 720
-    '''
-    cmds.setAttr('defaultResolution.width', 1080)
-    cmds.setAttr('defaultResolution.height', 720)
-    cmds.setAttr('defaultResolution.deviceAspectRatio', 1.5)
-
-
-def adjust_focal_length(focal_length):
-    '''
-    Set the focal length of the camera
-    '''
-    cmds.setAttr(get_selected_cam_shape()+".fl", focal_length)
-
-
-def adjust_locator_scale(locator_scale):
-    '''
-    Set the locator scale of the camera
-    '''
-    cmds.setAttr(get_selected_cam_shape()+".locatorScale", locator_scale)
-
-def assign_locators(shot_camera_transform):
-    '''
-    Assign locators between camera and object
-    '''
-    all_locator_transforms = get_all_locator_transform()
-    for locator_transform in all_locator_transforms:
-        #check if that locator is the same position as the camera to parent
-        locator_transform_x = cmds.getAttr(locator_transform + '.translateX')
-        locator_transform_y = cmds.getAttr(locator_transform + '.translateY')
-        locator_transform_z = cmds.getAttr(locator_transform + '.translateZ')
-        shot_cam_x =  cmds.getAttr(shot_camera_transform + '.translateX')
-        shot_cam_y = cmds.getAttr(shot_camera_transform + '.translateY')
-        shot_cam_z = cmds.getAttr(shot_camera_transform + '.translateZ')
-        # object_x =  cmds.getAttr(object_to_focus + '.translateX')
-        # object_y = cmds.getAttr(object_to_focus + '.translateY')
-        # object_z = cmds.getAttr(object_to_focus + '.translateZ')
-        if locator_transform_x == shot_cam_x:
-            if locator_transform_y == shot_cam_y:
-                if locator_transform_z == shot_cam_z:
-                    cmds.parent(locator_transform, shot_camera_transform)
-        else:
-            cmds.rename(locator_transform, 'AimLocator')
-
-# Refactored code common to both DOF methods
-def basic_depth_of_field_settings():
-    '''
-    get selected camera shape, transform and objec to focus for DOF
-    '''
-    shot_camera_shape = get_selected_cam_shape()
-    shot_camera_transform = get_selected_cam_transform()
-    object_to_focus = get_object_to_focus()
-
-    cmds.setAttr(shot_camera_shape+".depthOfField", True)
-    cmds.setAttr(shot_camera_shape+".locatorScale", 30)
-
-    # Use distance tool to create 2 locators between camera and selected object
-    shot_cam_x =  cmds.getAttr(shot_camera_transform + '.translateX')
-    shot_cam_y = cmds.getAttr(shot_camera_transform + '.translateY')
-    shot_cam_z = cmds.getAttr(shot_camera_transform + '.translateZ')
-    object_x =  cmds.getAttr(object_to_focus + '.translateX')
-    object_y = cmds.getAttr(object_to_focus + '.translateY')
-    object_z = cmds.getAttr(object_to_focus + '.translateZ')
-    shot_camera_coordinates = (shot_cam_x, shot_cam_y, shot_cam_z)
-    object_coord = (object_x, object_y, object_z)
-    dist_dimension_shape = cmds.distanceDimension(sp=shot_camera_coordinates, ep=object_coord)
-    assign_locators(shot_camera_transform)
-    return shot_camera_shape, dist_dimension_shape
-
+    @functools.wraps(slot)
+    def wrapper(self, *_args):
+        try:
+            return slot(self)
+        except SelectionError as error:
+            cmds.warning(str(error))
+            return None
+    return wrapper
 
 
 def get_option_menu_value(option_menu):
@@ -216,91 +105,308 @@ def get_maya_window():
     return maya_main_window
 
 
-class CameraTool(QMainWindow):
+def show_camera_tool():
+    '''
+    Show the Camera Tool parented to the Maya window, reusing the open window if there is one.
+    Set ALA_CAMERA_TOOL_TIMINGS=1 to print the startup timings and
+    ALA_CAMERA_PROFILE=<trace.json> to profile every button click.
+    '''
+    start = time.perf_counter()
+    if os.environ.get('ALA_CAMERA_PROFILE') and ala_camera_profiler.active_profiler is None:
+        ala_camera_profiler.enable(os.environ['ALA_CAMERA_PROFILE'])
+    maya_window = get_maya_window()
+    tool_window = maya_window.findChild(QMainWindow, WINDOW_OBJECT_NAME)
+    if tool_window is None:
+        tool_window = CameraTool(maya_window)
+    tool_window.show()
+    tool_window.raise_()
+    tool_window.activateWindow()
+    startup_timings['window_seconds'] = time.perf_counter() - start
+    if os.environ.get('ALA_CAMERA_TOOL_TIMINGS'):
+        print(f"Camera Tool startup: import {startup_timings['import_seconds'] * 1000:.1f} ms, "
+              f"window {startup_timings['window_seconds'] * 1000:.1f} ms")
+    return tool_window
+
+
+# Ignore R0902/R0904 warnings because every button has its own slot reading the widgets built by each tab
+class CameraTool(QMainWindow): # pylint: disable=too-many-instance-attributes,too-many-public-methods
     '''
     Class for camera UI   
     '''
-    # TODO: Refactor code to fix R0914 and R0915 warning
-    def __init__(self):
-        super().__init__()
+    def __init__(self, parent=None):
+        super().__init__(parent)
         #set name of the UI
         self.setWindowTitle("Camera Tool")
-        #Initiate tabs for UI
-        tab = QTabWidget()
+        self.setObjectName(WINDOW_OBJECT_NAME)
+        self.header_font = QFont('Arial', 15)
+        self.header_font.setBold(True)
+        #Setup fonts for instructional text
+        self.instructions_font = QFont('Arial', 15)
+        #widgets read by the slots, created when their tab is built
+        self.camera_body_dropdown = None
+        self.camera_dropdown = None
+        self.camera_body_pattern_field = None
+        self.delivery_formats_list = None
+        self.camera_settings_pattern_field = None
+        self.lens_set_dropdown = None
+        self.focal_length_dropdown = None
+        self.locator_scale_dropdown = None
+        self.inspector_label = None
+        self.zoom_lens_dropdown = None
+        self.visibility_far_clip_checkbox = None
+        self.bake_dof_remove_rig_checkbox = None
+        self.focus_cache_label = None
+        self.dof_surface_checkbox = None
+        self.autofocus_screen_x_field = None
+        self.autofocus_screen_y_field = None
+        self.autofocus_smoothing_field = None
+        self.turntable_radius_field = None
+        self.turntable_elevation_field = None
+        self.turntable_frames_field = None
+        self.turntable_orbits_field = None
+        self.turntable_follow_checkbox = None
+
+        #Selection and attribute callbacks restart the timer, the inspector refreshes once they settle
+        self.inspector_timer = QTimer(self)
+        self.inspector_timer.setSingleShot(True)
+        self.inspector_timer.setInterval(INSPECTOR_DEBOUNCE_MS)
+        self.inspector_timer.timeout.connect(self.show_inspected_camera)
+        self.inspector = ala_camera_inspector.CameraInspector(self.inspector_timer.start)
+
+        #Initiate tabs for UI, each tab is only built the first time it is shown
+        self.tab = QTabWidget()
+        self.tab_builders = {}
+        for title, builder in (("Set Up Camera", self.build_set_up_camera_tab),
+                               ("Camera Settings", self.build_camera_settings_tab),
+                               ("Depth of Field Options", self.build_depth_of_field_tab),
+                               ("Camera Animation", self.build_camera_animation_tab)):
+            tab_widget = QWidget()
+            tab_widget.setLayout(QVBoxLayout())
+            self.tab_builders[self.tab.addTab(tab_widget, title)] = builder
+        self.tab.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tab.currentIndex())
+
+        #Long actions run as background jobs, shown below the tabs
+        self.job_runner = ala_camera_jobs.JobRunner()
+        self.job_runner.listeners.append(self.show_job)
+        self.job_label = QLabel("No job running")
+        self.job_progress_bar = QProgressBar()
+        self.job_cancel_button = QPushButton("Cancel")
+        self.job_cancel_button.setEnabled(False)
+        self.job_cancel_button.clicked.connect(self.job_runner.cancel_all)
+        self.job_timings_text = QPlainTextEdit()
+        self.job_timings_text.setReadOnly(True)
+        self.job_timings_text.setMaximumHeight(80)
+        central_widget = QWidget()
+        central_layout = QVBoxLayout(central_widget)
+        central_layout.addWidget(self.tab)
+        for job_widget in (self.job_label, self.job_progress_bar, self.job_cancel_button, self.job_timings_text):
+            central_layout.addWidget(job_widget)
+        self.setCentralWidget(central_widget)
+
+
+    def build_tab(self, index):
+        '''
+        Build the widgets of a tab the first time it is shown
+        '''
+        builder = self.tab_builders.pop(index, None)
+        if builder is None:
+            return
+        start = time.perf_counter()
+        builder(self.tab.widget(index).layout())
+        startup_timings['tabs'][self.tab.tabText(index)] = time.perf_counter() - start
+
+
+    def show_job(self, job):
+        '''
+        Show the progress of the running job and the timings of the finished ones
+        '''
+        if job.finished:
+            self.job_timings_text.setPlainText(self.job_runner.format_report())
+            self.show_focus_cache_stats()
+        running = self.job_runner.current
+        queued = f", {len(self.job_runner.queue)} queued" if self.job_runner.queue else ""
+        self.job_cancel_button.setEnabled(running is not None)
+        if running is None:
+            self.job_label.setText("No job running" + queued)
+            self.job_progress_bar.reset()
+            return
+        done, total, message = running.progress
+        self.job_label.setText(f"{running.name}: {message or running.state}{queued}")
+        #no total yet shows a busy bar
+        self.job_progress_bar.setRange(0, total)
+        self.job_progress_bar.setValue(done)
+
+
+    def show_focus_cache_stats(self):
+        '''
+        Show the hits, misses and size of the focus curve cache once the DOF tab is built
+        '''
+        if self.focus_cache_label is not None:
+            self.focus_cache_label.setText(ala_camera_focus_cache.focus_curves.format_stats())
+
+
+    def show_inspected_camera(self):
+        '''
+        Show the lens settings of the selected camera and pick its values in the dropdowns
+        '''
+        values = self.inspector.refresh()
+        if not values:
+            self.inspector_label.setText("No camera selected")
+            return
+        self.inspector_label.setText(
+            f"{self.inspector.camera_name}: focal length {values['focalLength']:g} mm, locator scale {values['locatorScale']:g}, "
+            f"f/{values['fStop']:g}, focus distance {values['focusDistance']:g}, DOF {'on' if values['depthOfField'] else 'off'}")
+        for dropdown, attribute in ((self.focal_length_dropdown, 'focalLength'), (self.locator_scale_dropdown, 'locatorScale')):
+            #a value missing from the dropdown shows no item, activated is only emitted by the user
+            dropdown.setCurrentIndex(dropdown.findText(f"{values[attribute]:g}"))
+
+
+    # Ignore C0103 warning because Qt calls the camelCase event handler
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        '''
+        Follow the selected camera again when the window is shown after being closed
+        '''
+        if self.inspector_label is not None:
+            self.inspector.start()
+        super().showEvent(event)
+
+
+    # Ignore C0103 warning because Qt calls the camelCase event handler
+    def closeEvent(self, event):  # pylint: disable=invalid-name
+        '''
+        Cancel the running and queued jobs and remove the inspector callbacks when the window is closed,
+        a running profiler saves its trace and prints its summary
+        '''
+        self.job_runner.cancel_all()
+        self.inspector.stop()
+        self.inspector_timer.stop()
+        if ala_camera_profiler.active_profiler is not None:
+            print(ala_camera_profiler.disable().summary_table())
+        super().closeEvent(event)
 
-        #first Tab: create camera + set aspect ratio
-        first_tab = QWidget()
-        first_tab_layout = QVBoxLayout()
-        first_tab.setLayout(first_tab_layout)
 
+    def build_set_up_camera_tab(self, first_tab_layout):
+        '''
+        first Tab: create camera + set aspect ratio
+        '''
         #create camera section
-        create_camera_header = QLabel("PREVIS: Creates an AlexaLF camera")
-        header_font=QFont('Arial', 15)
-        header_font.setBold(True)
-        create_camera_header.setFont(header_font)
+        create_camera_header = QLabel("PREVIS: Creates a camera of the camera body below")
+        create_camera_header.setFont(self.header_font)
         first_tab_layout.addWidget(create_camera_header)
 
+        self.camera_body_dropdown = QComboBox()
+        self.camera_body_dropdown.addItems(ala_camera_operations.get_camera_bodies())
+        self.camera_body_dropdown.setCurrentText(ala_camera_presets.DEFAULT_CAMERA_BODY)
+        first_tab_layout.addWidget(self.camera_body_dropdown)
+
         create_camera_button = QPushButton("Create Camera")
         create_camera_button.clicked.connect(self.create_camera)
         first_tab_layout.addWidget(create_camera_button)
 
         #Adjust Aspect Ratio Section
         aspect_ratio_header = QLabel("Set Aspect Ratio in Dropdown Menu Below")
-        aspect_ratio_header.setFont(header_font)
+        aspect_ratio_header.setFont(self.header_font)
         first_tab_layout.addWidget(aspect_ratio_header)
 
         self.camera_dropdown = QComboBox()
-        self.camera_dropdown.addItems(aspect_ratios)
+        self.camera_dropdown.addItems(ala_camera_operations.get_aspect_ratios())
+        self.camera_dropdown.setCurrentText(ala_camera_presets.DEFAULT_DELIVERY_FORMAT)
         self.camera_dropdown.activated.connect(self.set_aspect_ratio)
         first_tab_layout.addWidget(self.camera_dropdown)
 
-        #Set AlexaLF section
-        set_alexalf_settings_header = QLabel("LAYOUT: Sets AlexaLF Settings")
-        set_alexalf_settings_header.setFont(header_font)
+        #Set camera body section
+        set_alexalf_settings_header = QLabel("LAYOUT: Sets Camera Body Settings of the Selected Cameras")
+        set_alexalf_settings_header.setFont(self.header_font)
         first_tab_layout.addWidget(set_alexalf_settings_header)
 
-        set_alexalf_settings_button = QPushButton("AlexaLF Settings")
+        self.camera_body_pattern_field = self.create_camera_pattern_field()
+        first_tab_layout.addWidget(self.camera_body_pattern_field)
+
+        set_alexalf_settings_button = QPushButton("Camera Body Settings")
         set_alexalf_settings_button.clicked.connect(self.alexa_camera)
         first_tab_layout.addWidget(set_alexalf_settings_button)
 
-        #Second Tab: adjust camera settings via option menus
-        second_tab = QWidget()
-        second_tab_layout = QVBoxLayout()
-        second_tab.setLayout(second_tab_layout)
+        #Delivery Formats Section
+        delivery_formats_header = QLabel("Delivery Formats of the Cameras Above, Rendered by the Batch")
+        delivery_formats_header.setFont(self.header_font)
+        first_tab_layout.addWidget(delivery_formats_header)
 
-        #Setup fonts for instructional text
-        instructions_font = QFont('Arial', 15)
+        delivery_formats_text = ' mayapy ala_camera_batch.py shots/*.mb --deliver render renders every camera in every format of its set'
+        delivery_formats_instructions = QLabel(delivery_formats_text)
+        delivery_formats_instructions.setFont(self.instructions_font)
+        first_tab_layout.addWidget(delivery_formats_instructions)
+
+        self.delivery_formats_list = QListWidget()
+        for format_name in ala_camera_operations.get_aspect_ratios():
+            format_item = QListWidgetItem(format_name, self.delivery_formats_list)
+            format_item.setFlags(format_item.flags() | Qt.ItemIsUserCheckable)
+            format_item.setCheckState(Qt.Checked if format_name == ala_camera_presets.DEFAULT_DELIVERY_FORMAT else Qt.Unchecked)
+        self.delivery_formats_list.setMaximumHeight(120)
+        first_tab_layout.addWidget(self.delivery_formats_list)
+
+        set_delivery_formats_button = QPushButton("Set Delivery Formats")
+        set_delivery_formats_button.clicked.connect(self.set_delivery_formats)
+        first_tab_layout.addWidget(set_delivery_formats_button)
+
+
+    def build_camera_settings_tab(self, second_tab_layout):
+        '''
+        Second Tab: adjust camera settings via option menus
+        '''
+        #Cameras Section
+        cameras_header = QLabel("Cameras: selected cameras or cameras matching a name pattern")
+        cameras_header.setFont(self.header_font)
+        second_tab_layout.addWidget(cameras_header)
+
+        self.camera_settings_pattern_field = self.create_camera_pattern_field()
+        second_tab_layout.addWidget(self.camera_settings_pattern_field)
+
+        #Selected Camera Section
+        inspector_header = QLabel("Selected Camera: current lens settings")
+        inspector_header.setFont(self.header_font)
+        second_tab_layout.addWidget(inspector_header)
+
+        self.inspector_label = QLabel("No camera selected")
+        self.inspector_label.setFont(self.instructions_font)
+        second_tab_layout.addWidget(self.inspector_label)
 
         #Set Focal Length Section
-        set_focal_length_header = QLabel("Set Focal Length of Selected Camera (mm)")
-        set_focal_length_header.setFont(header_font)
+        set_focal_length_header = QLabel("Set Focal Length of Selected Cameras (mm)")
+        set_focal_length_header.setFont(self.header_font)
         second_tab_layout.addWidget(set_focal_length_header)
 
-        set_focal_length_text = ' 1. Select your camera in the outliner'
+        set_focal_length_text = ' 1. Select your cameras in the outliner or type a name pattern above'
         set_focal_length_instructions_step_one = QLabel(set_focal_length_text)
         set_focal_length_text = ' 2. Select your focal length in the dropdown menu'
         set_focal_length_instructions_step_two = QLabel(set_focal_length_text)
-        set_focal_length_instructions_step_one.setFont(instructions_font)
-        set_focal_length_instructions_step_two.setFont(instructions_font)
+        set_focal_length_instructions_step_one.setFont(self.instructions_font)
+        set_focal_length_instructions_step_two.setFont(self.instructions_font)
         second_tab_layout.addWidget(set_focal_length_instructions_step_one)
         second_tab_layout.addWidget(set_focal_length_instructions_step_two)
 
+        self.lens_set_dropdown = QComboBox()
+        self.lens_set_dropdown.addItems(ala_camera_operations.get_lens_sets())
+        self.lens_set_dropdown.setCurrentText(ala_camera_presets.DEFAULT_LENS_SET)
+        self.lens_set_dropdown.activated.connect(self.set_lens_set)
+        second_tab_layout.addWidget(self.lens_set_dropdown)
+
         self.focal_length_dropdown = QComboBox()
-        self.focal_length_dropdown.addItems(focal_lengths)
+        self.focal_length_dropdown.addItems(ala_camera_operations.get_focal_lengths(self.lens_set_dropdown.currentText()))
         self.focal_length_dropdown.activated.connect(self.set_focal_length)
         second_tab_layout.addWidget(self.focal_length_dropdown)
 
         #Set Locator Scale Section
-        set_locator_scale_header = QLabel("Set Locator Scale of Selected Camera (mm)")
-        set_locator_scale_header.setFont(header_font)
+        set_locator_scale_header = QLabel("Set Locator Scale of Selected Cameras (mm)")
+        set_locator_scale_header.setFont(self.header_font)
         second_tab_layout.addWidget(set_locator_scale_header)
 
-        set_locator_scale_text = ' 1. Select your camera in the outliner'
+        set_locator_scale_text = ' 1. Select your cameras in the outliner or type a name pattern above'
         set_locator_scale_instructions_step_one = QLabel(set_locator_scale_text)
         set_locator_scale_text = ' 2. Select your locator scale in the dropdown menu'
         set_locator_scale_instructions_step_two = QLabel(set_locator_scale_text)
-        set_locator_scale_instructions_step_one.setFont(instructions_font)
-        set_locator_scale_instructions_step_two.setFont(instructions_font)
+        set_locator_scale_instructions_step_one.setFont(self.instructions_font)
+        set_locator_scale_instructions_step_two.setFont(self.instructions_font)
         second_tab_layout.addWidget(set_locator_scale_instructions_step_one)
         second_tab_layout.addWidget(set_locator_scale_instructions_step_two)
 
@@ -308,15 +414,99 @@ class CameraTool(QMainWindow):
         self.locator_scale_dropdown.addItems(locator_scales)
         self.locator_scale_dropdown.activated.connect(self.set_locator_scale)
         second_tab_layout.addWidget(self.locator_scale_dropdown)
+        #the dropdowns exist, the inspector can follow the selection
+        self.inspector.start()
+
+        #Zoom Lens Focus Breathing Section
+        zoom_lens_header = QLabel("Bake Zoom Lens Focus Breathing of Selected Cameras")
+        zoom_lens_header.setFont(self.header_font)
+        second_tab_layout.addWidget(zoom_lens_header)
+
+        zoom_lens_text = ' 1. Select your cameras in the outliner or type a name pattern above'
+        zoom_lens_instructions_step_one = QLabel(zoom_lens_text)
+        zoom_lens_text = ' 2. Pick the zoom lens, the focal length becomes the zoom position and is baked over the playback range'
+        zoom_lens_instructions_step_two = QLabel(zoom_lens_text)
+        zoom_lens_instructions_step_one.setFont(self.instructions_font)
+        zoom_lens_instructions_step_two.setFont(self.instructions_font)
+        second_tab_layout.addWidget(zoom_lens_instructions_step_one)
+        second_tab_layout.addWidget(zoom_lens_instructions_step_two)
+
+        self.zoom_lens_dropdown = QComboBox()
+        self.zoom_lens_dropdown.addItems(ala_camera_operations.get_zoom_lenses())
+        #no lens is picked up front, the shipped example lenses are placeholder data
+        self.zoom_lens_dropdown.setPlaceholderText("Zoom lens the shot was filmed with")
+        self.zoom_lens_dropdown.setCurrentIndex(-1)
+        second_tab_layout.addWidget(self.zoom_lens_dropdown)
+
+        bake_focus_breathing_button = QPushButton("Bake Focus Breathing")
+        bake_focus_breathing_button.clicked.connect(self.bake_focus_breathing)
+        second_tab_layout.addWidget(bake_focus_breathing_button)
+
+        #Frustum Visibility Section
+        visibility_header = QLabel("Frustum Visibility and Far Clip of Selected Cameras")
+        visibility_header.setFont(self.header_font)
+        second_tab_layout.addWidget(visibility_header)
+
+        visibility_text = ' 1. Select your cameras in the outliner or type a name pattern above'
+        visibility_instructions_step_one = QLabel(visibility_text)
+        visibility_text = ' 2. Every visible mesh is tested against the camera frustums over the playback range'
+        visibility_instructions_step_two = QLabel(visibility_text)
+        visibility_instructions_step_one.setFont(self.instructions_font)
+        visibility_instructions_step_two.setFont(self.instructions_font)
+        second_tab_layout.addWidget(visibility_instructions_step_one)
+        second_tab_layout.addWidget(visibility_instructions_step_two)
+
+        self.visibility_far_clip_checkbox = QCheckBox("Set the far clip plane just behind the farthest visible object")
+        second_tab_layout.addWidget(self.visibility_far_clip_checkbox)
+
+        analyze_visibility_button = QPushButton("Analyze Visibility")
+        analyze_visibility_button.clicked.connect(self.analyze_visibility)
+        second_tab_layout.addWidget(analyze_visibility_button)
+
+        #Import Lens Metadata Section
+        import_lens_header = QLabel("Import On-Set Lens Metadata")
+        import_lens_header.setFont(self.header_font)
+        second_tab_layout.addWidget(import_lens_header)
+
+        import_lens_text = ' 1. Select your camera in the outliner'
+        import_lens_instructions_step_one = QLabel(import_lens_text)
+        import_lens_text = ' 2. Pick a CSV or JSON lens metadata file, the first timecode lands on the playback start'
+        import_lens_instructions_step_two = QLabel(import_lens_text)
+        import_lens_instructions_step_one.setFont(self.instructions_font)
+        import_lens_instructions_step_two.setFont(self.instructions_font)
+        second_tab_layout.addWidget(import_lens_instructions_step_one)
+        second_tab_layout.addWidget(import_lens_instructions_step_two)
+
+        import_lens_button = QPushButton("Import Lens Metadata")
+        import_lens_button.clicked.connect(self.import_lens_metadata)
+        second_tab_layout.addWidget(import_lens_button)
+
+
+    def create_camera_pattern_field(self):
+        '''
+        Text field for a camera name pattern, empty means the selected cameras
+        '''
+        pattern_field = QLineEdit()
+        pattern_field.setPlaceholderText("Camera name pattern, e.g. shot*_cam (empty: selected cameras)")
+        pattern_field.setFont(self.instructions_font)
+        return pattern_field
+
 
-        #Third tab: DOF options
-        third_tab = QWidget()
-        third_tab_layout = QVBoxLayout()
-        third_tab.setLayout(third_tab_layout)
+    def get_target_camera_shapes(self, pattern_field):
+        '''
+        Shapes of the cameras matching the pattern field, or of every selected camera
+        '''
+        cameras = ala_camera_operations.get_target_cameras(pattern_field.text().strip() or None)
+        return [camera_shape for _, camera_shape in cameras]
 
+
+    def build_depth_of_field_tab(self, third_tab_layout):
+        '''
+        Third tab: DOF options
+        '''
         #Set Up DOF section
         set_dof_header = QLabel("Depth of Field: Set DOF Rig")
-        set_dof_header.setFont(header_font)
+        set_dof_header.setFont(self.header_font)
         third_tab_layout.addWidget(set_dof_header)
 
         set_dof_instructions_text = ' 1. Select your camera in the outliner '
@@ -331,11 +521,11 @@ class CameraTool(QMainWindow):
         set_dof_tip_font.setItalic(True)
         set_dof_tip.setFont(set_dof_tip_font)
 
-        set_dof_note_text = "NOTE:\n1. if the focused object's coordinates is at the origin, "
+        set_dof_note_text = "NOTE:\n1. Each camera gets one alaFocusDistance node measuring "
         set_dof_note_step_1_pt_1 = QLabel(set_dof_note_text)
-        set_dof_note_text = "the aim locator won't spawn but DOF will still be applied as usual"
+        set_dof_note_text = "the distance between the camera and the object on every frame"
         set_dof_note_step_1_pt_2 = QLabel(set_dof_note_text)
-        set_dof_note_text = "2. For the f stop option, distance will be clamped to 64 units"
+        set_dof_note_text = "2. For the f stop option, f stop will be clamped to 64"
         set_dof_note_step_2 = QLabel(set_dof_note_text)
         set_dof_note_font = QFont()
         set_dof_note_font.setBold(True)
@@ -350,6 +540,10 @@ class CameraTool(QMainWindow):
         third_tab_layout.addWidget(set_dof_note_step_1_pt_2)
         third_tab_layout.addWidget(set_dof_note_step_2)
 
+        #used by the set, batch and bake buttons
+        self.dof_surface_checkbox = QCheckBox("Focus on the nearest surface point instead of the pivot")
+        third_tab_layout.addWidget(self.dof_surface_checkbox)
+
         set_dof_with_focal_length_button = QPushButton("Enable DOF Focal Length")
         set_dof_with_focal_length_button.clicked.connect(self.add_depth_of_field)
         third_tab_layout.addWidget(set_dof_with_focal_length_button)
@@ -358,28 +552,108 @@ class CameraTool(QMainWindow):
         set_dof_with_f_stop_button.clicked.connect(self.add_depth_of_field_fstop)
         third_tab_layout.addWidget(set_dof_with_f_stop_button)
 
+        #Batch DOF section
+        batch_dof_header = QLabel("Depth of Field: Batch DOF Rig")
+        batch_dof_header.setFont(self.header_font)
+        third_tab_layout.addWidget(batch_dof_header)
+
+        batch_dof_text = ' 1. Select camera, object, camera, object... in the outliner'
+        batch_dof_instructions_step_one = QLabel(batch_dof_text)
+        batch_dof_text = ' 2. Every camera focuses on the object selected after it'
+        batch_dof_instructions_step_two = QLabel(batch_dof_text)
+        third_tab_layout.addWidget(batch_dof_instructions_step_one)
+        third_tab_layout.addWidget(batch_dof_instructions_step_two)
+
+        batch_dof_with_focal_length_button = QPushButton("Batch DOF Focal Length")
+        batch_dof_with_focal_length_button.clicked.connect(self.batch_depth_of_field)
+        third_tab_layout.addWidget(batch_dof_with_focal_length_button)
+
+        batch_dof_with_f_stop_button = QPushButton("Batch DOF f Stop")
+        batch_dof_with_f_stop_button.clicked.connect(self.batch_depth_of_field_fstop)
+        third_tab_layout.addWidget(batch_dof_with_f_stop_button)
+
+        #Bake DOF section
+        bake_dof_header = QLabel("Depth of Field: Bake DOF")
+        bake_dof_header.setFont(self.header_font)
+        third_tab_layout.addWidget(bake_dof_header)
+
+        bake_dof_text = ' 1. Select your camera (and object to focus on) in the outliner'
+        bake_dof_instructions_step_one = QLabel(bake_dof_text)
+        bake_dof_text = ' 2. Focus distance and f stop are baked over the playback range'
+        bake_dof_instructions_step_two = QLabel(bake_dof_text)
+        bake_dof_tip = QLabel('Without an object selected, the object of the DOF rig is used')
+        bake_dof_tip.setFont(set_dof_tip_font)
+        third_tab_layout.addWidget(bake_dof_instructions_step_one)
+        third_tab_layout.addWidget(bake_dof_instructions_step_two)
+        third_tab_layout.addWidget(bake_dof_tip)
+
+        self.bake_dof_remove_rig_checkbox = QCheckBox("Remove DOF rig after baking")
+        self.bake_dof_remove_rig_checkbox.setChecked(True)
+        third_tab_layout.addWidget(self.bake_dof_remove_rig_checkbox)
+
+        bake_dof_button = QPushButton("Bake DOF")
+        bake_dof_button.clicked.connect(self.bake_depth_of_field)
+        third_tab_layout.addWidget(bake_dof_button)
+
+        #re-baking an unchanged camera and target reuses the cached curves
+        self.focus_cache_label = QLabel(ala_camera_focus_cache.focus_curves.format_stats())
+        third_tab_layout.addWidget(self.focus_cache_label)
+        clear_focus_cache_button = QPushButton("Clear Focus Cache")
+        clear_focus_cache_button.clicked.connect(self.clear_focus_cache)
+        third_tab_layout.addWidget(clear_focus_cache_button)
+
+        #Autofocus section
+        autofocus_header = QLabel("Depth of Field: Bake Autofocus")
+        autofocus_header.setFont(self.header_font)
+        third_tab_layout.addWidget(autofocus_header)
+
+        autofocus_text = ' 1. Select your camera in the outliner'
+        autofocus_instructions_step_one = QLabel(autofocus_text)
+        autofocus_text = ' 2. Focus follows the visible mesh under the screen point over the playback range'
+        autofocus_instructions_step_two = QLabel(autofocus_text)
+        autofocus_tip = QLabel('Screen point 0, 0 is the frame center, -1/1 are the film back edges')
+        autofocus_tip.setFont(set_dof_tip_font)
+        third_tab_layout.addWidget(autofocus_instructions_step_one)
+        third_tab_layout.addWidget(autofocus_instructions_step_two)
+        third_tab_layout.addWidget(autofocus_tip)
+
+        autofocus_form = QFormLayout()
+        self.autofocus_screen_x_field = QDoubleSpinBox()
+        self.autofocus_screen_x_field.setRange(-1.0, 1.0)
+        self.autofocus_screen_x_field.setSingleStep(0.1)
+        autofocus_form.addRow("Screen point X", self.autofocus_screen_x_field)
+        self.autofocus_screen_y_field = QDoubleSpinBox()
+        self.autofocus_screen_y_field.setRange(-1.0, 1.0)
+        self.autofocus_screen_y_field.setSingleStep(0.1)
+        autofocus_form.addRow("Screen point Y", self.autofocus_screen_y_field)
+        self.autofocus_smoothing_field = QSpinBox()
+        self.autofocus_smoothing_field.setRange(0, 100)
+        autofocus_form.addRow("Smoothing (frames)", self.autofocus_smoothing_field)
+        third_tab_layout.addLayout(autofocus_form)
+
+        autofocus_button = QPushButton("Bake Autofocus")
+        autofocus_button.clicked.connect(self.bake_autofocus)
+        third_tab_layout.addWidget(autofocus_button)
+
         #Diable DOF Section
         disable_dof_header = QLabel("Depth of Field: Disable DOF Rig")
-        disable_dof_header.setFont(header_font)
+        disable_dof_header.setFont(self.header_font)
         third_tab_layout.addWidget(disable_dof_header)
 
         disable_dof_text = ' 1. Select your camera in the outliner '
         disable_dof_instructions_step_one = QLabel(disable_dof_text)
-        disable_dof_text = '\n 2. Select your distance dimension on in the outliner'
+        disable_dof_text = '\n 2. Disable DOF by clicking on the button below'
         disable_dof_instructions_step_two = QLabel(disable_dof_text)
-        disable_dof_text = '\n 3. Disable DOF by clicking on the button below'
-        disable_dof_instructions_step_three = QLabel(disable_dof_text)
-        disable_dof_tip = QLabel('Make sure both camera + distance dimension is selected')
+        disable_dof_tip = QLabel('Make sure the camera is selected')
         disable_dof_tip_font = QFont('Arial', 15)
         disable_dof_tip_font.setItalic(True)
         disable_dof_tip.setFont(set_dof_tip_font)
-        disable_dof_note = QLabel("NOTE: You need to delete locators manually")
+        disable_dof_note = QLabel("NOTE: Locators of older distance dimension rigs are deleted as well")
         disable_dof_note_font = QFont('Arial', 15)
         disable_dof_note_font.setBold(True)
         disable_dof_note.setFont(set_dof_note_font)
         third_tab_layout.addWidget(disable_dof_instructions_step_one)
         third_tab_layout.addWidget(disable_dof_instructions_step_two)
-        third_tab_layout.addWidget(disable_dof_instructions_step_three)
         third_tab_layout.addWidget(disable_dof_tip)
         third_tab_layout.addWidget(disable_dof_note)
 
@@ -387,22 +661,78 @@ class CameraTool(QMainWindow):
         disable_dof_button.clicked.connect(self.disable_depth_of_field)
         third_tab_layout.addWidget(disable_dof_button)
 
-        #Fourth tab: Turntable camera animation
-        fourth_tab = QWidget()
-        fourth_tab_layout = QVBoxLayout()
-        fourth_tab.setLayout(fourth_tab_layout)
+        #Scene DOF Rigs section
+        scene_rigs_header = QLabel("Depth of Field: All DOF Rigs in the Scene")
+        scene_rigs_header.setFont(self.header_font)
+        third_tab_layout.addWidget(scene_rigs_header)
+
+        scene_rigs_text = ' No selection needed, the rigs are listed in the Script Editor'
+        scene_rigs_instructions = QLabel(scene_rigs_text)
+        third_tab_layout.addWidget(scene_rigs_instructions)
+
+        for label, slot in (("List DOF Rigs", self.list_dof_rigs),
+                            ("Enable All DOF Rigs", self.enable_all_dof_rigs),
+                            ("Disable All DOF Rigs", self.disable_all_dof_rigs),
+                            ("Clean Up All DOF Rigs", self.clean_up_dof_rigs)):
+            scene_rigs_button = QPushButton(label)
+            scene_rigs_button.clicked.connect(slot)
+            third_tab_layout.addWidget(scene_rigs_button)
+
+
+    def build_camera_animation_tab(self, fourth_tab_layout):
+        '''
+        Fourth tab: Turntable camera animation
+        '''
+        #Baked Turntable section
+        bake_turntable_header = QLabel("Turntable: Bake orbit keys")
+        bake_turntable_header.setFont(self.header_font)
+        fourth_tab_layout.addWidget(bake_turntable_header)
+
+        bake_turntable_text = ' 1. Select your objects, or camera/object pairs, in the outliner \n'
+        bake_turntable_instructions_step_one = QLabel(bake_turntable_text)
+        bake_turntable_text = ' 2. Click on the button below to bake a turntable camera for every object'
+        bake_turntable_instructions_step_two = QLabel(bake_turntable_text)
+        bake_turntable_instructions_step_one.setFont(self.instructions_font)
+        bake_turntable_instructions_step_two.setFont(self.instructions_font)
+        fourth_tab_layout.addWidget(bake_turntable_instructions_step_one)
+        fourth_tab_layout.addWidget(bake_turntable_instructions_step_two)
+
+        turntable_form = QFormLayout()
+        self.turntable_radius_field = QDoubleSpinBox()
+        self.turntable_radius_field.setRange(0.1, 1000000.0)
+        self.turntable_radius_field.setValue(ala_camera_turntable.DEFAULT_RADIUS)
+        turntable_form.addRow("Radius", self.turntable_radius_field)
+        self.turntable_elevation_field = QDoubleSpinBox()
+        self.turntable_elevation_field.setRange(-89.0, 89.0)
+        turntable_form.addRow("Elevation (degrees)", self.turntable_elevation_field)
+        self.turntable_frames_field = QSpinBox()
+        self.turntable_frames_field.setRange(2, 100000)
+        self.turntable_frames_field.setValue(ala_camera_turntable.DEFAULT_FRAME_COUNT)
+        turntable_form.addRow("Frames", self.turntable_frames_field)
+        self.turntable_orbits_field = QDoubleSpinBox()
+        self.turntable_orbits_field.setRange(0.01, 100.0)
+        self.turntable_orbits_field.setValue(1.0)
+        turntable_form.addRow("Orbits", self.turntable_orbits_field)
+        fourth_tab_layout.addLayout(turntable_form)
+
+        self.turntable_follow_checkbox = QCheckBox("Follow animated objects")
+        fourth_tab_layout.addWidget(self.turntable_follow_checkbox)
+
+        bake_turntable_button = QPushButton("Bake Turntable")
+        bake_turntable_button.clicked.connect(self.bake_turntable)
+        fourth_tab_layout.addWidget(bake_turntable_button)
 
         #Set Up Curve section
         set_up_curve_header = QLabel("Turntable circle: Set circular curve")
-        set_up_curve_header.setFont(header_font)
+        set_up_curve_header.setFont(self.header_font)
         fourth_tab_layout.addWidget(set_up_curve_header)
 
         set_up_curve_text = ' 1. Select your object in the outliner \n'
         set_up_curve_instructions_step_one = QLabel(set_up_curve_text)
         set_up_curve_text = ' 2. Click on the button below to create the circle'
         set_up_curve_instructions_step_two = QLabel(set_up_curve_text)
-        set_up_curve_instructions_step_one.setFont(instructions_font)
-        set_up_curve_instructions_step_two.setFont(instructions_font)
+        set_up_curve_instructions_step_one.setFont(self.instructions_font)
+        set_up_curve_instructions_step_two.setFont(self.instructions_font)
         fourth_tab_layout.addWidget(set_up_curve_instructions_step_one)
         fourth_tab_layout.addWidget(set_up_curve_instructions_step_two)
 
@@ -412,7 +742,7 @@ class CameraTool(QMainWindow):
 
         #Set Up Animation section
         set_up_anim_header = QLabel("Turntable animation: Setup Camera Animation")
-        set_up_anim_header.setFont(header_font)
+        set_up_anim_header.setFont(self.header_font)
         fourth_tab_layout.addWidget(set_up_anim_header)
 
         set_up_anim_text = ' 1. Select your Camera on the outliner \n '
@@ -421,9 +751,9 @@ class CameraTool(QMainWindow):
         set_up_anim_instruct_step_two = QLabel(set_up_anim_text)
         set_up_anim_text = ' 3. Click on the Animate Camera button to setup the animation'
         set_up_anim_instruct_step_three = QLabel(set_up_anim_text)
-        set_up_anim_instruct_step_one.setFont(instructions_font)
-        set_up_anim_instruct_step_two.setFont(instructions_font)
-        set_up_anim_instruct_step_three.setFont(instructions_font)
+        set_up_anim_instruct_step_one.setFont(self.instructions_font)
+        set_up_anim_instruct_step_two.setFont(self.instructions_font)
+        set_up_anim_instruct_step_three.setFont(self.instructions_font)
         set_up_animation_tip = QLabel('Make sure both camera + curve is selected')
         set_up_animation_tip_font = QFont('Arial', 15)
         set_up_animation_tip_font.setItalic(True)
@@ -437,109 +767,298 @@ class CameraTool(QMainWindow):
         set_up_animation_button.clicked.connect(self.animate_camera)
         fourth_tab_layout.addWidget(set_up_animation_button)
 
-        #Add all tabs
-        tab.addTab(first_tab, "Set Up Camera")
-        tab.addTab(second_tab, "Camera Settings")
-        tab.addTab(third_tab, "Depth of Field Options")
-        tab.addTab(fourth_tab, "Camera Animation")
-
-        self.setCentralWidget(tab)
-        self.show()
-
 
+    @profile_action
     def create_camera(self):
         '''
-        Creates an AlexaLF camera and sets the film back. 
-        Sets the Far Clip PLane to 10,000. Also setting the render settings to HD.
+        Creates a camera of the chosen camera body (AlexaLF by default),
+        setting the film back, Far Clip PLane and render settings of the body.
         '''
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.camera(n="ShotCamera",horizontalFilmAperture=1.247,verticalFilmAperture=0.702,farClipPlane=100000)
-        set_default_settings()
+        ala_camera_operations.create_camera(self.camera_body_dropdown.currentText())
 
 
+    @profile_action
     def set_aspect_ratio(self):
         '''
         #adjust aspect ratio 
         '''
         menu_value = self.camera_dropdown.currentText()
-        if menu_value == "4:3":
-            set_four_by_three_settings()
-        elif menu_value == "16:9":
-            set_default_settings()
-        elif menu_value == "16:10":
-            set_sixteen_by_ten_settings()
-        elif menu_value == "3:2":
-            set_three_by_two_settings()
+        ala_camera_operations.set_aspect_ratio(menu_value)
 
 
+    @profile_action
+    @report_selection_errors
     def alexa_camera(self):
         '''
-        Sets the camera Aperature made by the pipeline to match an AlexaLF camera.
-        And sets the scene Render Settings to HD.
+        Sets the camera Aperature of every target camera to match the chosen camera body.
+        And sets the scene Render Settings to the delivery format of the body.
+        '''
+        camera_shapes = self.get_target_camera_shapes(self.camera_body_pattern_field)
+        report = ala_camera_operations.apply_camera_body(camera_shapes, self.camera_body_dropdown.currentText())
+        print(format_camera_report(report))
+
+
+    @profile_action
+    @report_selection_errors
+    def set_delivery_formats(self):
+        '''
+        Store the checked delivery formats on every target camera
+        '''
+        format_items = [self.delivery_formats_list.item(index) for index in range(self.delivery_formats_list.count())]
+        format_names = [item.text() for item in format_items if item.checkState() == Qt.Checked]
+        camera_shapes = self.get_target_camera_shapes(self.camera_body_pattern_field)
+        for camera_shape, names in ala_camera_delivery.set_delivery_formats(format_names, camera_shapes).items():
+            print(f"{camera_shape.rsplit('|', 1)[-1]} delivery formats: {', '.join(names) or 'none'}")
+
+
+    @profile_action
+    def set_lens_set(self):
+        '''
+        Fill the focal length dropdown with the focal lengths of the chosen lens set
         '''
-        cmds.setAttr(get_selected_cam_shape()+".horizontalFilmAperture", 1.247)
-        cmds.setAttr(get_selected_cam_shape()+".verticalFilmAperture", 0.702)
-        cmds.setAttr(get_selected_cam_shape()+".farClipPlane", 100000)
-        set_default_settings()
+        self.focal_length_dropdown.clear()
+        self.focal_length_dropdown.addItems(ala_camera_operations.get_focal_lengths(self.lens_set_dropdown.currentText()))
+        #pick the focal length of the selected camera in the new lens set
+        self.inspector_timer.start()
 
 
+    @profile_action
+    @report_selection_errors
     def set_focal_length(self):
         '''
-        Set the focal length of the camera via the confirm focal length button
+        Set the focal length of every target camera via the focal length dropdown
         '''
         menu_value = self.focal_length_dropdown.currentText()
-        adjust_focal_length(float(menu_value))
+        camera_shapes = self.get_target_camera_shapes(self.camera_settings_pattern_field)
+        print(format_camera_report(adjust_focal_length(float(menu_value), camera_shapes)))
 
 
+    @profile_action
+    @report_selection_errors
     def set_locator_scale(self):
         '''
-        Set the locator scale of the camera via the confirm locator scale button  
+        Set the locator scale of every target camera via the locator scale dropdown
         '''
         menu_value = self.locator_scale_dropdown.currentText()
-        adjust_locator_scale(float(menu_value))
+        camera_shapes = self.get_target_camera_shapes(self.camera_settings_pattern_field)
+        print(format_camera_report(adjust_locator_scale(float(menu_value), camera_shapes)))
+
+
+    @profile_action
+    @report_selection_errors
+    def import_lens_metadata(self):
+        '''
+        Key focal length, focus distance and f stop of the selected camera from a lens metadata file
+        '''
+        camera_shape = SelectionSnapshot().require_camera()[1]
+        path, _ = QFileDialog.getOpenFileName(self, "Import Lens Metadata", "", "Lens metadata (*.csv *.json *.jsonl);;All files (*)")
+        if not path:
+            return
 
+        def import_and_report():
+            summary = yield from ala_camera_lens_import.import_lens_metadata_job(path, camera_shape)
+            print(ala_camera_lens_import.format_import_report(path, summary))
+
+        self.job_runner.submit("Import Lens Metadata", import_and_report())
+
+
+    @profile_action
+    @report_selection_errors
+    def bake_focus_breathing(self):
+        '''
+        Bake the effective focal length of the chosen zoom lens on every target camera
+        '''
+        lens_name = self.zoom_lens_dropdown.currentText()
+        if not lens_name:
+            raise SelectionError("No zoom lens: pick the lens the shot was filmed with")
+        for camera_shape in self.get_target_camera_shapes(self.camera_settings_pattern_field):
 
+            def bake_and_report(camera_shape=camera_shape):
+                summary = yield from ala_camera_zoom.bake_focus_breathing_job(camera_shape, lens_name)
+                print(ala_camera_zoom.format_breathing_report(camera_shape, summary))
+
+            self.job_runner.submit("Bake Focus Breathing", bake_and_report())
+
+
+    @profile_action
+    @report_selection_errors
+    def analyze_visibility(self):
+        '''
+        Report what every target camera sees over the playback range and its suggested far clip plane
+        '''
+        cameras = ala_camera_operations.get_target_cameras(self.camera_settings_pattern_field.text().strip() or None)
+        frames = ala_camera_bake.get_frames(cmds.playbackOptions(q=True, minTime=True), cmds.playbackOptions(q=True, maxTime=True))
+        apply_far_clip = self.visibility_far_clip_checkbox.isChecked()
+
+        def analyze_and_report():
+            visibility = yield from ala_camera_visibility.compute_visibility_job(cameras, frames)
+            print(ala_camera_visibility.format_visibility_report(visibility))
+            if apply_far_clip:
+                print(format_camera_report(ala_camera_visibility.apply_far_clips(cameras, visibility)))
+
+        self.job_runner.submit("Analyze Visibility", analyze_and_report())
+
+
+    @profile_action
+    @report_selection_errors
     def add_depth_of_field(self):
         '''
         Add DOF rig via Focal length   
         '''
-        shot_camera_shape, dist_dimension_shape = basic_depth_of_field_settings()
-        cmds.connectAttr(dist_dimension_shape + '.distance', shot_camera_shape+'.focusDistance')
-        #do the same for arnold render view
-        cmds.setAttr(shot_camera_shape + ".aiEnableDOF", True)
-        cmds.setAttr(shot_camera_shape + ".aiApertureSize", 2.8)
-        cmds.connectAttr(dist_dimension_shape + '.distance', shot_camera_shape+'.aiFocusDistance')
+        self.job_runner.submit("Add DOF", batch_depth_of_field_job([basic_depth_of_field_settings()], surface=self.dof_surface_checkbox.isChecked()))
 
 
+    @profile_action
+    @report_selection_errors
     def add_depth_of_field_fstop(self):
         '''
-        Connect DOF via f stop, distance will be clamped to 64 units if it goes above
+        Connect DOF via f stop, f stop will be clamped to 64 if the distance goes above
+        '''
+        self.job_runner.submit("Add DOF f Stop", batch_depth_of_field_job([basic_depth_of_field_settings()], use_f_stop=True,
+                                                                          surface=self.dof_surface_checkbox.isChecked()))
+
+
+    @profile_action
+    @report_selection_errors
+    def batch_depth_of_field(self):
+        '''
+        Add DOF rig via Focal length to every selected camera/object pair
+        '''
+        self.job_runner.submit("Batch DOF", batch_depth_of_field_job(pair_cameras_with_targets(SelectionSnapshot()),
+                                                                     surface=self.dof_surface_checkbox.isChecked()))
+
+
+    @profile_action
+    @report_selection_errors
+    def batch_depth_of_field_fstop(self):
+        '''
+        Add DOF rig via f stop to every selected camera/object pair
+        '''
+        self.job_runner.submit("Batch DOF f Stop", batch_depth_of_field_job(pair_cameras_with_targets(SelectionSnapshot()), use_f_stop=True,
+                                                                            surface=self.dof_surface_checkbox.isChecked()))
+
+
+    @profile_action
+    @report_selection_errors
+    def bake_depth_of_field(self):
+        '''
+        Bake the focus distance and f stop of the selected camera over the playback range
+        '''
+        snapshot = SelectionSnapshot()
+        camera_transform, camera_shape = snapshot.require_camera()
+        object_to_focus = snapshot.focus_targets[0] if snapshot.focus_targets else get_focus_target(camera_shape)
+        if object_to_focus is None:
+            raise SelectionError("No object to focus on: select an object or add a DOF rig first")
+        rig_nodes = ()
+        if self.bake_dof_remove_rig_checkbox.isChecked():
+            rig_nodes = [node for rig in ala_camera_rigs.get_camera_rigs([camera_shape]) for node in rig.nodes]
+        start_frame = cmds.playbackOptions(q=True, minTime=True)
+        end_frame = cmds.playbackOptions(q=True, maxTime=True)
+        self.job_runner.submit("Bake DOF", ala_camera_bake.bake_depth_of_field_job(
+            camera_transform, object_to_focus, start_frame, end_frame, rig_nodes, surface=self.dof_surface_checkbox.isChecked()))
+
+
+    @profile_action
+    def clear_focus_cache(self):
+        '''
+        Forget every cached focus curve, the next bakes sample the scene again
         '''
-        shot_camera_shape, dist_dimension_shape = basic_depth_of_field_settings()
-        cmds.connectAttr(dist_dimension_shape + '.distance', shot_camera_shape+'.fStop')
+        ala_camera_focus_cache.focus_curves.clear()
+        self.show_focus_cache_stats()
 
 
+    @profile_action
+    @report_selection_errors
+    def bake_autofocus(self):
+        '''
+        Bake the focus distance of the selected camera to the mesh under the screen point
+        over the playback range, the DOF rig is removed with the Bake DOF checkbox
+        '''
+        camera_transform, camera_shape = SelectionSnapshot().require_camera()
+        rig_nodes = ()
+        if self.bake_dof_remove_rig_checkbox.isChecked():
+            rig_nodes = [node for rig in ala_camera_rigs.get_camera_rigs([camera_shape]) for node in rig.nodes]
+        self.job_runner.submit("Bake Autofocus", ala_camera_autofocus.bake_autofocus_job(
+            camera_transform,
+            cmds.playbackOptions(q=True, minTime=True),
+            cmds.playbackOptions(q=True, maxTime=True),
+            rig_nodes,
+            screen_point=(self.autofocus_screen_x_field.value(), self.autofocus_screen_y_field.value()),
+            smoothing=self.autofocus_smoothing_field.value()))
+
+
+    @profile_action
+    @report_selection_errors
     def disable_depth_of_field(self):
         '''
         Disable Depth of Field Rig of camera (focal distance + fStop)
         '''
-        camera_shape = get_selected_cam_shape()
-        dist_dimension_shape = get_object_to_focus()
-        cmds.delete(dist_dimension_shape)
-        cmds.setAttr(camera_shape+".depthOfField", False)
-        cmds.setAttr(camera_shape + ".aiEnableDOF", False)
+        ala_camera_operations.disable_depth_of_field(SelectionSnapshot().require_camera()[1])
+
+    @profile_action
+    def list_dof_rigs(self):
+        '''
+        Print every DOF rig of the scene
+        '''
+        print(ala_camera_rigs.format_rig_report(ala_camera_rigs.list_rigs()))
+
+    @profile_action
+    def enable_all_dof_rigs(self):
+        '''
+        Switch DOF on for the camera of every rig in the scene
+        '''
+        print(f"Enabled {ala_camera_rigs.set_rigs_enabled(ala_camera_rigs.list_rigs(), True)} DOF rigs")
+
+    @profile_action
+    def disable_all_dof_rigs(self):
+        '''
+        Switch DOF off for the camera of every rig in the scene, the rigs are kept
+        '''
+        print(f"Disabled {ala_camera_rigs.set_rigs_enabled(ala_camera_rigs.list_rigs(), False)} DOF rigs")
+
+    @profile_action
+    def clean_up_dof_rigs(self):
+        '''
+        Delete every DOF rig in the scene, their locators and orphaned rig nodes included
+        '''
+        print(f"Deleted {ala_camera_rigs.clean_up_rigs()} DOF rigs")
 
+    @profile_action
+    @report_selection_errors
+    def bake_turntable(self):
+        '''
+        Bake an orbit around every selected object starting at the playback start,
+        selected cameras orbit the object selected right after them
+        '''
+        snapshot = SelectionSnapshot()
+        snapshot.require_object()
+        cameras = None
+        if snapshot.camera_transforms:
+            pairs = pair_cameras_with_targets(snapshot)
+            if not pairs:
+                raise SelectionError("No object to orbit: select an object after every camera")
+            cameras, objects = (list(nodes) for nodes in zip(*pairs))
+        else:
+            objects = [transform for transform, _, _ in snapshot.entries]
+        self.job_runner.submit("Bake Turntable", ala_camera_turntable.bake_turntables_job(
+            objects, cameras,
+            radius=self.turntable_radius_field.value(),
+            elevation=self.turntable_elevation_field.value(),
+            frame_count=self.turntable_frames_field.value(),
+            orbits=self.turntable_orbits_field.value(),
+            start_frame=cmds.playbackOptions(q=True, minTime=True),
+            follow_animation=self.turntable_follow_checkbox.isChecked()))
+
+    @profile_action
+    @report_selection_errors
     def create_curve(self):
         '''
         Create circular turntable curve
         '''
-        obj = get_obj()
-        obj_x = cmds.getAttr(obj + '.translateX')
-        obj_y = cmds.getAttr(obj + '.translateY')
-        obj_z = cmds.getAttr(obj + '.translateZ')
-        turntable_circle = cmds.circle(nr=(0, 0, 1), c=(obj_x, obj_y, obj_z), r=1000)
-        cmds.setAttr(turntable_circle[0] + '.rotateX', -90)
+        ala_camera_operations.create_turntable_curve(SelectionSnapshot().require_object())
 
+    @profile_action
+    @report_selection_errors
     def animate_camera(self):
         '''
         - Creates turntable animation for moving the camera
@@ -547,29 +1066,8 @@ class CameraTool(QMainWindow):
         both tangent types are spline to use a non-linear interpolation
         for a smoother animation for camera
         '''
-        cam = get_selected_cam_transform()
-        curve = get_object_to_focus()
-        cmds.pathAnimation(curve,cam,stu = 0,etu = 180,follow = True,fractionMode = True)
-        cmds.setAttr(cam + '.rotateX', 0)
-        cmds.setAttr(cam + '.rotateY', 180)
-
-        cmds.currentTime(0)
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam,attribute = 'rotateX',value = 0,inTangentType="spline",outTangentType="spline")
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam,attribute = 'rotateY',value = -180,inTangentType="spline",outTangentType="spline")
-        cmds.currentTime(45)
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam,attribute = 'rotateY',value = -135,inTangentType="spline",outTangentType="spline")
-        cmds.currentTime(90)
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam,attribute = 'rotateY',value = 0,inTangentType="spline",outTangentType="spline")
-        cmds.currentTime(135)
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam,attribute = 'rotateY',value = 135,inTangentType="spline",outTangentType="spline")
-        cmds.currentTime(180)
-        # Ignore C0301 warning because we can't change the name of arguments from Maya API
-        cmds.setKeyframe(cam, attribute = 'rotateY',value = 180,inTangentType="spline",outTangentType="spline")
+        snapshot = SelectionSnapshot()
+        ala_camera_operations.animate_camera(snapshot.require_camera()[0], snapshot.require_curve())
 
 if __name__ == '__main__':
-    tab_window = CameraTool()
+    tab_window = show_camera_tool()
@@ -0,0 +1,145 @@
+'''
+ala_camera_turntable.py
+Analytic turntables without circle curves or motion paths.
+Camera positions and aim rotations of every orbit are computed for all
+frames at once with NumPy and written as baked keys, so one call can
+build the turntables of a whole asset library in a single undo step.
+'''
+import numpy as np
+import ala_camera_bake
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+import ala_camera_operations
+import ala_camera_presets
+
+DEFAULT_RADIUS = 1000.0
+DEFAULT_FRAME_COUNT = 180
+
+# Cameras written per transaction when turntables are baked as a background job
+BATCH_SIZE = 25
+
+TRANSLATE_ATTRIBUTES = ('translateX', 'translateY', 'translateZ')
+# rotateZ stays 0, the camera never rolls
+ROTATE_ATTRIBUTES = ('rotateX', 'rotateY')
+# The aim rotations are only right for the xyz rotate order
+ROTATE_ORDER_XYZ = 0
+
+
+def orbit_angles(frame_count, orbits=1.0, start_angle=0.0):
+    '''
+    Angle around the Y axis in radians on every frame.
+    The frame after the last one lands back on the first, so the turntable loops.
+    '''
+    return np.radians(start_angle) + 2.0 * np.pi * orbits * np.arange(frame_count) / frame_count
+
+
+# Ignore R0913/R0917 warnings because each orbit setting is a plain number with a default
+def compute_orbits(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        centers, radius=DEFAULT_RADIUS, elevation=0.0, frame_count=DEFAULT_FRAME_COUNT, orbits=1.0, start_angle=0.0):
+    '''
+    Camera translate and rotate of every frame of orbits around many centers.
+    centers is (objects, 3) for still objects or (objects, frames, 3) to follow
+    animated ones, radius and elevation (degrees above the horizon) are
+    scalars or one value per object.
+    Returns two (objects, frames, 3) arrays, rotations are in degrees.
+    '''
+    centers = np.asarray(centers, dtype=np.float64)
+    if centers.ndim == 2:
+        centers = centers[:, np.newaxis, :]
+    object_count = centers.shape[0]
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (object_count,))[:, np.newaxis]
+    elevation = np.radians(np.broadcast_to(np.asarray(elevation, dtype=np.float64), (object_count,)))[:, np.newaxis]
+    angles = orbit_angles(frame_count, orbits, start_angle)[np.newaxis, :]
+    shape = (object_count, frame_count)
+
+    #a camera at +Z looks down -Z at the center, turning it around Y keeps it aimed there
+    horizontal_radius = radius * np.cos(elevation)
+    offsets = np.stack([
+        horizontal_radius * np.sin(angles),
+        np.broadcast_to(radius * np.sin(elevation), shape),
+        horizontal_radius * np.cos(angles),
+    ], axis=-1)
+    #pitch down by the elevation first, then turn around Y (xyz rotate order)
+    rotations = np.stack([
+        np.broadcast_to(-np.degrees(elevation), shape),
+        np.broadcast_to(np.degrees(angles), shape),
+        np.zeros(shape),
+    ], axis=-1)
+    return centers + offsets, rotations
+
+
+def get_orbit_centers(objects, frames, follow_animation=False):
+    '''
+    World positions of the objects, sampled on every frame when they are animated
+    '''
+    if follow_animation:
+        return ala_camera_bake.sample_world_positions(objects, frames)
+    return np.array(ala_camera_operations.get_world_positions(objects), dtype=np.float64).reshape(-1, 3)
+
+
+def create_turntable_cameras(objects, camera_body=ala_camera_presets.DEFAULT_CAMERA_BODY):
+    '''
+    Create one camera of a camera body preset per object, named after the object.
+    The cameras are created through the transaction's modifier so a turntable job stays one undo step.
+    '''
+    with ala_camera_modifier.transaction("createTurntableCameras") as camera_transaction:
+        cameras = [camera_transaction.create_camera(obj.rsplit('|', 1)[-1] + '_turntableCam') for obj in objects]
+        ala_camera_operations.apply_camera_body([camera_shape for _, camera_shape in cameras], camera_body)
+    return [camera_transform for camera_transform, _ in cameras]
+
+
+# Ignore R0913/R0917 warnings because each orbit setting is a plain number with a default
+def bake_turntables_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        objects, cameras=None, radius=DEFAULT_RADIUS, elevation=0.0, frame_count=DEFAULT_FRAME_COUNT,
+        orbits=1.0, start_frame=1.0, **options):
+    '''
+    Job baking a turntable camera around every object, see ala_camera_jobs.py.
+    cameras are the existing cameras to animate, one per object, a camera of
+    options['camera_body'] is created for every object by default. Other options:
+    start_angle in degrees and follow_animation to orbit objects that move.
+    The orbits are computed in a worker thread and the cameras are written
+    BATCH_SIZE at a time, each batch in its own transaction.
+    Returns the (camera transform, object) pairs.
+    '''
+    if cameras is not None and len(cameras) != len(objects):
+        raise ValueError(f"{len(cameras)} cameras given for {len(objects)} objects")
+    if not objects:
+        return []
+    frames = ala_camera_bake.get_frames(start_frame, start_frame + frame_count - 1)
+    centers = get_orbit_centers(objects, frames, options.get('follow_animation', False))
+    translations, rotations = yield ala_camera_jobs.work(
+        compute_orbits, centers, radius, elevation, frame_count, orbits, options.get('start_angle', 0.0))
+
+    baked_cameras = []
+    for batch_start in range(0, len(objects), BATCH_SIZE):
+        batch = slice(batch_start, batch_start + BATCH_SIZE)
+        with ala_camera_modifier.transaction("bakeTurntables") as turntable_transaction:
+            if cameras is None:
+                batch_cameras = create_turntable_cameras(objects[batch], options.get('camera_body', ala_camera_presets.DEFAULT_CAMERA_BODY))
+            else:
+                batch_cameras = cameras[batch]
+            curves = {}
+            values = {}
+            for camera_index, camera_transform in enumerate(batch_cameras, batch_start):
+                for axis, attribute in enumerate(TRANSLATE_ATTRIBUTES):
+                    curves[camera_transform + '.' + attribute] = (frames, translations[camera_index, :, axis])
+                for axis, attribute in enumerate(ROTATE_ATTRIBUTES):
+                    curves[camera_transform + '.' + attribute] = (frames, rotations[camera_index, :, axis])
+                values[camera_transform + '.rotateZ'] = 0.0
+                values[camera_transform + '.rotateOrder'] = ROTATE_ORDER_XYZ
+            turntable_transaction.set_values(values)
+            #every curve shares the same frames, so they share one MTimeArray
+            ala_camera_keys.write_anim_curves(curves, tangent_type='spline')
+        baked_cameras += batch_cameras
+        yield ala_camera_jobs.progress(len(baked_cameras), len(objects), "Baking turntables")
+    return list(zip(baked_cameras, objects))
+
+
+def bake_turntables(*args, **kwargs):
+    '''
+    Run bake_turntables_job straight away as a single undoable step,
+    so one call can build the turntables of a whole asset library
+    '''
+    with ala_camera_modifier.transaction("bakeTurntables"):
+        return ala_camera_jobs.run_now(bake_turntables_job(*args, **kwargs))
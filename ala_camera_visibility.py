@@ -0,0 +1,264 @@
+'''
+ala_camera_visibility.py
+Per-frame frustum visibility of shot cameras: which objects every camera
+sees on every frame, and the tightest far clip plane that keeps them all.
+The frustum of every frame is built from the film back, focal length, clip
+planes and world matrix of the camera, and the world bounding box of every
+object is tested against the frustums of a batch of frames in one matrix
+product with NumPy. Only animated objects are sampled on every frame,
+boxes are the object space bounding boxes carried through the world matrix,
+so deforming objects are treated as rigid. Like autofocus, frustums follow
+the film back, film fit, film offsets and overscan are ignored.
+Matrices and bounding boxes are in cm, so the clip planes are converted from
+the scene's UI unit to cm and depths and far clip suggestions are in cm.
+apply_far_clips converts the suggestions back to UI units.
+'''
+import math
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_bake
+import ala_camera_columns
+import ala_camera_jobs
+import ala_camera_modifier
+from ala_camera_autofocus import MILLIMETERS_PER_INCH, get_scene_meshes, is_animated
+from ala_camera_modifier import get_plug, get_plug_value
+
+# Camera attributes sampled on every frame, in scene UI units
+FRUSTUM_ATTRIBUTES = ('focalLength', 'horizontalFilmAperture', 'verticalFilmAperture', 'nearClipPlane', 'farClipPlane')
+# Rows of the sampled FRUSTUM_ATTRIBUTES that are distances, converted to cm
+CLIP_ROWS = slice(3, 5)
+
+# Plane distances (frames x planes x objects) computed by one step, 4M doubles are 32 MB
+CHUNK_VALUES = 4 * 1024 * 1024
+
+# Suggested far clip planes leave this much room behind the farthest visible object
+FAR_CLIP_MARGIN = 1.1
+
+VISIBILITY_EXTENSION = '.alavis'
+
+
+def get_object_bounds(shapes):
+    '''
+    Object space bounding box centers and half extents (shapes, 3) of DAG shapes
+    '''
+    selection = om2.MSelectionList()
+    for shape in shapes:
+        selection.add(shape)
+    corners = np.empty((len(shapes), 2, 3))
+    for index in range(len(shapes)):
+        box = om2.MFnDagNode(selection.getDagPath(index)).boundingBox
+        corners[index] = ((box.min.x, box.min.y, box.min.z), (box.max.x, box.max.y, box.max.z))
+    return corners.mean(axis=1), (corners[:, 1] - corners[:, 0]) / 2.0
+
+
+def get_world_boxes(centers, half_extents, matrices):
+    '''
+    World axis aligned boxes (..., 3) around object space boxes carried by (..., 4, 4) world matrices
+    '''
+    #Maya matrices multiply row vectors, translation is the last row
+    world_centers = np.einsum('...j,...jk->...k', centers, matrices[..., :3, :3]) + matrices[..., 3, :3]
+    return world_centers, np.einsum('...j,...jk->...k', half_extents, np.abs(matrices[..., :3, :3]))
+
+
+def get_view_planes(camera_matrices, frustum_values):
+    '''
+    (frames, 7, 4) world planes of (frames, 4, 4) camera matrices and (attributes, frames)
+    FRUSTUM_ATTRIBUTES values. The near, far, right, left, top and bottom planes point
+    into the frustum, the last one measures the depth in front of the camera.
+    '''
+    focal_lengths, film_widths, film_heights, near_clips, far_clips = frustum_values
+    #tangents of the half angles of view
+    half_width = film_widths * MILLIMETERS_PER_INCH / 2.0 / focal_lengths
+    half_height = film_heights * MILLIMETERS_PER_INCH / 2.0 / focal_lengths
+    zeros = np.zeros_like(focal_lengths)
+    ones = np.ones_like(focal_lengths)
+    #(normal, offset) in camera space, cameras look down their local -Z axis
+    local_planes = np.stack([
+        np.stack([zeros, zeros, -ones, -near_clips], axis=-1),
+        np.stack([zeros, zeros, ones, far_clips], axis=-1),
+        np.stack([-ones, zeros, -half_width, zeros], axis=-1),
+        np.stack([ones, zeros, -half_width, zeros], axis=-1),
+        np.stack([zeros, -ones, -half_height, zeros], axis=-1),
+        np.stack([zeros, ones, -half_height, zeros], axis=-1),
+        np.stack([zeros, zeros, -ones, zeros], axis=-1),
+    ], axis=1)
+    #a world point p is in front of a camera space plane when plane . (p x inverse matrix) >= 0
+    return np.einsum('fij,fpj->fpi', np.linalg.inv(camera_matrices), local_planes)
+
+
+def get_plane_distances(planes, centers, half_extents):
+    '''
+    (frames, planes, objects) largest distance of every box in front of every plane.
+    Still boxes are (objects, 3), moving boxes (frames, objects, 3).
+    Plane normals are not normalized, only the sign of the distances to the
+    frustum planes counts, the depth plane keeps the camera's units.
+    '''
+    normals = planes[..., :3]
+    if centers.ndim == 2:
+        #one matrix product over every plane of every frame
+        frame_count, plane_count = planes.shape[:2]
+        distances = (np.concatenate([normals, np.abs(normals)], axis=-1).reshape(-1, 6)
+                     @ np.hstack([centers, half_extents]).T).reshape(frame_count, plane_count, -1)
+    else:
+        distances = np.einsum('fpj,foj->fpo', normals, centers) + np.einsum('fpj,foj->fpo', np.abs(normals), half_extents)
+    distances += planes[..., 3:]
+    return distances
+
+
+def test_boxes(planes, boxes):
+    '''
+    Visibility (frames, objects) of (centers, half extents) boxes in the frustums of (frames, 7, 4)
+    view planes, and the depth of the farthest point of a visible box on every frame, -inf for none
+    '''
+    distances = get_plane_distances(planes, *boxes)
+    visible = distances[:, 0] >= 0.0
+    for plane in range(1, 6):
+        visible &= distances[:, plane] >= 0.0
+    return visible, np.max(np.where(visible, distances[:, 6], -np.inf), axis=1, initial=-np.inf)
+
+
+def round_up(value, digits=2):
+    '''
+    Round a positive value up to a number of significant digits
+    '''
+    scale = 10.0 ** (math.floor(math.log10(value)) - digits + 1)
+    return math.ceil(value / scale) * scale
+
+
+def suggest_far_clip(depths, frustum_values, margin=FAR_CLIP_MARGIN):
+    '''
+    Far clip plane keeping the farthest visible point of every frame with a margin,
+    never beyond the current far clip plane. None when nothing is visible.
+    '''
+    depth = np.max(depths, initial=-np.inf)
+    if not np.isfinite(depth):
+        return None
+    _, _, _, near_clips, far_clips = frustum_values
+    far_clip = round_up(max(depth * margin, near_clips.max() * 2.0))
+    return min(far_clip, float(far_clips.max()))
+
+
+def sample_boxes_job(shapes, frames):
+    '''
+    Job steps sampling the world boxes of shapes: still shapes once as (objects, 3)
+    arrays, animated shapes on every frame as (frames, objects, 3).
+    Returns (still shapes, still boxes), (moving shapes, moving boxes).
+    '''
+    animated = [is_animated(shape) for shape in shapes]
+    still = [shape for shape, moves in zip(shapes, animated) if not moves]
+    moving = [shape for shape, moves in zip(shapes, animated) if moves]
+    still_matrices = ala_camera_bake.sample_world_matrices(still, frames[:1])[:, 0] if still else np.empty((0, 4, 4))
+    still_boxes = get_world_boxes(*get_object_bounds(still), still_matrices)
+    if not moving:
+        return (still, still_boxes), (moving, None)
+    moving_matrices = yield from ala_camera_bake.sample_in_chunks(ala_camera_bake.sample_world_matrices, moving, frames)
+    centers, half_extents = get_object_bounds(moving)
+    moving_boxes = get_world_boxes(centers[np.newaxis], half_extents[np.newaxis], moving_matrices.swapaxes(0, 1))
+    return (still, still_boxes), (moving, moving_boxes)
+
+
+def compute_visibility_job(cameras, frames, shapes=None):
+    '''
+    Job steps testing the bounding box of every shape against the frustum of every
+    (transform, shape) camera on every frame, shapes default to every visible mesh.
+    Batches of frames are tested in parallel worker threads. Returns
+    {'shapes': shapes in table column order, 'frames': frames, 'cameras': {camera transform:
+    {'visible': (frames, shapes) bools, 'depths': farthest visible depth of every frame,
+    'far_clip': suggested far clip plane or None}}}
+    '''
+    if shapes is None:
+        shapes = get_scene_meshes()
+    (still, still_boxes), (moving, moving_boxes) = yield from sample_boxes_job(shapes, frames)
+    #rows of a batch times 7 planes times every object stay under CHUNK_VALUES
+    batch_size = max(1, CHUNK_VALUES // (7 * max(len(still), len(moving), 1)))
+    batches = [slice(start, start + batch_size) for start in range(0, len(frames), batch_size)]
+    results = {}
+    for camera_transform, camera_shape in cameras:
+        frustum_values = yield from ala_camera_bake.sample_in_chunks(
+            ala_camera_bake.sample_plug_values, [camera_shape + '.' + attribute for attribute in FRUSTUM_ATTRIBUTES], frames)
+        frustum_values[CLIP_ROWS] *= ala_camera_modifier.get_centimeters_per_unit()
+        camera_matrices = yield from ala_camera_bake.sample_in_chunks(ala_camera_bake.sample_world_matrices, [camera_transform], frames)
+        planes = get_view_planes(camera_matrices[0], frustum_values)
+        tested = yield [ala_camera_jobs.work(test_boxes, planes[batch], still_boxes) for batch in batches]
+        visible = np.concatenate([batch_visible for batch_visible, _ in tested]) if tested else np.empty((0, len(still)), dtype=bool)
+        depths = np.concatenate([batch_depths for _, batch_depths in tested]) if tested else np.empty(0)
+        if moving:
+            tested = yield [ala_camera_jobs.work(test_boxes, planes[batch], (moving_boxes[0][batch], moving_boxes[1][batch]))
+                            for batch in batches]
+            visible = np.hstack([visible, np.concatenate([batch_visible for batch_visible, _ in tested])])
+            depths = np.maximum(depths, np.concatenate([batch_depths for _, batch_depths in tested]))
+        results[camera_transform] = {'visible': visible, 'depths': depths, 'far_clip': suggest_far_clip(depths, frustum_values)}
+    return {'shapes': still + moving, 'frames': frames, 'cameras': results}
+
+
+def compute_visibility(*args, **kwargs):
+    '''
+    Run compute_visibility_job straight away
+    '''
+    return ala_camera_jobs.run_now(compute_visibility_job(*args, **kwargs))
+
+
+def apply_far_clips(cameras, visibility):
+    '''
+    Set the suggested far clip plane on every (transform, shape) camera that sees anything,
+    in one undo step. Returns {camera shape: {'farClipPlane': (before, after)}} in UI units.
+    '''
+    centimeters_per_unit = ala_camera_modifier.get_centimeters_per_unit()
+    values = {}
+    for camera_transform, camera_shape in cameras:
+        far_clip = visibility['cameras'][camera_transform]['far_clip']
+        if far_clip is not None:
+            values[camera_shape + '.farClipPlane'] = far_clip / centimeters_per_unit
+    report = {plug_name.rsplit('.', 1)[0]: {'farClipPlane': (get_plug_value(get_plug(plug_name)), far_clip)}
+              for plug_name, far_clip in values.items()}
+    ala_camera_modifier.commit_values(values)
+    return report
+
+
+def write_visibility(path, visibility):
+    '''
+    Write a visibility table to a file of ala_camera_columns.py: a 'visible' column of
+    (frames, cameras, bytes) bits packed along the shapes in metadata['shapes'], read back
+    with np.unpackbits(columns.camera_column('visible', camera), axis=-1, count=len(shapes)),
+    and the farthest visible 'depth' of every camera and frame.
+    '''
+    cameras = list(visibility['cameras'])
+    frames = visibility['frames']
+    packed_bytes = -(-len(visibility['shapes']) // 8)
+    columns = {
+        'frame': ('<f8', ()),
+        'visible': ('u1', (len(cameras), packed_bytes)),
+        'depth': ('<f8', (len(cameras),)),
+    }
+    metadata = {
+        'scene': cmds.file(query=True, sceneName=True),
+        'cameras': cameras,
+        'shapes': visibility['shapes'],
+        'far_clips': [visibility['cameras'][camera]['far_clip'] for camera in cameras],
+        #depths and far clips are in cm whatever the scene unit
+        'linear_unit': 'cm',
+    }
+    visible = np.empty((len(frames), len(cameras), packed_bytes), dtype=np.uint8)
+    depths = np.empty((len(frames), len(cameras)))
+    for index, camera in enumerate(cameras):
+        visible[:, index] = np.packbits(visibility['cameras'][camera]['visible'], axis=-1)
+        depths[:, index] = visibility['cameras'][camera]['depths']
+    with ala_camera_columns.ColumnWriter(path, columns, len(frames), metadata) as writer:
+        writer.write(0, {'frame': frames, 'visible': visible, 'depth': depths})
+    return path
+
+
+def format_visibility_report(visibility):
+    '''
+    One line per camera: objects seen on any frame, most seen on one frame and the suggested far clip
+    '''
+    lines = []
+    for camera_transform, result in visibility['cameras'].items():
+        visible = result['visible']
+        seen = int(np.count_nonzero(visible.any(axis=0))) if visible.size else 0
+        most = int(visible.sum(axis=1).max()) if visible.size else 0
+        far_clip = 'no far clip suggestion' if result['far_clip'] is None else f"far clip {result['far_clip']:g} cm"
+        lines.append(f"{camera_transform}: sees {seen} of {len(visibility['shapes'])} objects over "
+                     f"{len(visibility['frames'])} frames, at most {most} at once, {far_clip}")
+    return '\n'.join(lines)
@@ -0,0 +1,174 @@
+'''
+ala_camera_zoom.py
+Zoom lenses with focus breathing: the effective focal length of a zoom
+changes with its zoom position and its focus distance. Zoom lens presets
+(presets/zoom_lenses.json) sample it on a grid of zoom focal lengths and
+focus distances in cm, with the minimum focus distance of every zoom focal length.
+Each lens is resampled once into a dense lookup table, uniform in zoom
+position and in inverse focus distance where breathing is close to linear,
+and cached until the presets are reloaded. Looking up every frame of a shot
+is then index arithmetic on NumPy arrays.
+Bakes keep the zoom position on ZOOM_ATTRIBUTE of the camera and write
+the effective focal length of every frame to focalLength.
+'''
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya as om2
+import ala_camera_bake
+import ala_camera_jobs
+import ala_camera_keys
+import ala_camera_modifier
+import ala_camera_presets
+from ala_camera_lens_import import drop_constant_keys
+
+# Samples per axis of the lookup tables
+TABLE_SIZE = 256
+
+# Camera shape attribute holding the zoom position once the focal length is baked
+ZOOM_ATTRIBUTE = 'alaZoomFocalLength'
+
+
+class ZoomLensTable():
+    '''
+    Dense focus breathing lookup table of a zoom lens preset
+    '''
+    def __init__(self, preset, size=TABLE_SIZE):
+        self.preset = preset
+        self.size = size
+        zoom_focal_lengths = np.asarray(preset['zoom_focal_lengths'], dtype=np.float64)
+        focus_distances = np.asarray(preset['focus_distances'], dtype=np.float64)
+        focal_lengths = np.asarray(preset['effective_focal_lengths'], dtype=np.float64)
+        min_focus_distances = np.asarray(preset['min_focus_distances'], dtype=np.float64)
+        if focal_lengths.shape != (len(zoom_focal_lengths), len(focus_distances)) or min_focus_distances.shape != zoom_focal_lengths.shape:
+            raise ValueError(f"Zoom lens {preset['name']!r} needs a row of effective focal lengths and a minimum focus "
+                             f"distance per zoom focal length, and a column per focus distance")
+        if (min(len(zoom_focal_lengths), len(focus_distances)) < 2 or focus_distances[0] <= 0.0
+                or np.any(np.diff(zoom_focal_lengths) <= 0.0) or np.any(np.diff(focus_distances) <= 0.0)):
+            raise ValueError(f"Zoom lens {preset['name']!r} needs at least 2 increasing zoom focal lengths "
+                             f"and 2 increasing focus distances above 0")
+
+        #the far end of the inverse focus axis is close to 0 (infinity)
+        inverse_focus_distances = 1.0 / focus_distances[::-1]
+        #(start, step) of the uniform table axes
+        self.zoom_axis = (zoom_focal_lengths[0], (zoom_focal_lengths[-1] - zoom_focal_lengths[0]) / (size - 1))
+        self.inverse_focus_axis = (inverse_focus_distances[0], (inverse_focus_distances[-1] - inverse_focus_distances[0]) / (size - 1))
+        zoom_grid = self.zoom_axis[0] + self.zoom_axis[1] * np.arange(size)
+        inverse_grid = self.inverse_focus_axis[0] + self.inverse_focus_axis[1] * np.arange(size)
+        #resample every sampled zoom position along the focus axis, then every focus column along the zoom axis
+        rows = np.array([np.interp(inverse_grid, inverse_focus_distances, row[::-1]) for row in focal_lengths])
+        self.focal_lengths = np.array([np.interp(zoom_grid, zoom_focal_lengths, column) for column in rows.T]).T
+        self.min_focus_distances = np.interp(zoom_grid, zoom_focal_lengths, min_focus_distances)
+
+    def grid_position(self, values, axis):
+        '''
+        Table cell index and fraction of every value along an axis, clamped to the table
+        '''
+        position = np.clip((values - axis[0]) / axis[1], 0.0, self.size - 1)
+        index = np.minimum(position.astype(np.intp), self.size - 2)
+        return index, position - index
+
+    def lookup(self, zoom_focal_lengths, focus_distances):
+        '''
+        Effective focal lengths of arrays of zoom positions and focus distances,
+        and the focus distances clamped to the minimum focus of their zoom position
+        '''
+        zoom_index, zoom_fraction = self.grid_position(np.asarray(zoom_focal_lengths, dtype=np.float64), self.zoom_axis)
+        min_focus_distances = self.min_focus_distances[zoom_index]
+        min_focus_distances = min_focus_distances + (self.min_focus_distances[zoom_index + 1] - min_focus_distances) * zoom_fraction
+        clamped_focus_distances = np.maximum(np.asarray(focus_distances, dtype=np.float64), min_focus_distances)
+        focus_index, focus_fraction = self.grid_position(1.0 / clamped_focus_distances, self.inverse_focus_axis)
+        table = self.focal_lengths
+        near_zoom = table[zoom_index, focus_index]
+        near_zoom = near_zoom + (table[zoom_index, focus_index + 1] - near_zoom) * focus_fraction
+        far_zoom = table[zoom_index + 1, focus_index]
+        far_zoom = far_zoom + (table[zoom_index + 1, focus_index + 1] - far_zoom) * focus_fraction
+        return near_zoom + (far_zoom - near_zoom) * zoom_fraction, clamped_focus_distances
+
+
+# Lookup tables of the zoom lenses used in the session by preset name
+zoom_tables = {}
+
+
+def get_zoom_table(name):
+    '''
+    ZoomLensTable of a zoom lens preset, built on first use and after the presets are reloaded
+    '''
+    preset = ala_camera_presets.registry.zoom_lens(name)
+    table = zoom_tables.get(name)
+    if table is None or table.preset is not preset:
+        table = zoom_tables[name] = ZoomLensTable(preset)
+    return table
+
+
+def keep_zoom_position(camera_shape):
+    '''
+    Add ZOOM_ATTRIBUTE to a camera and move whatever drives its focal length onto it,
+    so a baked effective focal length never replaces the zoom position.
+    Joins the bake transaction and writes through its modifier before the focal length keys are written.
+    '''
+    focal_length = camera_shape + '.focalLength'
+    with ala_camera_modifier.transaction("keepZoomPosition") as zoom_transaction:
+        attribute_fn = om2.MFnNumericAttribute()
+        attribute = attribute_fn.create(ZOOM_ATTRIBUTE, ZOOM_ATTRIBUTE, om2.MFnNumericData.kDouble, cmds.getAttr(focal_length))
+        attribute_fn.setMin(0.0)
+        attribute_fn.keyable = True
+        zoom_transaction.modifier.addAttribute(ala_camera_modifier.get_node(camera_shape), attribute)
+        zoom_transaction.apply()
+        for source in cmds.listConnections(focal_length, source=True, destination=False, plugs=True) or []:
+            zoom_transaction.disconnect(source, focal_length)
+            zoom_transaction.connect(source, camera_shape + '.' + ZOOM_ATTRIBUTE)
+        #applied straight away, the focal length keys must not land on the zoom position curve
+        zoom_transaction.apply()
+
+
+def bake_focus_breathing_job(camera_shape, lens_name, start_frame=None, end_frame=None):
+    '''
+    Job baking the effective focal length of a zoom lens on every frame to focalLength,
+    see ala_camera_jobs.py. There is no default lens, breathing only means something
+    for the lens the shot was filmed with. Frames default to the playback range.
+    The zoom position is read from ZOOM_ATTRIBUTE, from the focal length itself on the
+    first bake, the focus distance from focusDistance in UI units, converted to the cm
+    of the presets. Returns a summary with the number of keys and of frames focused
+    closer than the lens can.
+    '''
+    table = get_zoom_table(lens_name)
+    if start_frame is None:
+        start_frame = cmds.playbackOptions(q=True, minTime=True)
+    if end_frame is None:
+        end_frame = cmds.playbackOptions(q=True, maxTime=True)
+    frames = ala_camera_bake.get_frames(start_frame, end_frame)
+    has_zoom_position = cmds.attributeQuery(ZOOM_ATTRIBUTE, node=camera_shape, exists=True)
+    zoom_plug = camera_shape + '.' + (ZOOM_ATTRIBUTE if has_zoom_position else 'focalLength')
+    zoom_focal_lengths, focus_distances = yield from ala_camera_bake.sample_in_chunks(
+        ala_camera_bake.sample_plug_values, [zoom_plug, camera_shape + '.focusDistance'], frames)
+    focus_distances = focus_distances * ala_camera_modifier.get_centimeters_per_unit()
+    focal_lengths, clamped_focus_distances = yield ala_camera_jobs.work(table.lookup, zoom_focal_lengths, focus_distances)
+    key_frames, key_values = drop_constant_keys(frames, focal_lengths)
+
+    with ala_camera_modifier.transaction("bakeFocusBreathing"):
+        if not has_zoom_position:
+            keep_zoom_position(camera_shape)
+        ala_camera_keys.write_anim_curves({camera_shape + '.focalLength': (key_frames, key_values)}, tangent_type='linear')
+    return {
+        'lens': lens_name,
+        'frames': len(frames),
+        'keys': len(key_frames),
+        'clamped_frames': int(np.count_nonzero(clamped_focus_distances > focus_distances)),
+    }
+
+
+def bake_focus_breathing(*args, **kwargs):
+    '''
+    Run bake_focus_breathing_job straight away, returns its summary
+    '''
+    return ala_camera_jobs.run_now(bake_focus_breathing_job(*args, **kwargs))
+
+
+def format_breathing_report(camera_shape, summary):
+    '''
+    One line report of a focus breathing bake
+    '''
+    report = f"{camera_shape}: {summary['lens']} breathing baked on {summary['frames']} frames ({summary['keys']} keys)"
+    if summary['clamped_frames']:
+        report += f", focus closer than the minimum focus distance on {summary['clamped_frames']} frames"
+    return report
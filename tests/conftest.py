@@ -0,0 +1,24 @@
+'''
+Shared setup of the camera tool tests: the tool modules run against the
+in-memory Maya stand-in of ala_camera_stand_in.py, installed once before
+any of them is imported.
+'''
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Ignore C0413 warning because the stand-in must be installed before the tool modules are imported
+import ala_camera_stand_in  # pylint: disable=wrong-import-position
+
+STAND_IN_SCENE = ala_camera_stand_in.install()
+
+
+@pytest.fixture
+def scene():
+    '''
+    The stand-in scene, emptied for every test
+    '''
+    STAND_IN_SCENE.reset()
+    return STAND_IN_SCENE
@@ -0,0 +1,53 @@
+'''
+Autofocus depth on the stand-in scene
+'''
+import numpy as np
+import pytest
+from maya import cmds
+import ala_camera_autofocus
+import ala_camera_modifier
+
+# A 200 x 200 square facing the camera, 10 cm in front of the origin of its mesh
+SQUARE_POINTS = np.array([[-100.0, -100.0, -10.0], [100.0, -100.0, -10.0], [100.0, 100.0, -10.0], [-100.0, 100.0, -10.0]])
+SQUARE_TRIANGLES = np.array([0, 1, 2, 0, 2, 3])
+
+
+def test_autofocus_bakes_depth_along_the_view_axis(scene):
+    '''
+    Off-center autofocus rays give the depth along the camera axis
+    '''
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=1)
+    mesh_shape = built['meshes'][0] + 'Shape'
+    scene.set_mesh(mesh_shape, SQUARE_POINTS, SQUARE_TRIANGLES)
+    frames = np.array([1.0, 2.0])
+    #the mesh sits 100 cm down the camera's -Z axis, off-center rays are longer but not deeper
+    depths = ala_camera_autofocus.compute_autofocus(built['cameras'][0], frames, (0.9, 0.7), [mesh_shape])
+    assert depths == pytest.approx([110.0, 110.0])
+
+
+def test_autofocus_follows_deformed_meshes(scene):
+    '''
+    Meshes with a deformer are found and traced frame by frame
+    '''
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=1)
+    mesh_shape = built['meshes'][0] + 'Shape'
+    scene.set_mesh(mesh_shape, SQUARE_POINTS, SQUARE_TRIANGLES)
+    skin_cluster = cmds.createNode('skinCluster')
+    cmds.connectAttr(skin_cluster + '.outputGeometry[0]', mesh_shape + '.inMesh')
+    assert ala_camera_autofocus.get_deformed_meshes([mesh_shape]) == {mesh_shape}
+    depths = ala_camera_autofocus.compute_autofocus(built['cameras'][0], np.array([1.0]))
+    assert depths == pytest.approx([110.0])
+
+
+@pytest.mark.parametrize('near_clip, depth', [(1.0, 110.0), (1.5, np.inf)])
+def test_autofocus_near_clip_is_in_scene_units(scene, monkeypatch, near_clip, depth):
+    '''
+    In a metre scene the near clip plane is converted to cm before it is compared with the hits
+    '''
+    built = scene.build_synthetic_scene(camera_count=1, mesh_count=1)
+    mesh_shape = built['meshes'][0] + 'Shape'
+    scene.set_mesh(mesh_shape, SQUARE_POINTS, SQUARE_TRIANGLES)
+    monkeypatch.setattr(ala_camera_modifier, 'get_centimeters_per_unit', lambda: 100.0)
+    cmds.setAttr(built['cameras'][0] + 'Shape.nearClipPlane', near_clip)
+    depths = ala_camera_autofocus.compute_autofocus(built['cameras'][0], np.array([1.0]), mesh_shapes=[mesh_shape])
+    assert depths == pytest.approx([depth])
@@ -0,0 +1,36 @@
+'''
+Batch journal entries are only reused by runs with the same operations
+'''
+import ala_camera_batch
+
+
+def test_journal_is_keyed_by_operations(tmp_path):
+    '''
+    Only ok entries of a run with the same operations are done
+    '''
+    journal_path = str(tmp_path / 'journal.jsonl')
+    square = ala_camera_batch.get_operations_key({'delivery_format': '4:3'})
+    wide = ala_camera_batch.get_operations_key({'delivery_format': '16:9'})
+    assert square != wide
+    ala_camera_batch.append_journal(journal_path, {'scene': 'a.mb', 'status': 'ok'}, square)
+    ala_camera_batch.append_journal(journal_path, {'scene': 'b.mb', 'status': 'failed'}, square)
+    assert ala_camera_batch.read_journal(journal_path, square) == {'a.mb'}
+    assert ala_camera_batch.read_journal(journal_path, wide) == set()
+
+
+def test_operations_key_ignores_key_order():
+    '''
+    The operations key is the same however the options are ordered
+    '''
+    assert (ala_camera_batch.get_operations_key({'a': 1, 'b': [2, 3]})
+            == ala_camera_batch.get_operations_key({'b': [2, 3], 'a': 1}))
+
+
+def test_done_delivery_jobs_are_skipped():
+    '''
+    Delivery jobs in the journal are reported as skipped instead of run
+    '''
+    jobs = [('a.mb', '|cam', '|cam|camShape', '4:3'), ('a.mb', '|cam', '|cam|camShape', '16:9')]
+    pending, skipped = ala_camera_batch.split_done_jobs(jobs, {'a.mb cam 4:3'})
+    assert pending == jobs[1:]
+    assert [(result['job'], result['status']) for result in skipped] == [('a.mb cam 4:3', 'skipped')]
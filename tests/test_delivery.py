@@ -0,0 +1,20 @@
+'''
+Delivery overrides and playblast view on the stand-in scene
+'''
+from maya import cmds
+import ala_camera_delivery
+
+
+def test_delivery_leaves_no_undo_entry_and_restores_the_view(scene, tmp_path):
+    '''
+    Delivery overrides add no undo entry and the viewport camera comes back
+    '''
+    camera = scene.build_synthetic_scene(camera_count=1)['cameras'][0]
+    width = cmds.getAttr('defaultResolution.width')
+    undo_entries = scene.undo_entries
+    for output_type in ala_camera_delivery.OUTPUT_TYPES:
+        ala_camera_delivery.write_delivery(camera, camera + 'Shape', '4:3', output_type, str(tmp_path), 1, 2)
+    assert scene.undo_entries == undo_entries
+    assert scene.undo_enabled
+    assert scene.look_through == 'persp'
+    assert cmds.getAttr('defaultResolution.width') == width
@@ -0,0 +1,131 @@
+'''
+Background job undo steps and profiling on the stand-in scene
+'''
+import pytest
+from maya import cmds
+import ala_camera_jobs
+import ala_camera_modifier
+import ala_camera_operations
+import ala_camera_profiler
+import ala_camera_turntable
+import ala_camera_zoom
+
+
+@pytest.fixture(name='runner')
+def runner_fixture(scene):
+    '''
+    Job runner stepping through the stand-in idle loop
+    '''
+    job_runner = ala_camera_jobs.JobRunner(max_workers=1, defer=scene.execute_deferred)
+    yield job_runner
+    job_runner.executor.shutdown()
+
+
+def write_batches(camera_shapes, fail=False):
+    '''
+    Job writing one focal length per batch, optionally failing after the last one
+    '''
+    for index, camera_shape in enumerate(camera_shapes):
+        with ala_camera_modifier.transaction("writeBatch") as batch_transaction:
+            batch_transaction.set_values({camera_shape + '.focalLength': 50.0})
+        yield ala_camera_jobs.progress(index + 1, len(camera_shapes))
+    if fail:
+        raise RuntimeError("failed after the last batch")
+
+
+def run(scene, runner, name, steps):
+    '''
+    Submit a job and step it to the end
+    '''
+    job = runner.submit(name, steps)
+    scene.run_deferred(lambda: job.finished)
+    return job
+
+
+def test_job_batches_are_one_undo_step(scene, runner):
+    '''
+    Every transaction of a job reaches the undo queue as one step when the job ends
+    '''
+    camera_shapes = [camera + 'Shape' for camera in scene.build_synthetic_scene(camera_count=5)['cameras']]
+    undo_entries = scene.undo_entries
+    job = run(scene, runner, "Write", write_batches(camera_shapes))
+    assert job.state == 'done'
+    assert scene.undo_entries - undo_entries == 1
+    assert scene.undo_calls == 0
+    assert scene.undo_chunk_depth == 0
+    assert cmds.getAttr(camera_shapes[-1] + '.focalLength') == 50.0
+
+
+def test_failed_job_reverts_only_its_batches(scene, runner):
+    '''
+    An edit made between the steps of a failing job stays, the job's batches are reverted
+    '''
+    cameras = scene.build_synthetic_scene(camera_count=6)['cameras']
+    camera_shapes = [camera + 'Shape' for camera in cameras[:5]]
+    user_shape = cameras[5] + 'Shape'
+    focal_length = cmds.getAttr(camera_shapes[0] + '.focalLength')
+    undo_entries = scene.undo_entries
+    job = runner.submit("Write", write_batches(camera_shapes, fail=True))
+    #runs between the first and second step of the job, like a click while it runs
+    scene.execute_deferred(lambda: cmds.setAttr(user_shape + '.focalLength', 85.0))
+    scene.run_deferred(lambda: job.finished)
+    assert job.state == 'failed'
+    assert scene.undo_entries - undo_entries == 1
+    assert scene.undo_calls == 0
+    assert cmds.getAttr(user_shape + '.focalLength') == 85.0
+    assert all(cmds.getAttr(camera_shape + '.focalLength') == focal_length for camera_shape in camera_shapes)
+    assert not ala_camera_modifier.job_commits
+
+
+def test_batch_depth_of_field_job_is_one_undo_step(scene, runner):
+    '''
+    The batches of a Batch DOF job undo as one step
+    '''
+    built = scene.build_synthetic_scene(camera_count=120, locator_count=120)
+    undo_entries = scene.undo_entries
+    job = run(scene, runner, "Batch DOF", ala_camera_operations.batch_depth_of_field_job(list(zip(built['cameras'], built['locators']))))
+    assert job.state == 'done'
+    assert len(job.result) == 120
+    assert scene.undo_entries - undo_entries == 1
+
+
+def test_turntable_job_creating_cameras_is_one_undo_step(scene, runner):
+    '''
+    Turntable cameras are created through the modifier, so the whole job is still one undo step
+    '''
+    objects = scene.build_synthetic_scene(mesh_count=3)['meshes']
+    undo_entries = scene.undo_entries
+    job = run(scene, runner, "Bake Turntable", ala_camera_turntable.bake_turntables_job(objects, frame_count=4))
+    assert job.state == 'done'
+    assert scene.undo_entries - undo_entries == 1
+    assert [cmds.nodeType(camera + 'Shape') for camera, _ in job.result] == ['camera'] * 3
+
+
+def test_focus_breathing_job_keeps_the_zoom_position(scene, runner):
+    '''
+    The zoom position attribute is added through the modifier and takes over the focal length keys
+    '''
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    cmds.setAttr(camera_shape + '.focalLength', 35.0)
+    undo_entries = scene.undo_entries
+    job = run(scene, runner, "Bake Breathing", ala_camera_zoom.bake_focus_breathing_job(camera_shape, 'Example Zoom 19-80', 1.0, 1.0))
+    assert job.state == 'done'
+    assert scene.undo_entries - undo_entries == 1
+    assert cmds.getAttr(camera_shape + '.' + ala_camera_zoom.ZOOM_ATTRIBUTE) == 35.0
+
+
+def test_job_steps_are_profiled_under_their_action(scene, runner):
+    '''
+    Job steps count under the action that submitted the job, as one run
+    '''
+    camera_shapes = [camera + 'Shape' for camera in scene.build_synthetic_scene(camera_count=5)['cameras']]
+    profiler = ala_camera_profiler.enable()
+    try:
+        with profiler.action('write_focal_lengths'):
+            job = runner.submit("Write", write_batches(camera_shapes))
+        scene.run_deferred(lambda: job.finished)
+    finally:
+        ala_camera_profiler.disable()
+    assert job.state == 'done'
+    assert set(profiler.actions) == {'write_focal_lengths'}
+    assert profiler.actions['write_focal_lengths'].runs == 1
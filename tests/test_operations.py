@@ -0,0 +1,79 @@
+'''
+Selection, camera listing and DOF rig outcomes on the stand-in scene
+'''
+import pytest
+from maya import cmds
+import ala_camera_operations
+from ala_camera_operations import SelectionSnapshot
+
+
+def test_selection_keeps_nested_transforms_without_shape(scene):
+    '''
+    A grouped transform without a shape stays its own focus target
+    '''
+    camera_transform, _ = scene.add_camera('cam1')
+    group = scene.add_node('grp', 'transform')
+    scene.add_node('child', 'transform', group)
+    snapshot = SelectionSnapshot([camera_transform.long_name(), '|grp|child'])
+    assert snapshot.camera_transforms == ['|cam1']
+    assert snapshot.focus_targets == ['|grp|child']
+
+
+def test_selected_shape_belongs_to_its_transform(scene):
+    '''
+    A shape picked in the outliner is classified under its transform
+    '''
+    camera_transform, _ = scene.add_camera('cam1')
+    _, locator_shape = scene.add_locator('target')
+    snapshot = SelectionSnapshot([camera_transform.long_name(), locator_shape.long_name()])
+    assert snapshot.focus_targets == ['|target']
+    assert snapshot.entries[1] == ('|target', '|target|targetShape', 'locator')
+
+
+def test_camera_selected_twice_is_listed_once(scene):
+    '''
+    A camera picked by its transform and its shape is one camera
+    '''
+    camera_transform, camera_shape = scene.add_camera('cam1')
+    snapshot = SelectionSnapshot([camera_transform.long_name(), camera_shape.long_name()])
+    assert snapshot.camera_transforms == ['|cam1']
+    assert snapshot.camera_shapes == ['|cam1|cam1Shape']
+
+
+def test_scene_cameras_skip_startup_cameras(scene):
+    '''
+    persp, top, front and side are never listed, name patterns match the transform
+    '''
+    built = scene.build_synthetic_scene(camera_count=3)
+    cameras = ala_camera_operations.get_scene_cameras()
+    assert [transform.rsplit('|', 1)[-1] for transform, _ in cameras] == built['cameras']
+    assert ala_camera_operations.get_scene_cameras('*1') == [('|shotCam1', '|shotCam1|shotCam1Shape')]
+
+
+def test_batch_depth_of_field_is_one_undo_step(scene):
+    '''
+    Batch DOF rigs every pair in one undo step, focus nodes drive the cameras
+    '''
+    built = scene.build_synthetic_scene(camera_count=120, locator_count=120)
+    pairs = list(zip(built['cameras'], built['locators']))
+    undo_entries = scene.undo_entries
+    scene.call_counts.clear()
+    rigs = ala_camera_operations.batch_depth_of_field(pairs)
+    assert scene.undo_entries - undo_entries == 1
+    assert len(rigs) == len(pairs)
+    for (camera_shape, focus_node), (camera_transform, target) in zip(rigs, pairs):
+        assert cmds.listConnections(camera_shape + '.focusDistance', source=True, destination=False) == [focus_node]
+        assert cmds.listConnections(focus_node + '.targetMatrix', source=True, destination=False) == [target]
+        assert focus_node == camera_transform + '_focusDistance'
+    assert scene.call_counts['listRelatives'] == 1
+
+
+def test_batch_depth_of_field_needs_camera_shapes(scene):
+    '''
+    A transform without a camera shape is a selection error, nothing is rigged
+    '''
+    built = scene.build_synthetic_scene(camera_count=2, locator_count=3)
+    pairs = [(built['cameras'][0], built['locators'][0]), (built['locators'][1], built['locators'][2])]
+    with pytest.raises(ala_camera_operations.SelectionError, match=built['locators'][1]):
+        ala_camera_operations.batch_depth_of_field(pairs)
+    assert not cmds.listConnections(built['cameras'][0] + 'Shape.focusDistance', source=True, destination=False)
@@ -0,0 +1,43 @@
+'''
+Undo and scene bookkeeping of the Maya stand-in the benchmarks and tests count on
+'''
+from maya import cmds
+
+
+def test_closed_chunk_is_one_undo_entry(scene):
+    '''
+    Writes inside a chunk make one undo entry, an empty chunk none
+    '''
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    undo_entries = scene.undo_entries
+    cmds.undoInfo(openChunk=True)
+    cmds.undoInfo(closeChunk=True)
+    assert scene.undo_entries == undo_entries
+    cmds.undoInfo(openChunk=True)
+    cmds.setAttr(camera_shape + '.focalLength', 50.0)
+    cmds.setAttr(camera_shape + '.locatorScale', 30.0)
+    cmds.undoInfo(closeChunk=True)
+    assert scene.undo_entries - undo_entries == 1
+
+
+def test_writes_without_undo_make_no_entry(scene):
+    '''
+    With undo off a write is not on the undo queue
+    '''
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    undo_entries = scene.undo_entries
+    cmds.undoInfo(stateWithoutFlush=False)
+    cmds.setAttr(camera_shape + '.focalLength', 50.0)
+    cmds.undoInfo(stateWithoutFlush=True)
+    assert scene.undo_entries == undo_entries
+
+
+def test_reset_keeps_the_default_nodes(scene):
+    '''
+    An emptied scene still has the render settings nodes and the startup cameras
+    '''
+    scene.build_synthetic_scene(camera_count=3)
+    scene.reset()
+    assert cmds.objExists('defaultResolution')
+    assert not cmds.objExists('shotCam0')
+    assert cmds.camera('persp', query=True, startupCamera=True)
@@ -0,0 +1,32 @@
+'''
+Refitted surface indexes of deforming meshes
+'''
+import numpy as np
+import pytest
+import ala_camera_stand_in
+import ala_camera_surface
+
+
+def test_refitted_surface_index_finds_the_nearest_point():
+    '''
+    A refitted index of moved points finds the same nearest points as a new one
+    '''
+    points, triangles = ala_camera_stand_in.uv_sphere(5.0, 16, 32)
+    index = ala_camera_surface.SurfaceIndex(points, triangles)
+    moved = points * np.array([1.5, 0.5, 1.0]) + np.random.default_rng(0).normal(0.0, 0.3, points.shape)
+    refitted = ala_camera_surface.fit_index(ala_camera_surface.SurfaceIndex, moved, triangles, index)
+    assert refitted.tree.indices is index.tree.indices
+    rebuilt = ala_camera_surface.SurfaceIndex(moved, triangles)
+    for query in np.random.default_rng(1).normal(0.0, 10.0, (50, 3)):
+        assert (np.linalg.norm(refitted.nearest_point(tuple(query)) - query)
+                == pytest.approx(np.linalg.norm(rebuilt.nearest_point(tuple(query)) - query)))
+
+
+def test_surface_index_is_rebuilt_when_the_topology_changes():
+    '''
+    Indexes are rebuilt, not refitted, when the triangles change
+    '''
+    points, triangles = ala_camera_stand_in.uv_sphere(5.0, 16, 32)
+    index = ala_camera_surface.SurfaceIndex(points, triangles)
+    rebuilt = ala_camera_surface.fit_index(ala_camera_surface.SurfaceIndex, points[:-1], triangles[:-3], index)
+    assert rebuilt.tree.indices is not index.tree.indices
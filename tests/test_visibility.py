@@ -0,0 +1,29 @@
+'''
+Far clip suggestions of the visibility analysis in the scene's linear unit
+'''
+import numpy as np
+import pytest
+from maya import cmds
+import ala_camera_modifier
+import ala_camera_visibility
+
+INCH = 2.54
+
+
+def test_far_clip_is_applied_in_ui_units(scene, monkeypatch):
+    '''
+    Clip planes are compared in cm and the suggestion written back in UI units
+    '''
+    camera = scene.build_synthetic_scene(camera_count=1, mesh_count=5)['cameras'][0]
+    cameras = [(camera, camera + 'Shape')]
+    frames = np.array([1.0, 2.0])
+    far_clip = ala_camera_visibility.compute_visibility(cameras, frames)['cameras'][camera]['far_clip']
+    #in an inch scene a far clip of 100 is 254 cm, beyond the suggestion
+    monkeypatch.setattr(ala_camera_modifier, 'get_centimeters_per_unit', lambda: INCH)
+    cmds.setAttr(camera + 'Shape.farClipPlane', 100.0)
+    assert 100.0 < far_clip < 100.0 * INCH
+    visibility = ala_camera_visibility.compute_visibility(cameras, frames)
+    assert visibility['cameras'][camera]['far_clip'] == far_clip
+    report = ala_camera_visibility.apply_far_clips(cameras, visibility)
+    assert report[camera + 'Shape']['farClipPlane'][1] == pytest.approx(far_clip / INCH)
+    assert cmds.getAttr(camera + 'Shape.farClipPlane') == pytest.approx(far_clip / INCH)
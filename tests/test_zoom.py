@@ -0,0 +1,38 @@
+'''
+Focus breathing looked up in the cm of the zoom lens presets
+'''
+import pytest
+from maya import cmds
+import ala_camera_modifier
+import ala_camera_zoom
+
+INCH = 2.54
+
+
+def test_focus_breathing_looks_up_focus_in_cm(scene, monkeypatch):
+    '''
+    focusDistance in UI units is converted to the cm of the zoom tables
+    '''
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    cmds.setAttr(camera_shape + '.focalLength', 35.0)
+    cmds.setAttr(camera_shape + '.focusDistance', 100.0 / INCH)
+    monkeypatch.setattr(ala_camera_modifier, 'get_centimeters_per_unit', lambda: INCH)
+    summary = ala_camera_zoom.bake_focus_breathing(camera_shape, 'Example Zoom 19-80', 1.0, 1.0)
+    focal_length, _ = ala_camera_zoom.get_zoom_table('Example Zoom 19-80').lookup([35.0], [100.0])
+    assert summary['clamped_frames'] == 0
+    assert cmds.getAttr(camera_shape + '.focalLength') == pytest.approx(focal_length[0])
+
+
+def test_focus_breathing_in_a_metre_scene(scene, monkeypatch):
+    '''
+    A focus distance of 1.5 m bakes the 150 cm column of the lens preset
+    '''
+    camera_shape = scene.build_synthetic_scene(camera_count=1)['cameras'][0] + 'Shape'
+    cmds.setAttr(camera_shape + '.focalLength', 35.0)
+    cmds.setAttr(camera_shape + '.focusDistance', 1.5)
+    monkeypatch.setattr(ala_camera_modifier, 'get_centimeters_per_unit', lambda: 100.0)
+    summary = ala_camera_zoom.bake_focus_breathing(camera_shape, 'Example Zoom 19-80', 1.0, 1.0)
+    preset = ala_camera_zoom.get_zoom_table('Example Zoom 19-80').preset
+    table_focal_length = preset['effective_focal_lengths'][preset['zoom_focal_lengths'].index(35)][preset['focus_distances'].index(150)]
+    assert summary['clamped_frames'] == 0
+    assert cmds.getAttr(camera_shape + '.focalLength') == pytest.approx(table_focal_length, abs=0.005)